@@ -1,7 +1,28 @@
-from .models import Task, Document
-from .core import TaskManager, DocumentManager
-from .agent import Agent
-from .chat import ChatHistory, ChatEngine
+from __future__ import annotations
+from importlib import import_module
+
+# Public names resolve on first access so that `import pkms_core.cli` (and
+# every `pkms` invocation) only loads the submodules a command actually uses.
+_EXPORTS = {
+	"Task": ".models",
+	"Document": ".models",
+	"TaskManager": ".core",
+	"DocumentManager": ".core",
+	"Agent": ".agent",
+	"ChatHistory": ".chat",
+	"ChatEngine": ".chat",
+}
+
+def __getattr__(name):
+	module = _EXPORTS.get(name)
+	if module is None:
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	value = getattr(import_module(module, __name__), name)
+	globals()[name] = value
+	return value
+
+def __dir__():
+	return sorted(list(globals()) + list(_EXPORTS))
 
 __all__ = [
 	"Task",
@@ -1,137 +1,135 @@
 from __future__ import annotations
-from typing import List, Optional
+import os, time
+from typing import List, Optional, Sequence
 from datetime import datetime, timezone
 from .models import Task, Document
+from .stats import TaskStats, scan_buckets, LONG_TASK_WORDS
+from .suggestions import extract_suggestions, extract_many, merge_suggestions
 from .utils import truncate
 
 # Threshold for focus overload warning: more than this many high-priority open tasks
 FOCUS_OVERLOAD_THRESHOLD = 5
+# Seconds a memoized `advice_for` result is reused while nothing has changed
+ADVICE_TTL = float(os.environ.get('PKMS_ADVICE_TTL', '60'))
 
-_VERBS = {"add","create","implement","write","refactor","plan","review","test","fix","update","remove","design"}
+
+def _task_gist(task: Task) -> str:
+    words = task.text.strip().split()
+    return " ".join(words[:7]) + ("..." if len(words) > 7 else "")
+
+def _doc_gist(doc: Document) -> str:
+    first_line = doc.text.strip().splitlines()[0] if doc.text.strip() else doc.title
+    words = first_line.split()
+    return f"{doc.title}: {' '.join(words[:10])}{'...' if len(words)>10 else ''}"
 
 class Agent:
     """Rule/heuristic agent with optional LLM adapter."""
     def __init__(self, llm: Optional[object] = None):
         self.llm = llm
+        self._advice_memo = None
+    def _llm_ready(self) -> bool:
+        return bool(self.llm and getattr(self.llm, 'available', lambda: False)())
     def summarize_task(self, task: Task) -> str:
-        if self.llm and getattr(self.llm, 'available', lambda: False)():
+        if self._llm_ready():
             llm_text = self.llm.summarize(task.text)
             if llm_text: return llm_text
-        words = task.text.strip().split()
-        return " ".join(words[:7]) + ("..." if len(words) > 7 else "")
+        return _task_gist(task)
     def summarize_document(self, doc: Document) -> str:
-        if self.llm and getattr(self.llm, 'available', lambda: False)():
+        if self._llm_ready():
             llm_text = self.llm.summarize(doc.text)
             if llm_text: return f"{doc.title}: {llm_text}"
-        first_line = doc.text.strip().splitlines()[0] if doc.text.strip() else doc.title
-        words = first_line.split()
-        return f"{doc.title}: {' '.join(words[:10])}{'...' if len(words)>10 else ''}"
+        return _doc_gist(doc)
+    def summarize_texts(self, texts: Sequence[str]) -> List[Optional[str]]:
+        """LLM summaries of `texts` (None where there is none), as one batch when the
+        adapter has `summarize_many` (e.g. `AsyncOpenAIAdapter`, which sends them concurrently)."""
+        texts = list(texts)
+        if not texts or not self._llm_ready():
+            return [None] * len(texts)
+        try:
+            many = getattr(self.llm, 'summarize_many', None)
+            return list(many(texts)) if many is not None else [self.llm.summarize(t) for t in texts]
+        except Exception:
+            return [None] * len(texts)
+    def summarize_tasks(self, tasks: Sequence[Task]) -> List[str]:
+        """`summarize_task` for many tasks with a single batched LLM round."""
+        return [s or _task_gist(t) for t, s in zip(tasks, self.summarize_texts([t.text for t in tasks]))]
+    def summarize_documents(self, docs: Sequence[Document]) -> List[str]:
+        """`summarize_document` for many documents with a single batched LLM round."""
+        return [f"{d.title}: {s}" if s else _doc_gist(d) for d, s in zip(docs, self.summarize_texts([d.text for d in docs]))]
+    def batch_summaries(self) -> bool:
+        """Whether the LLM can summarize many texts in one round (see `summarize_texts`)."""
+        return self._llm_ready() and hasattr(self.llm, 'summarize_many')
     def suggest_tasks_from_document(self, doc: Document) -> List[str]:
-        suggestions: List[str] = []
-        for line in doc.text.splitlines():
-            l = line.strip()
-            if not l: continue
-            upper = l.upper()
-            if "TODO" in upper or upper.startswith("TODO:"):
-                suggestions.append(l.replace("TODO:", "").replace("TODO", "").strip())
-                continue
-            first = l.split()[0].lower()
-            if first in _VERBS:
-                suggestions.append(l)
-        return suggestions
-    def suggest_tasks_from_documents(self, docs: List[Document]) -> List[str]:
-        out: List[str] = []
-        for d in docs:
-            out.extend(self.suggest_tasks_from_document(d))
-        # de-duplicate preserving order
-        seen = set(); dedup = []
-        for s in out:
-            if s not in seen:
-                dedup.append(s); seen.add(s)
-        return dedup
+        return extract_suggestions(doc.text)
+    def suggest_tasks_from_documents(self, docs: List[Document], limit: Optional[int] = None,
+                                     workers: Optional[int] = None) -> List[str]:
+        """Suggestions from `docs`, de-duplicated preserving order.
+
+        With a `limit` documents are scanned serially and scanning stops once
+        enough suggestions are found; otherwise the built-in heuristic runs
+        through `extract_many` (parallel with `workers`/PKMS_SUGGEST_WORKERS > 1).
+        """
+        if limit is None and type(self).suggest_tasks_from_document is Agent.suggest_tasks_from_document:
+            return merge_suggestions(extract_many([d.text for d in docs], workers))
+        return merge_suggestions((self.suggest_tasks_from_document(d) for d in docs), limit)
+    def cached_suggestions(self, doc_manager, limit: Optional[int] = None) -> Optional[List[str]]:
+        """All-document suggestions from the manager's content-hash cache, or None
+        when unavailable (or when a subclass changes how suggestions are extracted)."""
+        if type(self).suggest_tasks_from_document is not Agent.suggest_tasks_from_document:
+            return None
+        if not hasattr(doc_manager, 'task_suggestions'):
+            return None
+        return doc_manager.task_suggestions(limit)
 
     # Productivity / advice layer
-    def productivity_advice(self, tasks: List[Task], docs: List[Document]) -> List[str]:
-        advice: List[str] = []
-        now = datetime.now(timezone.utc)
-        total = len(tasks)
-        incomplete = len([t for t in tasks if not t.completed])
-        completed = total - incomplete
-        advice.append(f"Tasks: {incomplete} open / {completed} done (total {total})")
-        # High-focus tasks: priority >=4 and not completed (recent and high priority)
-        high_focus = [t for t in tasks if getattr(t, 'priority', 3) >= 4 and not t.completed]
-        high_focus = sorted(high_focus, key=lambda t: (-getattr(t, 'priority', 3), t.id))[:3]
-        if high_focus:
-            advice.append("High focus: " + "; ".join(truncate(t.text, 60) for t in high_focus))
+    def productivity_advice(self, tasks: List[Task], docs: List[Document], now: Optional[datetime] = None,
+                            stats: Optional[TaskStats] = None, doc_suggestions: Optional[List[str]] = None) -> List[str]:
+        """Heuristic advice lines for `tasks` and `docs`.
 
+        Every task bucket (counts, focus, quick wins, urgent, refine, stale,
+        long, priority spread) is filled in a single pass over `tasks`, and
+        each creation timestamp is parsed once and cached on the task. With
+        `stats` (a `TaskStats` kept current by `TaskManager`) the buckets are
+        read from its running aggregates and `tasks` is not traversed; with
+        precomputed `doc_suggestions` (see `cached_suggestions`) `docs` is not
+        scanned either. When the LLM adapter batches (`batch_summaries`), long
+        focus/urgent/refine entries are replaced by summaries from one round.
+        """
+        advice: List[str] = []
+        now = now or datetime.now(timezone.utc)
+        b = stats.buckets(now) if stats is not None else scan_buckets(tasks, now)
+        if self.batch_summaries():
+            self._summarize_long(b.high_focus, b.urgent, b.refinement)
+        advice.append(f"Tasks: {b.incomplete} open / {b.total - b.incomplete} done (total {b.total})")
+        # High-focus tasks: priority >=4 and not completed
+        if b.high_focus:
+            advice.append("High focus: " + "; ".join(truncate(t, 60) for t in b.high_focus))
         # Quick wins: short, medium-or-higher priority tasks you can knock out fast
-        QUICK_WIN_WORDS = 8
-        QUICK_WIN_MIN_PRIORITY = 3
-        quick_wins = [
-            t for t in tasks
-            if not t.completed and getattr(t, 'priority', 3) >= QUICK_WIN_MIN_PRIORITY and len(t.text.split()) <= QUICK_WIN_WORDS
-        ]
-        quick_wins = sorted(quick_wins, key=lambda t: (-getattr(t, 'priority', 3), t.id))[:3]
-        if quick_wins:
-            advice.append("Quick wins: " + "; ".join(truncate(t.text, 50) for t in quick_wins))
-
+        if b.quick_wins:
+            advice.append("Quick wins: " + "; ".join(truncate(t, 50) for t in b.quick_wins))
         # Urgent: high priority and aging beyond 7 days
-        urgent = []
-        for t in tasks:
-            if getattr(t, 'priority', 3) >= 4 and not t.completed:
-                try:
-                    created = datetime.fromisoformat(t.created)
-                    if created.tzinfo is None:
-                        created = created.replace(tzinfo=timezone.utc)
-                    age = (now - created).days
-                    if age >= 7:
-                        urgent.append(t)
-                except Exception:
-                    continue
-        if urgent:
-            advice.append("Urgent (high priority + aging): " + "; ".join(truncate(t.text, 50) for t in urgent[:3]))
-
+        if b.urgent:
+            advice.append("Urgent (high priority + aging): " + "; ".join(truncate(t, 50) for t in b.urgent))
         # Refinement candidates: priority >=3 and no details
-        refinement = [t for t in tasks if getattr(t, 'priority', 3) >= 3 and not getattr(t, 'details', []) and not t.completed]
-        if refinement:
-            advice.append("Refine: " + "; ".join(truncate(t.text, 60) for t in refinement[:3]))
-
+        if b.refinement:
+            advice.append("Refine: " + "; ".join(truncate(t, 60) for t in b.refinement))
         # Stale tasks: older than 14 days
-        stale = []
-        for t in tasks:
-            try:
-                created = datetime.fromisoformat(t.created)
-                if created.tzinfo is None:
-                    created = created.replace(tzinfo=timezone.utc)
-                age_days = (now - created).days
-                if age_days > 14 and not t.completed:
-                    stale.append(t)
-            except Exception:
-                continue
-        if stale:
-            advice.append(f"Stale: {len(stale)} tasks older than 14 days.")
-
-        # Identify long tasks (heuristic: > 12 words) as candidates for breaking down
-        long_tasks = [t for t in tasks if len(t.text.split()) > 12 and not t.completed]
-        if long_tasks:
-            advice.append(f"Break down {len(long_tasks)} long tasks (>{12} words) for momentum.")
+        if b.stale:
+            advice.append(f"Stale: {b.stale} tasks older than 14 days.")
+        # Long tasks are candidates for breaking down
+        if b.long_tasks:
+            advice.append(f"Break down {b.long_tasks} long tasks (>{LONG_TASK_WORDS} words) for momentum.")
         # Focus overload: warn when too many high-priority open tasks exist
-        high_open = [t for t in tasks if getattr(t, 'priority', 3) >= 4 and not t.completed]
-        if len(high_open) > FOCUS_OVERLOAD_THRESHOLD:
-            advice.append(f"Focus overload: {len(high_open)} high-priority tasks; consider delegating or pausing.")
-
+        if b.high_open > FOCUS_OVERLOAD_THRESHOLD:
+            advice.append(f"Focus overload: {b.high_open} high-priority tasks; consider delegating or pausing.")
         # Priority spread summary: counts of open tasks grouped by priority
-        prio_counts = {}
-        for t in tasks:
-            if not t.completed:
-                p = getattr(t, 'priority', 3)
-                prio_counts[p] = prio_counts.get(p, 0) + 1
-        if prio_counts:
-            spread = ", ".join(f"P{p}:{prio_counts[p]}" for p in sorted(prio_counts.keys(), reverse=True))
+        if b.prio_counts:
+            spread = ", ".join(f"P{p}:{b.prio_counts[p]}" for p in sorted(b.prio_counts.keys(), reverse=True))
             advice.append("Priority spread (open): " + spread)
         # Include a short doc-derived suggestions summary (count only) so callers
         # can decide whether to surface document-derived suggestions elsewhere.
-        doc_suggestions = self.suggest_tasks_from_documents(docs) if docs else []
+        if doc_suggestions is None:
+            doc_suggestions = self.suggest_tasks_from_documents(docs) if docs else []
         if doc_suggestions:
             # show a concise count plus the top suggestion texts (up to 3)
             advice.append(f"Doc-derived suggestions: {len(doc_suggestions)} available.")
@@ -142,5 +140,31 @@ class Agent:
         if not advice:
             advice.append("No advice available; add tasks or documents.")
         return advice
+    def _summarize_long(self, *lists: List[str]) -> None:
+        """Replace long task texts (>LONG_TASK_WORDS words) in `lists` by LLM summaries, fetched in one batch."""
+        long = list(dict.fromkeys(t for l in lists for t in l if len(t.split()) > LONG_TASK_WORDS))
+        if not long:
+            return
+        found = dict(zip(long, self.summarize_texts(long)))
+        for l in lists:
+            l[:] = [found.get(t) or t for t in l]
+    def advice_for(self, task_manager, doc_manager) -> List[str]:
+        """`productivity_advice` for the managers' current contents, read from the
+        task manager's incremental `stats` when it has them and memoized on the
+        managers' mutation generations for up to ADVICE_TTL seconds (ages drift)."""
+        gens = (getattr(task_manager, 'generation', None), getattr(doc_manager, 'generation', None))
+        key = (id(task_manager), gens[0], id(doc_manager), gens[1])
+        memo = self._advice_memo; now = time.monotonic()
+        if memo is not None and memo[0] == key and now - memo[1] < ADVICE_TTL:
+            return list(memo[2])
+        stats = getattr(task_manager, 'stats', None)
+        tasks = () if stats is not None else task_manager.list()
+        suggestions = self.cached_suggestions(doc_manager)
+        docs = doc_manager.list() if suggestions is None else []
+        advice = self.productivity_advice(tasks, docs, stats=stats, doc_suggestions=suggestions)
+        if None in gens:
+            return advice  # no generation to validate a memo against
+        self._advice_memo = (key, now, advice)
+        return list(advice)
 
 __all__ = ["Agent"]
\ No newline at end of file
@@ -5,9 +5,11 @@ from typing import List, Dict, Optional
 
 from .models import Task, Document, Note
 from .agent import Agent
-from .storage import list_notes, get_note_by_display_index
+from .storage import make_note_store
 
 CHAT_HISTORY_FILE = os.path.join(os.getcwd(), "data_pkms", "chat_history.json")
+# Documents considered by "suggest tasks for <query>"
+SUGGEST_DOC_LIMIT = 20
 
 
 class ChatHistory:
@@ -50,7 +52,7 @@ class ChatEngine:
     def select_task(self, task_id: int) -> bool:
         # Accept either a real task id or a 1-based list index for user convenience.
         # First try to find by persistent id.
-        task = next((t for t in self.tm.tasks if t.id == task_id), None)
+        task = self.tm.get(task_id)
         if task:
             self.selected_task = task
             return True
@@ -70,15 +72,12 @@ class ChatEngine:
     def select_note(self, note_id: int) -> bool:
         # Try persistent id first, then 1-based index
         try:
-            notes = list_notes('json', os.getcwd())
-            note = next((n for n in notes if n.id == note_id), None)
-            if note:
-                self.selected_note = note
-                return True
-            idx = int(note_id)
-            if 1 <= idx <= len(notes):
-                self.selected_note = notes[idx-1]
-                return True
+            store = make_note_store('json', os.getcwd())
+            note = store.get(note_id)
+            if note is None:
+                note = store.get_at(int(note_id))
+            self.selected_note = note
+            return True
         except Exception:
             pass
         return False
@@ -86,6 +85,20 @@ class ChatEngine:
     def clear_note_selection(self) -> None:
         self.selected_note = None
 
+    def _advice(self) -> List[str]:
+        # memoized per manager generation when the agent supports it
+        if hasattr(self.agent, 'advice_for'):
+            return self.agent.advice_for(self.tm, self.dm)
+        return self.agent.productivity_advice(self.tm.list(), self.dm.list())
+
+    def _task_counts(self):
+        """(open, total) from the manager's incremental stats, without listing tasks when possible."""
+        stats = getattr(self.tm, 'stats', None)
+        if stats is not None:
+            return stats.open, stats.total
+        tasks = self.tm.list()
+        return sum(1 for t in tasks if not t.completed), len(tasks)
+
     def handle_message(self, message: str) -> str:
         self.history.add("user", message)
         msg = message.strip()
@@ -144,9 +157,20 @@ class ChatEngine:
             self.history.add("assistant", response)
             return response
 
-        # Suggest tasks
+        # Suggest tasks: "suggest tasks [N]" or "suggest tasks for <query> [N]"
         if msg.startswith("suggest tasks"):
-            suggestions = self.agent.suggest_tasks_from_documents(self.dm.list()) if hasattr(self.agent, 'suggest_tasks_from_documents') else []
+            rest = msg[len("suggest tasks"):].split()
+            limit = int(rest.pop()) if rest and rest[-1].isdigit() else None
+            suggestions = None
+            if rest and rest[0] == "for" and len(rest) > 1:
+                # only the best-matching documents are scanned for suggestions
+                docs = self.dm.search(" ".join(rest[1:]), limit=SUGGEST_DOC_LIMIT)
+            else:
+                # all documents: served from the content-hash suggestion cache when possible
+                suggestions = self.agent.cached_suggestions(self.dm, limit) if hasattr(self.agent, 'cached_suggestions') else None
+                docs = self.dm.list() if suggestions is None else []
+            if suggestions is None:
+                suggestions = self.agent.suggest_tasks_from_documents(docs, limit=limit) if hasattr(self.agent, 'suggest_tasks_from_documents') else []
             response = "\n".join(suggestions) if suggestions else "No suggestions."
             self.history.add("assistant", response)
             return response
@@ -155,14 +179,14 @@ class ChatEngine:
         if msg.lower() in {"advise", "advice", "advise all", "productivity"}:
             # If an LLM is available, ask it for a concise, user-facing advice message.
             llm = getattr(self.agent, 'llm', None)
-            tasks = self.tm.list()
-            docs = self.dm.list()
             if llm and getattr(llm, 'available', lambda: False)():
                 # Build a short prompt summarizing counts and top task texts
                 summary_lines = [f"You are an assistant providing concise productivity advice."]
-                summary_lines.append(f"Tasks: {len([t for t in tasks if not t.completed])} open / {len([t for t in tasks if t.completed])} done (total {len(tasks)})")
-                # include up to 3 task summaries (no internal ids)
-                for t in tasks[:3]:
+                open_count, total = self._task_counts()
+                summary_lines.append(f"Tasks: {open_count} open / {total - open_count} done (total {total})")
+                # include up to 3 task summaries (no internal ids); a lazy task list reads only its first page
+                tasks = getattr(self.tm, 'tasks', None)
+                for t in (tasks if tasks is not None else self.tm.list())[:3]:
                     summary_lines.append(f"- {t.text}")
                 # Ask the LLM for a concise, prioritized list.
                 # Request numbered, one-line suggestions with an optional 1-2 word rationale.
@@ -181,14 +205,14 @@ class ChatEngine:
                     if llm_resp:
                         response = llm_resp
                     else:
-                        advice_lines = self.agent.productivity_advice(tasks, docs)
+                        advice_lines = self._advice()
                         response = "\n".join(advice_lines)
                 except Exception:
-                    advice_lines = self.agent.productivity_advice(tasks, docs)
+                    advice_lines = self._advice()
                     response = "\n".join(advice_lines)
             else:
                 # Fall back to the simpler heuristic advice (which now avoids doc-derived lists)
-                advice_lines = self.agent.productivity_advice(tasks, docs)
+                advice_lines = self._advice()
                 if self.selected_note:
                     advice_lines.insert(0, f"Note focus: {(self.selected_note.text or '')[:120]}")
                 response = "\n".join(advice_lines)
@@ -209,7 +233,7 @@ class ChatEngine:
         if msg.startswith("summarize task "):
             try:
                 tid = int(msg.split()[-1])
-                task = next((t for t in self.tm.tasks if t.id == tid), None)
+                task = self.tm.get(tid)
                 response = self.agent.summarize_task(task) if task else "Task not found"
             except Exception:
                 response = "Invalid task id"
@@ -325,7 +349,7 @@ class ChatEngine:
             return response
 
         # Fallback help
-        response = "Commands: suggest tasks | summarize doc <id> | summarize task <id> | select task <id> | add task <text> | edit task <id> to <text> | add detail <text> | complete/delete task <id>."
+        response = "Commands: suggest tasks [for <query>] [N] | summarize doc <id> | summarize task <id> | select task <id> | add task <text> | edit task <id> to <text> | add detail <text> | complete/delete task <id>."
         self.history.add("assistant", response)
         return response
 
@@ -1,141 +1,512 @@
 from __future__ import annotations
-import os, re
+import os
 from datetime import datetime, timezone
-from typing import List, Optional, Set, Dict, Tuple, Callable
+from collections.abc import Sequence
+from itertools import islice
+from typing import List, Optional, Dict, Tuple, Callable
+from typing import TYPE_CHECKING
 from .models import Task, Document
 from .storage import make_task_store, make_document_store, TaskStore, DocumentStore
 
+# Search indexes, advice aggregates and the suggestion cache are imported where
+# they are first used, so commands such as `pkms add` never load them.
+if TYPE_CHECKING:
+    from .stats import TaskStats
+    from .search_index import TrigramIndex
+    from .suggestions import SuggestionCache
+
+class LazyTaskList(Sequence):
+    """Read-only, cursor-backed view of a store's tasks in id order.
+
+    Pages of `page_size` rows are fetched on demand (LIMIT/OFFSET for indexing,
+    keyset pagination for iteration) and only the most recent few are kept, so
+    `len()`, indexing and iteration never hold the whole table in memory.
+    """
+    PAGE_SIZE = 500
+    MAX_PAGES = 4
+    def __init__(self, store, page_size: int = PAGE_SIZE):
+        self.store = store
+        self.page_size = page_size
+        self._pages: Dict[int, List[Task]] = {}
+        self._len: Optional[int] = None
+    def invalidate(self) -> None:
+        self._pages.clear(); self._len = None
+    def __len__(self) -> int:
+        if self._len is None:
+            self._len = self.store.count()
+        return self._len
+    def _page(self, n: int) -> List[Task]:
+        page = self._pages.pop(n, None)
+        if page is None:
+            page = self.store.load_page(n * self.page_size, self.page_size)
+        self._pages[n] = page
+        while len(self._pages) > self.MAX_PAGES:
+            del self._pages[next(iter(self._pages))]
+        return page
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if i < 0:
+            raise IndexError(i)
+        page = self._page(i // self.page_size)
+        try:
+            return page[i % self.page_size]
+        except IndexError:
+            raise IndexError(i) from None
+    def __iter__(self):
+        for page in self.store.iter_pages(self.page_size):
+            yield from page
+
+def _task_search_text(t: Task) -> str:
+    return " ".join([t.text, *t.details, *t.tags])
+
 class TaskManager:
-    def __init__(self, backend: str = 'sqlite', store: Optional[TaskStore] = None, on_toggle: Optional[Callable[[Task,bool],None]] = None):
+    """Task operations over a TaskStore.
+
+    By default every task is loaded into `self.tasks` at construction. With
+    ``lazy=True`` and a store that supports paging (sqlite), `self.tasks` is a
+    `LazyTaskList`, the next id comes from `SELECT MAX(id)`, and lookups and
+    mutations go straight to the store, so construction cost does not grow
+    with the number of tasks.
+
+    `generation` increases on every mutation made through the manager, so
+    derived results (e.g. `Agent.advice_for`) can be memoized against it.
+    `stats` (advice aggregates) and the fuzzy search index are built on first
+    use and then updated in O(log n) by each mutation.
+    """
+    def __init__(self, backend: str = 'sqlite', store: Optional[TaskStore] = None, on_toggle: Optional[Callable[[Task,bool],None]] = None, lazy: bool = False):
         root = os.getcwd()
         self.store = store or make_task_store(backend, root)
-        self.tasks: List[Task] = self.store.load()
-        self._next_id = max([t.id for t in self.tasks], default=0) + 1
+        if lazy and hasattr(self.store, 'load_page'):
+            self.tasks = LazyTaskList(self.store)
+            self._next_id = self.store.max_id() + 1
+        else:
+            self.tasks: List[Task] = self.store.load()
+            self._next_id = max([t.id for t in self.tasks], default=0) + 1
         self.on_toggle = on_toggle
+        self._fuzzy: Optional[TrigramIndex] = None
+        self._stats: Optional[TaskStats] = None
+        self.generation = 0
+    @property
+    def lazy(self) -> bool:
+        return isinstance(self.tasks, LazyTaskList)
+    def _save_all(self) -> None:
+        # Fallback when a single-row write fails: resync the whole list, rewriting only changed rows
+        self.store.save_all(self.tasks, diff=True)
+    def _mutated(self, t: Optional[Task] = None, removed: Optional[int] = None) -> None:
+        # every mutation passes through here: bump the generation and keep built derived structures in step
+        self.generation += 1
+        if t is None and removed is None:
+            # the whole store changed (clear): drop the derived structures, rebuilt on next use
+            self._fuzzy = None; self._stats = None
+            return
+        if removed is not None:
+            if self._fuzzy is not None: self._fuzzy.remove(removed)
+            if self._stats is not None: self._stats.remove(removed)
+            return
+        if self._fuzzy is not None: self._fuzzy.update(t.id, _task_search_text(t))
+        if self._stats is not None: self._stats.update(t)
+    @property
+    def stats(self) -> TaskStats:
+        """Incremental advice aggregates over all tasks (built on first access)."""
+        from .stats import TaskStats
+        if self._stats is None or (not self.lazy and len(self._stats) != len(self.tasks)):
+            self._stats = TaskStats.build(self.tasks)
+        return self._stats
+    def _fuzzy_index(self) -> TrigramIndex:
+        from .search_index import TrigramIndex
+        if self._fuzzy is None or len(self._fuzzy) != len(self.tasks):
+            self._fuzzy = TrigramIndex.build((t.id, _task_search_text(t)) for t in self.tasks)
+        return self._fuzzy
+    def _persist(self, t: Task) -> None:
+        self._mutated(t)
+        if self.lazy:
+            # no in-memory copy to resync from; let store errors surface
+            self.store.update(t); self.tasks.invalidate(); return
+        try: self.store.update(t)
+        except Exception: self._save_all()
+    def get(self, task_id: int) -> Optional[Task]:
+        if self.lazy:
+            return self.store.get(task_id)
+        for t in self.tasks:
+            if t.id == task_id: return t
+        return None
     def add(self, text: str, priority: int = 3, tags: Optional[List[str]] = None) -> Task:
         tags = tags or []
         t = Task(id=self._next_id, text=text, created=datetime.now(timezone.utc).isoformat(), completed=False, details=[], priority=priority, tags=tags)
         self._next_id += 1
+        self._mutated(t)
+        if self.lazy:
+            self.store.add(t); self.tasks.invalidate()
+            return t
         self.tasks.append(t)
         try: self.store.add(t)
-        except Exception: self.store.save_all(self.tasks)
+        except Exception: self._save_all()
         return t
+    def add_many(self, items) -> List[Task]:
+        """Create one task per item dict (text, priority, tags, details, and optionally
+        created/completed) with freshly allocated ids, persisted in a single store write."""
+        now = datetime.now(timezone.utc).isoformat()
+        batch: List[Task] = []
+        for item in items:
+            try:
+                prio = int(item.get('priority', 3))
+            except Exception:
+                prio = 3
+            batch.append(Task(id=self._next_id, text=item.get('text', ''), created=item.get('created') or now,
+                              completed=bool(item.get('completed', False)), details=list(item.get('details') or []),
+                              priority=prio, tags=list(item.get('tags') or [])))
+            self._next_id += 1
+        if not batch:
+            return batch
+        self.store.add_many(batch)
+        for t in batch: self._mutated(t)
+        if self.lazy:
+            self.tasks.invalidate()
+        else:
+            self.tasks.extend(batch)
+        return batch
     def add_detail(self, task_id: int, detail: str) -> Optional[Task]:
-        for t in self.tasks:
-            if t.id == task_id:
-                t.details.append(detail)
-                try: self.store.update(t)
-                except Exception: self.store.save_all(self.tasks)
-                return t
-        return None
+        t = self.get(task_id)
+        if t is None: return None
+        t.details.append(detail)
+        self._persist(t)
+        return t
     def remove_detail(self, task_id: int, index: int) -> Optional[Task]:
-        for t in self.tasks:
-            if t.id == task_id:
-                try:
-                    del t.details[index]
-                    try: self.store.update(t)
-                    except Exception: self.store.save_all(self.tasks)
-                    return t
-                except Exception:
-                    return None
-        return None
+        t = self.get(task_id)
+        if t is None: return None
+        try:
+            del t.details[index]
+        except Exception:
+            return None
+        self._persist(t)
+        return t
     def list(self, include_completed: bool = True) -> List[Task]:
-        return list(self.tasks) if include_completed else [t for t in self.tasks if not t.completed]
-    def search(self, query: str) -> List[Task]:
-        q = query.lower(); return [t for t in self.tasks if q in t.text.lower()]
+        if include_completed:
+            # the lazy view already supports len/index/iteration without loading everything
+            return self.tasks if self.lazy else list(self.tasks)
+        return [t for t in self.tasks if not t.completed]
+    def search(self, query: str, prefix: bool = True, limit: Optional[int] = None, offset: int = 0,
+               fuzzy: bool = False, max_distance: Optional[int] = None) -> List[Task]:
+        """Find tasks matching `query`.
+
+        Stores with a full-text index (sqlite) return bm25-ranked matches over
+        text/details/tags, matching word prefixes unless ``prefix=False``;
+        otherwise, or when the query has no words the index can match
+        (e.g. only punctuation), fall back to a case-insensitive substring
+        scan of task text (streamed page by page in lazy mode). `limit`/`offset` select a page; both paths stop once
+        the page is filled instead of materializing every match.
+
+        With ``fuzzy=True`` every query word must match a word of the task
+        (text/details/tags) within `max_distance` edits, or a word prefix
+        unless ``prefix=False``; results are ordered by total edit distance.
+        The trigram index behind this is built on first use and then kept up
+        to date by this manager's mutations.
+        """
+        if fuzzy:
+            from .search_index import FUZZY_MAX_DISTANCE
+            if max_distance is None: max_distance = FUZZY_MAX_DISTANCE
+            ids = self._fuzzy_index().search(query, max_distance, prefix, limit, offset)
+            if self.lazy:
+                return [t for t in (self.store.get(i) for i in ids) if t is not None]
+            by_id = {t.id: t for t in self.tasks}
+            return [by_id[i] for i in ids if i in by_id]
+        ranked = self.store.search(query, prefix=prefix, limit=limit, offset=offset) if hasattr(self.store, 'search') else None
+        # an empty ranked page is a definitive miss; only queries the index cannot express scan
+        if ranked is not None:
+            if self.lazy:
+                return ranked
+            by_id = {t.id: t for t in self.tasks}
+            return [by_id.get(t.id, t) for t in ranked]
+        q = query.lower()
+        return list(islice((t for t in self.tasks if q in t.text.lower()), offset, None if limit is None else offset + limit))
+    def filter(self, tag: Optional[str] = None, priority: Optional[int] = None, completed: Optional[bool] = None) -> List[Task]:
+        """Tasks matching all given filters; pushed down to SQL when the store supports `query`."""
+        if hasattr(self.store, 'query'):
+            found = self.store.query(tag=tag, priority=priority, completed=completed)
+            if self.lazy:
+                return found
+            by_id = {t.id: t for t in self.tasks}
+            return [by_id.get(t.id, t) for t in found]
+        return [t for t in self.tasks
+                if (tag is None or tag in t.tags)
+                and (priority is None or t.priority == priority)
+                and (completed is None or t.completed == bool(completed))]
     def toggle(self, task_id: int) -> Optional[Task]:
-        for t in self.tasks:
-            if t.id == task_id:
-                t.completed = not t.completed
-                try: self.store.update(t)
-                except Exception: self.store.save_all(self.tasks)
-                if self.on_toggle and t.completed: self.on_toggle(t, t.completed)
-                return t
-        return None
+        t = self.get(task_id)
+        if t is None: return None
+        t.completed = not t.completed
+        self._persist(t)
+        if self.on_toggle and t.completed: self.on_toggle(t, t.completed)
+        return t
     def set_completed(self, task_id: int, completed: bool) -> Optional[Task]:
-        for t in self.tasks:
-            if t.id == task_id:
-                was = t.completed; t.completed = bool(completed)
-                try: self.store.update(t)
-                except Exception: self.store.save_all(self.tasks)
-                if self.on_toggle and (not was and t.completed): self.on_toggle(t, t.completed)
-                return t
-        return None
+        t = self.get(task_id)
+        if t is None: return None
+        was = t.completed; t.completed = bool(completed)
+        self._persist(t)
+        if self.on_toggle and (not was and t.completed): self.on_toggle(t, t.completed)
+        return t
     def delete(self, task_id: int) -> bool:
+        self._mutated(removed=task_id)
+        if self.lazy:
+            ok = self.store.delete(task_id); self.tasks.invalidate()
+            return ok
         for i,t in enumerate(self.tasks):
             if t.id == task_id:
                 del self.tasks[i]
                 try:
-                    if not self.store.delete(t.id): self.store.save_all(self.tasks)
-                except Exception: self.store.save_all(self.tasks)
+                    if not self.store.delete(t.id): self._save_all()
+                except Exception: self._save_all()
                 return True
         return False
+    def clear(self) -> None:
+        """Delete every task from the store and restart ids at 1."""
+        self.store.save_all([])
+        if self.lazy: self.tasks.invalidate()
+        else: self.tasks.clear()
+        self._next_id = 1
+        self._mutated()
     def edit(self, task_id: int, new_text: str) -> Optional[Task]:
         """Edit the text of an existing task and persist the change."""
-        for t in self.tasks:
-            if t.id == task_id:
-                t.text = new_text
-                try: self.store.update(t)
-                except Exception: self.store.save_all(self.tasks)
-                return t
-        return None
+        t = self.get(task_id)
+        if t is None: return None
+        t.text = new_text
+        self._persist(t)
+        return t
     def export(self, out_path: str) -> None:
         import json
-        with open(out_path,'w',encoding='utf-8') as fh: json.dump([t.__dict__ for t in self.tasks], fh, indent=2)
+        with open(out_path,'w',encoding='utf-8') as fh: json.dump([t.to_dict() for t in self.tasks], fh, indent=2)
 
 class DocumentManager:
-    _STOPWORDS = {"the","and","or","of","a","to","in","for","on","is","it"}
+    """Document operations with a lazily opened search index.
+
+    Construction does no I/O beyond opening the store: documents are parsed on
+    first access and the inverted index is memory-mapped from ``docs.idx`` when
+    its signature matches ``docs.json`` (and its journal), or rebuilt and
+    persisted on first search otherwise. Each add/update/delete is logged to
+    ``docs.idx.delta``, which is replayed over the mapped index on open, so an
+    edit does not force the next process to rebuild. While documents are unparsed, a
+    journaled `delete`/`update` checks the id against a fresh index and reads
+    at most that one document.
+    """
+    @property
+    def _STOPWORDS(self):
+        from .search_index import STOPWORDS
+        return STOPWORDS
     def __init__(self, store: Optional[DocumentStore] = None):
         root = os.getcwd()
         self.store = store or make_document_store(root)
-        self.docs: List[Document] = self.store.load()
-        self._next_id = max([d.id for d in self.docs], default=0) + 1
-        self._index: Dict[str, Set[int]] = {}
-        self._rebuild_index()
+        self._docs: Optional[List[Document]] = None
+        self._by_id: Dict[int, Document] = {}
+        self._next_id: Optional[int] = None
+        self._index = None
+        self._suggest: Optional[SuggestionCache] = None
+        self.generation = 0
+    @property
+    def docs(self) -> List[Document]:
+        if self._docs is None:
+            self._set_docs(self.store.load())
+        return self._docs
+    @docs.setter
+    def docs(self, docs: List[Document]) -> None:
+        self._set_docs(list(docs)); self._index = self._suggest = None; self.generation += 1
+    def _set_docs(self, docs: List[Document]) -> None:
+        self._docs = docs
+        self._by_id = {d.id: d for d in docs}
+        self._next_id = max(self._by_id, default=0) + 1
     def _tokenize(self, text: str) -> List[str]:
-        tokens = re.split(r"[^A-Za-z0-9]+", text.lower())
-        return [t for t in tokens if t and t not in self._STOPWORDS]
+        from .search_index import tokenize
+        return tokenize(text)
+    def _index_path(self) -> Optional[str]:
+        from .search_index import index_path
+        path = getattr(self.store, 'path', None)
+        return index_path(path) if path else None
+    def _open_index(self):
+        """Map the persisted index (plus its delta) if fresh; else build it (persisting
+        when the documents were read from an unchanged snapshot in this call)."""
+        from .search_index import InvertedIndex, document_fields, index_signature, open_index, write_index
+        idx_path = self._index_path()
+        if idx_path:
+            mapped = open_index(idx_path, index_signature(self.store.path))
+            if mapped is not None:
+                return mapped
+        fresh = self._docs is None
+        sig = index_signature(self.store.path) if idx_path and fresh else None
+        index = InvertedIndex.build((d.id, document_fields(d)) for d in self.docs)
+        if sig is not None and sig == index_signature(self.store.path):
+            try: write_index(idx_path, index, sig, max(self._by_id, default=0))
+            except Exception: pass
+        return index
+    def _search_index(self):
+        if self._index is None:
+            self._index = self._open_index()
+        return self._index
+    def _fresh_index(self):
+        """The open index, else the persisted one if it matches the store (mapped,
+        no documents parsed); None when neither is available."""
+        if self._index is None:
+            from .search_index import index_signature, open_index
+            idx_path = self._index_path()
+            self._index = open_index(idx_path, index_signature(self.store.path)) if idx_path else None
+        return self._index
+    def _index_base(self):
+        """Signature of the persisted index if it (with its delta) matches the store
+        right before a change, so the change can be logged against it."""
+        from .search_index import index_base, index_signature
+        idx_path = self._index_path()
+        return index_base(idx_path, index_signature(self.store.path)) if idx_path else None
+    def _index_changed(self, base, doc: Optional[Document] = None, removed: Optional[int] = None) -> None:
+        """Append the change to the index delta (folding it into ``docs.idx`` once it
+        is large), so the next process maps the index instead of rebuilding it."""
+        if base is None: return
+        from .search_index import append_delta, document_fields, index_signature, needs_compaction, write_index
+        idx_path = self._index_path(); sig = index_signature(self.store.path)
+        rec = {'id': removed} if doc is None else {'id': doc.id, 'fields': document_fields(doc)}
+        try:
+            if not needs_compaction(idx_path, append_delta(idx_path, base, sig, [rec])): return
+            idx = self._search_index()
+            max_id = getattr(idx, 'max_id', None)
+            if max_id is None: max_id = max(self._by_id, default=0)
+            if self._next_id is not None: max_id = max(max_id, self._next_id - 1)
+            write_index(idx_path, idx.to_inverted() if hasattr(idx, 'to_inverted') else idx, sig, max_id)
+        except Exception:
+            pass
+    def _mutable_index(self):
+        """The open index, wrapped for in-place updates; None if not opened yet
+        (it will be rebuilt from the mutated documents on first search)."""
+        from .search_index import MappedIndex, OverlayIndex
+        if isinstance(self._index, MappedIndex):
+            self._index = OverlayIndex(self._index)
+        return self._index
     def _index_doc(self, doc: Document):
-        for tok in self._tokenize(doc.title + " " + doc.text + " " + " ".join(doc.tags)):
-            self._index.setdefault(tok, set()).add(doc.id)
+        from .search_index import document_fields
+        self.generation += 1
+        idx = self._mutable_index()
+        if idx is not None: idx.add(doc.id, document_fields(doc))
     def _rebuild_index(self):
-        self._index = {}
-        for d in self.docs: self._index_doc(d)
+        from .search_index import InvertedIndex, document_fields
+        self._index = InvertedIndex.build((d.id, document_fields(d)) for d in self.docs)
+    def task_suggestions(self, limit: Optional[int] = None, workers: Optional[int] = None) -> List[str]:
+        """Document-derived task suggestions, deduplicated in document order.
+
+        Served from the content-hash cache (``docs.suggest.json``) when it is
+        fresh, so no document is read; otherwise documents are loaded and only
+        texts with an unknown hash are scanned (by `workers` processes, see
+        `suggestions.extract_many`).
+        """
+        if self._suggest is None:
+            from .suggestions import load_or_build
+            self._suggest = load_or_build(getattr(self.store, 'path', None), lambda: self.docs, workers)
+        return self._suggest.merged(limit)
+    def _suggest_signature(self):
+        """Store signature before a mutation, if there is a suggestion cache to carry forward."""
+        from .search_index import index_signature
+        from .suggestions import suggestions_path
+        path = getattr(self.store, 'path', None)
+        if path and (self._suggest is not None or os.path.exists(suggestions_path(path))):
+            return index_signature(path)
+        return None
+    def _suggest_changed(self, sig_before, doc: Optional[Document] = None, removed: Optional[int] = None) -> None:
+        from .search_index import index_signature
+        from .suggestions import SuggestionCache, suggestions_path
+        cache = self._suggest
+        path = getattr(self.store, 'path', None)
+        if cache is None and sig_before is not None:
+            # only a cache that matched the store right before this change can be patched
+            cache = SuggestionCache.load(suggestions_path(path), sig_before)
+        if cache is None: return
+        if removed is not None: cache.discard(removed)
+        else: cache.put(doc)
+        self._suggest = cache
+        if path: cache.save(index_signature(path))
+    def _journaled(self) -> bool:
+        return getattr(self.store, 'journal', False)
+    def _allocate_id(self) -> int:
+        if self._next_id is None:
+            # a loaded list sets _next_id, so an open index here is a mapped one (or its overlay)
+            max_id = getattr(self._fresh_index(), 'max_id', None)
+            if max_id is not None: self._next_id = max_id + 1
+            else: self.docs
+        doc_id = self._next_id; self._next_id += 1
+        return doc_id
     def add(self, title: str, text: str, tags: Optional[List[str]] = None, links: Optional[List[str]] = None) -> Document:
         tags = tags or []; links = links or []
         now = datetime.now(timezone.utc).isoformat()
-        doc = Document(id=self._next_id, title=title, text=text, tags=tags, links=links, created=now, updated=now)
-        self._next_id += 1
-        self.docs.append(doc)
-        self.store.save_all(self.docs)
-        self._index_doc(doc)
+        if not self._journaled(): self.docs  # a snapshot rewrite needs the full list
+        doc = Document(id=self._allocate_id(), title=title, text=text, tags=tags, links=links, created=now, updated=now)
+        if self._docs is not None:
+            self._docs.append(doc); self._by_id[doc.id] = doc
+        sig = self._suggest_signature(); base = self._index_base()
+        # journaled adds never need the other documents; an unloaded list picks the doc up from the journal
+        if self._journaled(): self.store.add(doc)
+        else: self.store.save_all(self._docs)
+        self._index_doc(doc); self._suggest_changed(sig, doc); self._index_changed(base, doc)
         return doc
     def list(self) -> List[Document]: return list(self.docs)
     def get(self, doc_id: int) -> Optional[Document]:
-        for d in self.docs:
-            if d.id == doc_id: return d
-        return None
+        self.docs
+        return self._by_id.get(doc_id)
+    def _cold(self) -> bool:
+        """Documents not parsed yet, journaled store and a fresh index: a single-document
+        change can skip loading the corpus."""
+        return self._docs is None and self._journaled() and self._fresh_index() is not None
+    def update(self, doc_id: int, title: Optional[str] = None, text: Optional[str] = None,
+               tags: Optional[List[str]] = None, links: Optional[List[str]] = None) -> Optional[Document]:
+        if self._cold():
+            doc = self.store.get(doc_id) if doc_id in self._index else None
+        else:
+            doc = self.get(doc_id)
+        if doc is None: return None
+        if title is not None: doc.title = title
+        if text is not None: doc.text = text
+        if tags is not None: doc.tags = tags
+        if links is not None: doc.links = links
+        doc.updated = datetime.now(timezone.utc).isoformat()
+        sig = self._suggest_signature(); base = self._index_base()
+        if self._journaled(): self.store.update(doc)
+        else: self.store.save_all(self._docs)
+        self._index_doc(doc); self._suggest_changed(sig, doc); self._index_changed(base, doc)
+        return doc
     def delete(self, doc_id: int) -> bool:
-        for i,d in enumerate(self.docs):
-            if d.id == doc_id:
-                del self.docs[i]
-                self.store.save_all(self.docs)
-                self._rebuild_index()
-                return True
-        return False
-    def search(self, query: str) -> List[Document]:
-        q_tokens = self._tokenize(query)
-        if not q_tokens:
-            q = query.lower()
-            return [d for d in self.docs if q in d.title.lower() or q in d.text.lower() or any(q in t.lower() for t in d.tags)]
-        scores: Dict[int,int] = {}
-        for tok in q_tokens:
-            ids = self._index.get(tok);
-            if not ids: continue
-            for did in ids: scores[did] = scores.get(did,0) + 1
+        if self._cold():
+            # the index knows every id; the journal record and posting removal need no documents
+            if doc_id not in self._index: return False
+        else:
+            if self.get(doc_id) is None: return False
+            doc = self._by_id.pop(doc_id)
+            for i,d in enumerate(self._docs):
+                if d is doc:
+                    del self._docs[i]; break
+        sig = self._suggest_signature(); base = self._index_base()
+        if self._journaled(): self.store.delete(doc_id)
+        else: self.store.save_all(self._docs)
+        self._suggest_changed(sig, removed=doc_id)
+        self.generation += 1
+        idx = self._mutable_index()
+        if idx is not None: idx.remove(doc_id)
+        self._index_changed(base, removed=doc_id)
+        return True
+    def _substring_search(self, query: str, limit: Optional[int] = None, offset: int = 0) -> List[Document]:
+        q = query.replace('"', ' ').strip().lower()
+        hits = (d for d in self.docs if q in d.title.lower() or q in d.text.lower() or any(q in t.lower() for t in d.tags))
+        return list(islice(hits, offset, None if limit is None else offset + limit))
+    def search(self, query: str, limit: Optional[int] = None, offset: int = 0) -> List[Document]:
+        """BM25-ranked search (title/tag hits boosted); quoted "phrases" must
+        appear verbatim. Falls back to a substring scan when nothing matches.
+        `limit`/`offset` select a page of the ranking via a top-k heap."""
+        from .search_index import parse_query, bm25_scores, phrase_matches, top_k
+        terms, phrases = parse_query(query)
+        if not terms:
+            return self._substring_search(query, limit, offset)
+        index = self._search_index()
+        scores = bm25_scores(index, terms)
+        for phrase in phrases:
+            keep = phrase_matches(index, phrase)
+            scores = {d: s for d, s in scores.items() if d in keep}
         if not scores:
-            q = query.lower()
-            return [d for d in self.docs if q in d.title.lower() or q in d.text.lower() or any(q in t.lower() for t in d.tags)]
-        ordered: List[Tuple[int,int]] = sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
-        by_id = {d.id: d for d in self.docs}
-        return [by_id[i] for i,_s in ordered if i in by_id]
+            return self._substring_search(query, limit, offset)
+        ordered: List[Tuple[int,float]] = top_k(scores, limit, offset)
+        self.docs
+        return [self._by_id[i] for i,_s in ordered if i in self._by_id]
@@ -0,0 +1,286 @@
+"""Resident `pkms serve` process and the client side used by `cli.main`.
+
+The server keeps the task/document managers, their indexes and the note
+stores loaded for one data directory and runs forwarded commands against
+them, one at a time. The client sends its argv over a Unix domain socket
+and streams back the command's stdout/stderr and exit code; when no server
+is listening (or ``PKMS_NO_DAEMON`` is set) it returns None and the caller
+runs the command in-process.
+
+Commands are only forwarded when the client's configuration environment
+(``PKMS_*``, ``OPENAI_*``, ``ANTHROPIC_KEY``) matches the server's; the client
+sends a hash of it and the server declines the request otherwise, so a
+forwarded command behaves like the same command run in-process.
+
+Warm state is dropped whenever the files in ``app_data/`` change behind the
+server's back (mtime/size), so writes by in-process runs are picked up.
+
+Wire format: frames of one kind byte, a big-endian u32 length and a UTF-8
+payload. The client sends one ``r`` frame holding a JSON request; the
+server answers with ``o``/``e`` output frames and a final ``x`` frame
+carrying the exit code (or ``f`` to make the client fall back).
+"""
+from __future__ import annotations
+import io, json, os, struct, sys
+from contextlib import redirect_stderr, redirect_stdout
+from typing import Dict, List, Optional, Tuple
+
+SOCKET_NAME = 'pkms.sock'
+# AF_UNIX paths are limited to ~104-108 bytes; longer ones move to the temp dir
+_MAX_SOCKET_PATH = 100
+_FRAME = struct.Struct('>cI')
+# commands that need the client's terminal (prompts, TUIs) or replace stores wholesale run in-process
+_LOCAL_COMMANDS = {'serve', 'shell', 'setup-llm', 'reset'}
+# manager pieces of a `CommandContext` kept between commands; task pieces are per backend
+_SHARED = ('doc_store', 'dm', 'llm', 'agent')
+_PER_BACKEND = ('task_store', 'tm')
+_OUT_CHUNK = 8192
+# environment that changes how commands behave; client-only switches are left out
+_ENV_PREFIXES = ('PKMS_', 'OPENAI_')
+_ENV_NAMES = {'ANTHROPIC_KEY'}
+_ENV_IGNORED = {'PKMS_NO_DAEMON', 'PKMS_SOCKET'}
+CACHE_NAME = 'llm_cache.db'  # llm_cache.CACHE_NAME, not imported to keep the client light
+
+def socket_path(base_dir: Optional[str] = None) -> str:
+    """Where the server for `base_dir` (default: cwd) listens: ``PKMS_SOCKET`` or ``app_data/pkms.sock``."""
+    if os.environ.get('PKMS_SOCKET'):
+        return os.environ['PKMS_SOCKET']
+    base = os.path.abspath(base_dir or os.getcwd())
+    path = os.path.join(base, 'app_data', SOCKET_NAME)
+    if len(path) <= _MAX_SOCKET_PATH:
+        return path
+    import hashlib, tempfile
+    return os.path.join(tempfile.gettempdir(), f"pkms-{hashlib.sha1(base.encode('utf-8')).hexdigest()[:16]}.sock")
+
+def env_fingerprint(environ=None) -> str:
+    """Hash of the configuration variables in `environ` (default os.environ); values are never sent."""
+    import hashlib
+    environ = os.environ if environ is None else environ
+    items = sorted((k, v) for k, v in environ.items()
+                   if (k.startswith(_ENV_PREFIXES) or k in _ENV_NAMES) and k not in _ENV_IGNORED)
+    return hashlib.sha256(json.dumps(items).encode('utf-8')).hexdigest()
+
+def eligible(args) -> bool:
+    """Whether a parsed command can run in the server (it needs no terminal of its own)."""
+    cmd = args.command
+    if cmd in _LOCAL_COMMANDS:
+        return False
+    if cmd == 'chat':
+        return bool(args.message) and not (args.interactive or args.select)
+    if cmd == 'dashboard':
+        return not getattr(args, 'interactive', False)
+    return True
+
+def _send(sock, kind: bytes, payload: bytes) -> None:
+    sock.sendall(_FRAME.pack(kind, len(payload)) + payload)
+
+def _recv_exact(sock, n: int) -> Optional[bytes]:
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+def _recv(sock) -> Optional[Tuple[bytes, bytes]]:
+    head = _recv_exact(sock, _FRAME.size)
+    if head is None:
+        return None
+    kind, n = _FRAME.unpack(head)
+    payload = _recv_exact(sock, n)
+    return None if payload is None else (kind, payload)
+
+def _connect(path: str, timeout: Optional[float] = None):
+    import socket
+    if not hasattr(socket, 'AF_UNIX'):
+        raise OSError('Unix domain sockets are not supported on this platform')
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(timeout)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close(); raise
+    return sock
+
+def request(op: str, argv: Optional[List[str]] = None, base_dir: Optional[str] = None, out=None, err=None) -> Optional[int]:
+    """Send `op` (``run``/``ping``/``stop``) to the server for `base_dir`.
+
+    Output frames are written to `out`/`err` (default sys.stdout/stderr) as
+    they arrive. Returns the exit code, or None if no server answered or it
+    declined the request.
+    """
+    try:
+        sock = _connect(socket_path(base_dir))
+    except OSError:
+        return None
+    out = out or sys.stdout; err = err or sys.stderr
+    with sock:
+        req = {'op': op, 'argv': list(argv or []), 'cwd': os.path.abspath(base_dir or os.getcwd()), 'env': env_fingerprint()}
+        _send(sock, b'r', json.dumps(req).encode('utf-8'))
+        while True:
+            frame = _recv(sock)
+            if frame is None:
+                err.write('pkms: lost connection to the pkms server\n'); return 1
+            kind, payload = frame
+            if kind == b'o':
+                out.write(payload.decode('utf-8')); out.flush()
+            elif kind == b'e':
+                err.write(payload.decode('utf-8')); err.flush()
+            elif kind == b'x':
+                return int(payload or b'0')
+            else:
+                return None
+
+def forward(argv: List[str], args) -> Optional[int]:
+    """Run `argv` in a server for the current directory; None means run it here."""
+    if os.environ.get('PKMS_NO_DAEMON') or not eligible(args):
+        return None
+    if not os.path.exists(socket_path()):
+        return None
+    return request('run', argv)
+
+class _FrameWriter(io.TextIOBase):
+    """A text stream that ships its output to the client as frames."""
+    def __init__(self, sock, kind: bytes):
+        self._sock = sock; self._kind = kind; self._buf: List[str] = []; self._size = 0
+    def writable(self) -> bool:
+        return True
+    def isatty(self) -> bool:
+        return False
+    def write(self, s: str) -> int:
+        self._buf.append(s); self._size += len(s)
+        if self._size >= _OUT_CHUNK: self.flush()
+        return len(s)
+    def flush(self) -> None:
+        if self._buf:
+            data = ''.join(self._buf); self._buf = []; self._size = 0
+            _send(self._sock, self._kind, data.encode('utf-8', 'replace'))
+
+def _install_log_handler() -> None:
+    """Route log records to the stderr of whichever command is running."""
+    import logging
+    from .logging_setup import LOG_FORMAT
+    class _CurrentStderr(logging.StreamHandler):
+        @property
+        def stream(self): return sys.stderr
+        @stream.setter
+        def stream(self, value): pass
+    handler = _CurrentStderr(); handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logging.basicConfig(level=logging.INFO, handlers=[handler])
+
+def _terminate(signum, frame):
+    raise KeyboardInterrupt  # unwinds serve_forever, which removes the socket
+
+class PkmsServer:
+    """Serves forwarded commands for one data directory, keeping managers warm."""
+    def __init__(self, base_dir: Optional[str] = None, path: Optional[str] = None):
+        self.base_dir = os.path.abspath(base_dir or os.getcwd())
+        self.path = path or socket_path(self.base_dir)
+        self._shared: Dict[str, object] = {}
+        self._per_backend: Dict[object, Dict[str, object]] = {}
+        self._sig = None
+        self._stop = False
+        self._parser = None
+        self._env = env_fingerprint()
+        self.served = 0
+    def _signature(self):
+        data_dir = os.path.join(self.base_dir, 'app_data')
+        try:
+            entries = list(os.scandir(data_dir))
+        except OSError:
+            return None
+        sock = os.path.basename(self.path)
+        # the LLM response cache is written by the server itself and holds no task/document state
+        return tuple(sorted((e.name, st.st_mtime_ns, st.st_size) for e in entries
+                            if e.name != sock and not e.name.startswith(CACHE_NAME) and e.is_file() for st in (e.stat(),)))
+    def _revalidate(self) -> None:
+        sig = self._signature()
+        if sig != self._sig:
+            self._shared.clear(); self._per_backend.clear()
+            from .storage import clear_note_stores
+            clear_note_stores()
+    def run(self, argv: List[str], out, err) -> int:
+        """Parse and run one command with output going to `out`/`err`."""
+        import logging
+        from . import cli
+        self._revalidate()
+        with redirect_stdout(out), redirect_stderr(err):
+            try:
+                if self._parser is None: self._parser = cli.build_parser()
+                args = self._parser.parse_args(argv)
+                if not getattr(args, 'command', None): args.command = 'home'
+                logging.getLogger().setLevel(logging.DEBUG if args.verbose else logging.INFO)
+                task_warm = self._per_backend.setdefault(args.backend, {})
+                ctx = cli.CommandContext(args, warm={**self._shared, **task_warm})
+                rc = cli.run(args, ctx)
+            except SystemExit as e:  # argparse errors and --help
+                if e.code is None or isinstance(e.code, int): rc = e.code or 0
+                else: print(e.code, file=sys.stderr); rc = 1
+            except Exception:
+                import traceback
+                traceback.print_exc(); rc = 1
+            else:
+                for k in _SHARED:
+                    if k in ctx.__dict__: self._shared[k] = ctx.__dict__[k]
+                for k in _PER_BACKEND:
+                    if k in ctx.__dict__: task_warm[k] = ctx.__dict__[k]
+        self._sig = self._signature()
+        self.served += 1
+        return rc
+    def _handle(self, conn) -> None:
+        frame = _recv(conn)
+        if frame is None or frame[0] != b'r':
+            return
+        req = json.loads(frame[1].decode('utf-8'))
+        op = req.get('op')
+        if op == 'run' and os.path.abspath(req.get('cwd') or '') == self.base_dir and req.get('env') == self._env:
+            out, err = _FrameWriter(conn, b'o'), _FrameWriter(conn, b'e')
+            rc = self.run(req.get('argv') or [], out, err)
+            out.flush(); err.flush()
+            _send(conn, b'x', str(rc).encode('ascii'))
+        elif op == 'ping':
+            _send(conn, b'o', f"pkms server for {self.base_dir} (pid {os.getpid()}, {self.served} commands served)\n".encode('utf-8'))
+            _send(conn, b'x', b'0')
+        elif op == 'stop':
+            self._stop = True
+            _send(conn, b'x', b'0')
+        else:
+            _send(conn, b'f', b'')
+    def serve_forever(self, ready=None) -> None:
+        """Listen until a ``stop`` request, SIGTERM or Ctrl-C; `ready()` is called once listening."""
+        import socket, signal, threading
+        if os.path.exists(self.path):
+            try:
+                _connect(self.path, timeout=1).close()
+                raise RuntimeError(f'a pkms server is already listening on {self.path}')
+            except OSError:
+                os.unlink(self.path)  # left behind by a server that did not shut down cleanly
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            old_umask = os.umask(0o177)  # the socket is created owner-only, with no window for other users
+            try:
+                listener.bind(self.path)
+            finally:
+                os.umask(old_umask)
+            listener.listen(16)
+            _install_log_handler()
+            if threading.current_thread() is threading.main_thread():
+                signal.signal(signal.SIGTERM, _terminate)
+            if ready: ready()
+            while not self._stop:
+                conn, _addr = listener.accept()
+                with conn:
+                    try:
+                        self._handle(conn)
+                    except (OSError, ValueError):
+                        pass  # the client went away mid-command
+        except KeyboardInterrupt:
+            pass
+        finally:
+            listener.close()
+            try: os.unlink(self.path)
+            except OSError: pass
+
+__all__ = ["PkmsServer", "socket_path", "eligible", "env_fingerprint", "forward", "request"]
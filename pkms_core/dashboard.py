@@ -1,15 +1,31 @@
 from __future__ import annotations
-from typing import List
+from typing import Dict, List
 from .models import Task, Document
 from .agent import Agent
+from .stats import LONG_TASK_WORDS
 import os
 
+# Long tasks summarized per render when the agent's LLM batches requests
+SUMMARY_LIMIT = 50
+
+def long_task_summaries(tasks: List[Task], agent: Agent) -> Dict[int, str]:
+    """List position (1-based) -> LLM summary for long tasks, fetched in one
+    concurrent batch; empty unless the agent supports batched summaries."""
+    if not getattr(agent, 'batch_summaries', lambda: False)():
+        return {}
+    long = [(i, t) for i, t in enumerate(tasks, start=1) if len(t.text.split()) > LONG_TASK_WORDS][:SUMMARY_LIMIT]
+    got = agent.summarize_texts([t.text for _i, t in long])
+    return {i: s for (i, _t), s in zip(long, got) if s}
+
 def build_plain(tasks: List[Task], docs: List[Document], agent: Agent) -> str:
     lines = []
     lines.append("=== DASHBOARD ===")
     lines.append("Tasks:")
+    summaries = long_task_summaries(tasks, agent)
     for i, t in enumerate(tasks, start=1):
         lines.append(f" {i}. [{'x' if t.completed else ' '}] {t.text}")
+        if i in summaries:
+            lines.append(f"    ↳ {summaries[i]}")
         for d in getattr(t, 'details', [])[:10]:
             lines.append(f"    - {d}")
     # notes summary (best-effort)
@@ -34,10 +50,11 @@ def show_dashboard(tasks: List[Task], docs: List[Document], agent: Agent, tasks_
         task_table.add_column("#", width=4)
         task_table.add_column("Done", width=4)
         task_table.add_column("Text")
+        summaries = long_task_summaries(tasks, agent)
         for i, t in enumerate(tasks, start=1):
             if tasks_only and i > 1000:
                 break
-            task_table.add_row(str(i), '✔' if t.completed else '', t.text)
+            task_table.add_row(str(i), '✔' if t.completed else '', t.text + (f"\n↳ {summaries[i]}" if i in summaries else ''))
             # include up to 3 detail bullets per task as a simple inline note
             details = getattr(t, 'details', [])
             if details:
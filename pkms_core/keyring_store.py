@@ -1,39 +1,50 @@
 from __future__ import annotations
 import typing
 
-try:
-    import keyring
-except Exception:
-    keyring = None  # type: ignore
-
 SERVICE_NAME = "pkms_core_openai"
 
+_UNSET = object()
+keyring = _UNSET  # the `keyring` module (or None), imported on first use: its backends are slow to load
+
+def _keyring():
+    global keyring
+    if keyring is _UNSET:
+        try:
+            import keyring as _kr
+        except Exception:
+            _kr = None
+        keyring = _kr
+    return keyring
+
 def available() -> bool:
-    return keyring is not None
+    return _keyring() is not None
 
 def set_api_key(key: str) -> bool:
     """Store API key in OS keyring. Returns True on success, False otherwise."""
-    if not keyring:
+    kr = _keyring()
+    if not kr:
         return False
     try:
-        keyring.set_password(SERVICE_NAME, 'OPENAI_API_KEY', key)
+        kr.set_password(SERVICE_NAME, 'OPENAI_API_KEY', key)
         return True
     except Exception:
         return False
 
 def get_api_key() -> typing.Optional[str]:
-    if not keyring:
+    kr = _keyring()
+    if not kr:
         return None
     try:
-        return keyring.get_password(SERVICE_NAME, 'OPENAI_API_KEY')
+        return kr.get_password(SERVICE_NAME, 'OPENAI_API_KEY')
     except Exception:
         return None
 
 def delete_api_key() -> bool:
-    if not keyring:
+    kr = _keyring()
+    if not kr:
         return False
     try:
-        keyring.delete_password(SERVICE_NAME, 'OPENAI_API_KEY')
+        kr.delete_password(SERVICE_NAME, 'OPENAI_API_KEY')
         return True
     except Exception:
         return False
@@ -11,16 +11,22 @@ returned. This keeps demos and tests deterministic when no network/key is
 available.
 """
 
-try:
-    # Local import to avoid adding a hard dependency at package import time
-    from .llm_openai import OpenAIAdapter  # type: ignore
-except Exception:
-    OpenAIAdapter = None  # type: ignore
-
-try:
-    from .keyring_store import get_api_key
-except Exception:
-    get_api_key = None
+# The OpenAI adapter and the keyring are resolved on first use, not at import,
+# so commands that never talk to an LLM do not pay for `openai`/`keyring`.
+def openai_adapter_class():
+    """`OpenAIAdapter`, or None if it cannot be loaded."""
+    try:
+        from .llm_openai import OpenAIAdapter  # type: ignore
+        return OpenAIAdapter
+    except Exception:
+        return None
+
+def _keyring_api_key():
+    try:
+        from .keyring_store import get_api_key
+    except Exception:
+        return None
+    return get_api_key()
 
 
 class LLMAdapter:
@@ -29,15 +35,14 @@ class LLMAdapter:
     This adapter returns None for `summarize()` when no key is present; it can
     be used as a non-networked fallback so demos and tests remain deterministic.
     """
+    cacheable = False  # answers are a local word truncation (see llm_cache)
 
     def __init__(self):
         # Prefer key stored in OS keyring, then fall back to environment variables
-        kr_key = None
-        if callable(get_api_key):
-            try:
-                kr_key = get_api_key()
-            except Exception:
-                kr_key = None
+        try:
+            kr_key = _keyring_api_key()
+        except Exception:
+            kr_key = None
         self.key = kr_key or os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_KEY") or os.getenv("ANTHROPIC_KEY")
 
     def available(self) -> bool:
@@ -50,15 +55,34 @@ class LLMAdapter:
         return " ".join(words[:12]) + (" ...[llm]" if len(words) > 12 else " [llm]")
 
 
-def make_llm() -> object:
-    """Return an LLM adapter object.
+def make_llm(cache: bool = True, bypass: bool = False) -> object:
+    """Return an LLM adapter object, wrapped in the persistent response cache
+    (`llm_cache.cached`, lookups skipped with `bypass`) unless `cache` is false.
 
     Priority:
-    1. If `OpenAIAdapter` is available (module present) and env var present,
+    1. If an OpenAI key is set, the asyncio `AsyncOpenAIAdapter` (no SDK
+       needed; batches summaries concurrently). ``PKMS_LLM_ASYNC=0`` skips it.
+    2. If `OpenAIAdapter` is available (module present) and env var present,
        return an instantiated OpenAIAdapter.
-    2. Otherwise, return the simple `LLMAdapter` fallback.
+    3. Otherwise, return the simple `LLMAdapter` fallback.
     """
+    adapter = _select_llm()
+    if cache:
+        from .llm_cache import cached
+        adapter = cached(adapter, bypass=bypass)
+    return adapter
+
+def _select_llm() -> object:
+    if os.getenv("PKMS_LLM_ASYNC", "1") != "0":
+        try:
+            from .llm_async import AsyncOpenAIAdapter
+            adapter = AsyncOpenAIAdapter()
+            if adapter.available():
+                return adapter
+        except Exception:
+            pass
     # If OpenAIAdapter class exists, attempt to instantiate and confirm availability
+    OpenAIAdapter = openai_adapter_class()
     if OpenAIAdapter is not None:
         try:
             adapter = OpenAIAdapter()
@@ -71,4 +95,4 @@ def make_llm() -> object:
     return LLMAdapter()
 
 
-__all__ = ["LLMAdapter", "make_llm"]
\ No newline at end of file
+__all__ = ["LLMAdapter", "make_llm", "openai_adapter_class"]
\ No newline at end of file
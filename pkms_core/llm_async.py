@@ -0,0 +1,242 @@
+"""Asyncio OpenAI-compatible chat adapter with request fan-out.
+
+`AsyncOpenAIAdapter` talks to a Chat Completions endpoint over a small
+stdlib HTTP/1.1 client (`HTTPPool`) that keeps connections alive and reuses
+them across requests. At most `max_concurrency` requests are in flight at
+once (``PKMS_LLM_CONCURRENCY``, default 4). Transient failures (connection
+errors, timeouts, 408/409/429/5xx) are retried with exponential backoff and
+jitter via ``asyncio.sleep``, honouring ``Retry-After``.
+
+`summarize_many` and `summarize` are blocking wrappers so the adapter can
+be used wherever `OpenAIAdapter`/`LLMAdapter` are; `Agent.summarize_tasks`
+and `Agent.summarize_documents` send a whole batch through one event loop
+and connection pool.
+"""
+from __future__ import annotations
+import asyncio, json, os, random
+from typing import Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from .llm_openai import extract_text, summary_messages
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+DEFAULT_CONCURRENCY = 4
+# statuses worth retrying; any other error status fails immediately (bad key, bad request, ...)
+RETRY_STATUSES = {408, 409, 429}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, body: bytes = b"", retry_after: Optional[str] = None):
+        super().__init__(f"HTTP {status}")
+        self.status = status; self.body = body; self.retry_after = retry_after
+
+def run_sync(coro):
+    """Run `coro` to completion from synchronous code (also from inside a running loop)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # a loop is already running in this thread: use a private one on a worker thread
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, coro).result()
+
+_Conn = Tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+class HTTPPool:
+    """Keep-alive HTTP/1.1 connections per (scheme, host, port), bound to one event loop.
+
+    Idle connections are parked after each response and handed to the next
+    request; a parked connection the server has since closed is replaced
+    transparently. Switching event loops drops the parked connections.
+    """
+    def __init__(self, timeout: float = 30.0, max_idle: int = 16):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle: Dict[Tuple[str, str, int], List[_Conn]] = {}
+        self._loop = None
+        self.opened = 0   # connections opened so far
+    async def request(self, method: str, url: str, headers: Optional[Dict[str, str]] = None,
+                      body: bytes = b"") -> Tuple[int, Dict[str, str], bytes]:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._discard(); self._loop = loop
+        parts = urlsplit(url)
+        scheme = parts.scheme or "http"
+        key = (scheme, parts.hostname or "localhost", parts.port or (443 if scheme == "https" else 80))
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        head = [f"{method} {target} HTTP/1.1", f"Host: {parts.netloc}", f"Content-Length: {len(body)}", "Connection: keep-alive"]
+        head += [f"{k}: {v}" for k, v in (headers or {}).items()]
+        payload = ("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body
+        for attempt in (1, 2):
+            conn, reused = await self._acquire(key)
+            try:
+                status, resp_headers, data, keep = await asyncio.wait_for(self._roundtrip(conn, payload), self.timeout)
+            except (ConnectionError, asyncio.IncompleteReadError):
+                self._close(conn)
+                if reused and attempt == 1:
+                    continue  # the server closed a parked connection; retry on a fresh one
+                raise
+            except BaseException:
+                self._close(conn); raise
+            if keep and len(self._idle.get(key, ())) < self.max_idle:
+                self._idle.setdefault(key, []).append(conn)
+            else:
+                self._close(conn)
+            return status, resp_headers, data
+        raise ConnectionError("unreachable")  # pragma: no cover
+    async def _acquire(self, key) -> Tuple[_Conn, bool]:
+        idle = self._idle.get(key)
+        while idle:
+            conn = idle.pop()
+            if not conn[0].at_eof():
+                return conn, True
+            self._close(conn)
+        scheme, host, port = key
+        ssl_ctx = None
+        if scheme == "https":
+            import ssl
+            ssl_ctx = ssl.create_default_context()
+        conn = await asyncio.wait_for(asyncio.open_connection(host, port, ssl=ssl_ctx), self.timeout)
+        self.opened += 1
+        return conn, False
+    async def _roundtrip(self, conn: _Conn, payload: bytes):
+        reader, writer = conn
+        writer.write(payload); await writer.drain()
+        status_line = await reader.readline()
+        if not status_line:
+            raise ConnectionError("connection closed before the response")
+        version, status = status_line.decode("latin-1").split(None, 2)[:2]
+        headers: Dict[str, str] = {}
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = line.decode("latin-1").partition(":")
+            headers[k.strip().lower()] = v.strip()
+        keep = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        if "chunked" in headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await reader.readline()).split(b";")[0].strip() or b"0", 16)
+                if size == 0:
+                    while (await reader.readline()) not in (b"\r\n", b"\n", b""): pass
+                    break
+                chunks.append(await reader.readexactly(size)); await reader.readexactly(2)
+            data = b"".join(chunks)
+        elif "content-length" in headers:
+            data = await reader.readexactly(int(headers["content-length"]))
+        else:
+            data = await reader.read(); keep = False
+        return int(status), headers, data, keep
+    def _close(self, conn: _Conn) -> None:
+        try:
+            conn[1].close()
+        except Exception:
+            pass
+    def _discard(self) -> None:
+        for conns in self._idle.values():
+            for conn in conns: self._close(conn)
+        self._idle.clear()
+    async def aclose(self) -> None:
+        writers = [w for conns in self._idle.values() for _r, w in conns]
+        self._discard()
+        for w in writers:
+            try: await w.wait_closed()
+            except Exception: pass
+
+class AsyncOpenAIAdapter:
+    """Chat Completions over asyncio with bounded concurrency and connection reuse.
+
+    - Uses `OPENAI_API_KEY` or `OPENAI_KEY`, and `OPENAI_BASE_URL` for
+      OpenAI-compatible servers (default the OpenAI API).
+    - No third-party dependency: requests go through `HTTPPool`.
+    """
+    def __init__(self, model: str = "gpt-5-mini", api_key: Optional[str] = None, base_url: Optional[str] = None,
+                 max_concurrency: Optional[int] = None, timeout: float = 30.0, retries: int = 3,
+                 backoff_factor: float = 1.0, jitter: float = 0.5):
+        self.model = model
+        self.key = api_key or os.getenv("OPENAI_API_KEY") or os.getenv("OPENAI_KEY")
+        self.base_url = (base_url or os.getenv("OPENAI_BASE_URL") or DEFAULT_BASE_URL).rstrip("/")
+        if max_concurrency is None:
+            raw = os.getenv("PKMS_LLM_CONCURRENCY", "")
+            max_concurrency = int(raw) if raw.isdigit() else DEFAULT_CONCURRENCY
+        self.max_concurrency = max(1, max_concurrency)
+        self.retries = retries; self.backoff_factor = backoff_factor; self.jitter = jitter
+        self.pool = HTTPPool(timeout=timeout)
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._sem_loop = None
+    def available(self) -> bool:
+        return bool(self.key)
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._sem is None or self._sem_loop is not loop:
+            self._sem = asyncio.Semaphore(self.max_concurrency); self._sem_loop = loop
+        return self._sem
+    async def _post(self, path: str, payload: dict) -> dict:
+        headers = {"Content-Type": "application/json", "Authorization": f"Bearer {self.key}"}
+        status, resp_headers, data = await self.pool.request("POST", self.base_url + path, headers,
+                                                             json.dumps(payload).encode("utf-8"))
+        if status >= 400:
+            raise HTTPError(status, data, resp_headers.get("retry-after"))
+        return json.loads(data.decode("utf-8"))
+    def _delay(self, attempt: int, exc: Exception, backoff_factor: float) -> float:
+        delay = backoff_factor * (2 ** (attempt - 1)) + random.uniform(0, self.jitter)
+        retry_after = getattr(exc, "retry_after", None)
+        if retry_after:
+            try: delay = max(delay, float(retry_after))
+            except ValueError: pass
+        return delay
+    async def achat(self, messages: List[Dict[str, str]], max_tokens: int = 256, temperature: float = 0.2,
+                    retries: Optional[int] = None, backoff_factor: Optional[float] = None) -> Optional[str]:
+        """Async counterpart of `OpenAIAdapter.chat`: the first choice's text, or None on failure."""
+        if not self.available():
+            return None
+        retries = self.retries if retries is None else retries
+        backoff = self.backoff_factor if backoff_factor is None else backoff_factor
+        payload = {"model": self.model, "messages": messages, "max_tokens": max_tokens, "temperature": temperature}
+        async with self._semaphore():
+            for attempt in range(1, max(1, retries) + 1):
+                try:
+                    return extract_text(await self._post("/chat/completions", payload))
+                except HTTPError as exc:
+                    # authentication/invalid requests will not succeed by backing off
+                    if exc.status not in RETRY_STATUSES and exc.status < 500:
+                        return None
+                    if attempt >= retries: return None
+                    await asyncio.sleep(self._delay(attempt, exc, backoff))
+                except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as exc:
+                    if attempt >= retries: return None
+                    await asyncio.sleep(self._delay(attempt, exc, backoff))
+        return None
+    async def asummarize(self, text: str) -> Optional[str]:
+        return await self.achat(summary_messages(text), max_tokens=60, temperature=0.2)
+    async def asummarize_many(self, texts: Sequence[str]) -> List[Optional[str]]:
+        """One-sentence summaries of `texts`, in order, requested concurrently."""
+        return list(await asyncio.gather(*(self.asummarize(t) for t in texts)))
+    async def aclose(self) -> None:
+        await self.pool.aclose()
+    async def __aenter__(self) -> "AsyncOpenAIAdapter":
+        return self
+    async def __aexit__(self, *exc) -> None:
+        await self.aclose()
+    # blocking wrappers: each call runs one event loop and closes its connections afterwards
+    def summarize_many(self, texts: Sequence[str]) -> List[Optional[str]]:
+        if not texts or not self.available():
+            return [None] * len(texts)
+        async def batch():
+            try:
+                return await self.asummarize_many(texts)
+            finally:
+                await self.aclose()
+        return run_sync(batch())
+    def summarize(self, text: str) -> Optional[str]:
+        return self.summarize_many([text])[0]
+    def chat(self, messages: List[Dict[str, str]], **kw) -> Optional[str]:
+        async def one():
+            try:
+                return await self.achat(messages, **kw)
+            finally:
+                await self.aclose()
+        return run_sync(one()) if self.available() else None
+
+__all__ = ["AsyncOpenAIAdapter", "HTTPPool", "HTTPError", "run_sync"]
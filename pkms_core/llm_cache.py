@@ -0,0 +1,155 @@
+"""Persistent LLM response cache.
+
+`CachedLLM` wraps any adapter with the `available()`/`summarize()`
+interface (`OpenAIAdapter`, `AsyncOpenAIAdapter`, ...) and stores non-empty answers in `ResponseCache`, a SQLite table keyed by a
+SHA-256 of the adapter, model and prompt. Repeated prompts (task/document
+summaries, the chat `advise` prompt) are answered from disk instead of
+another LLM round trip. Adapters that answer locally (`LLMAdapter`,
+`MockLLM`; ``cacheable = False``) are left unwrapped: their answers cost
+less to recompute than to look up.
+
+- Entries expire after ``PKMS_LLM_CACHE_TTL`` seconds (default 7 days).
+- At most ``PKMS_LLM_CACHE_SIZE`` entries (default 2000) are kept; the least
+  recently used ones are evicted first.
+- Hit/miss counters are persisted next to the entries (`pkms info` shows them).
+- ``bypass`` (``pkms --no-llm-cache ...``) skips lookups but still stores the
+  fresh answers; ``PKMS_LLM_CACHE=0`` disables the cache altogether.
+"""
+from __future__ import annotations
+import hashlib, json, os, threading, time
+from typing import Dict, List, Optional, Sequence
+
+CACHE_NAME = 'llm_cache.db'
+DEFAULT_TTL = 7 * 24 * 3600.0
+DEFAULT_MAX_ENTRIES = 2000
+
+def _env_number(name: str, default: float) -> float:
+    try:
+        return float(os.environ[name])
+    except (KeyError, ValueError):
+        return default
+
+def cache_path(base_dir: Optional[str] = None) -> str:
+    """``PKMS_LLM_CACHE_PATH`` or ``app_data/llm_cache.db`` under `base_dir` (default: cwd)."""
+    return os.environ.get('PKMS_LLM_CACHE_PATH') or os.path.join(os.path.abspath(base_dir or os.getcwd()), 'app_data', CACHE_NAME)
+
+def prompt_key(model: str, kind: str, prompt, **params) -> str:
+    """Stable hash of what determines an LLM answer."""
+    raw = json.dumps([model, kind, prompt, params], sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """SQLite key -> response store with TTL expiry and LRU eviction."""
+    def __init__(self, path: str, ttl: Optional[float] = None, max_entries: Optional[int] = None):
+        from .storage import _open_sqlite
+        self.path = path
+        self.ttl = _env_number('PKMS_LLM_CACHE_TTL', DEFAULT_TTL) if ttl is None else ttl
+        self.max_entries = int(_env_number('PKMS_LLM_CACHE_SIZE', DEFAULT_MAX_ENTRIES) if max_entries is None else max_entries)
+        self.hits = 0; self.misses = 0   # this process; persisted totals are in stats()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = _open_sqlite(path)
+        with self._db as conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, model TEXT, response TEXT NOT NULL,"
+                         " created REAL NOT NULL, used REAL NOT NULL)")
+            conn.execute("CREATE INDEX IF NOT EXISTS responses_used ON responses(used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS counters (name TEXT PRIMARY KEY, value INTEGER NOT NULL)")
+    def _count(self, conn, name: str) -> None:
+        conn.execute("INSERT INTO counters(name, value) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET value = value + 1", (name,))
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock, self._db as conn:
+            row = conn.execute("SELECT response, created FROM responses WHERE key=?", (key,)).fetchone()
+            if row is not None and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM responses WHERE key=?", (key,)); row = None
+            if row is None:
+                self.misses += 1; self._count(conn, 'misses')
+                return None
+            conn.execute("UPDATE responses SET used=? WHERE key=?", (now, key))
+            self.hits += 1; self._count(conn, 'hits')
+            return row[0]
+    def put(self, key: str, response: str, model: str = '') -> None:
+        now = time.time()
+        with self._lock, self._db as conn:
+            conn.execute("INSERT OR REPLACE INTO responses(key, model, response, created, used) VALUES (?, ?, ?, ?, ?)",
+                         (key, model, response, now, now))
+            conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+            conn.execute("DELETE FROM responses WHERE key IN (SELECT key FROM responses ORDER BY used DESC LIMIT -1 OFFSET ?)",
+                         (max(0, self.max_entries),))
+    def stats(self) -> Dict[str, int]:
+        """Entry count and persisted hit/miss totals."""
+        with self._lock:
+            counts = dict(self._db.execute("SELECT name, value FROM counters").fetchall())
+            entries = self._db.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        return {'entries': entries, 'hits': counts.get('hits', 0), 'misses': counts.get('misses', 0)}
+    def clear(self) -> None:
+        with self._lock, self._db as conn:
+            conn.execute("DELETE FROM responses"); conn.execute("DELETE FROM counters")
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+class CachedLLM:
+    """An LLM adapter answering repeated prompts from a `ResponseCache`.
+
+    Other attributes are delegated to the wrapped adapter. `chat` and
+    `summarize_many` exist only when the wrapped adapter has them; a batch
+    only sends its misses.
+    """
+    def __init__(self, llm, cache: ResponseCache, bypass: bool = False):
+        self.llm = llm
+        self.cache = cache
+        self.bypass = bypass
+        self.model = f"{type(llm).__name__}:{getattr(llm, 'model', '')}"
+        if hasattr(llm, 'chat'):
+            self.chat = self._chat
+        if hasattr(llm, 'summarize_many'):
+            self.summarize_many = self._summarize_many
+    def __getattr__(self, name):
+        if name == 'llm':
+            raise AttributeError(name)
+        return getattr(self.llm, name)
+    def available(self) -> bool:
+        return bool(getattr(self.llm, 'available', lambda: False)())
+    def _lookup(self, key: str) -> Optional[str]:
+        return None if self.bypass else self.cache.get(key)
+    def _store(self, key: str, response: Optional[str]) -> Optional[str]:
+        if response:
+            self.cache.put(key, response, self.model)
+        return response
+    def summarize(self, text: str) -> Optional[str]:
+        key = prompt_key(self.model, 'summarize', text)
+        hit = self._lookup(key)
+        return hit if hit is not None else self._store(key, self.llm.summarize(text))
+    def _chat(self, messages: List[Dict[str, str]], **kw) -> Optional[str]:
+        # retry settings do not change the answer
+        params = {k: v for k, v in kw.items() if k not in ('retries', 'backoff_factor')}
+        key = prompt_key(self.model, 'chat', messages, **params)
+        hit = self._lookup(key)
+        return hit if hit is not None else self._store(key, self.llm.chat(messages, **kw))
+    def _summarize_many(self, texts: Sequence[str]) -> List[Optional[str]]:
+        keys = [prompt_key(self.model, 'summarize', t) for t in texts]
+        out = [self._lookup(k) for k in keys]
+        todo = [i for i, r in enumerate(out) if r is None]
+        if todo:
+            for i, r in zip(todo, self.llm.summarize_many([texts[i] for i in todo])):
+                out[i] = self._store(keys[i], r)
+        return out
+
+def cached(llm, base_dir: Optional[str] = None, bypass: bool = False):
+    """Wrap `llm` in a `CachedLLM` backed by `cache_path(base_dir)`.
+
+    Adapters without a key or with ``cacheable = False`` are returned
+    unwrapped, as is everything when ``PKMS_LLM_CACHE=0`` or the database
+    cannot be opened.
+    """
+    if os.environ.get('PKMS_LLM_CACHE', '1') == '0' or not getattr(llm, 'cacheable', True):
+        return llm
+    if not getattr(llm, 'available', lambda: False)():
+        return llm
+    try:
+        return CachedLLM(llm, ResponseCache(cache_path(base_dir)), bypass=bypass)
+    except Exception:
+        return llm
+
+__all__ = ["CachedLLM", "ResponseCache", "cached", "cache_path", "prompt_key"]
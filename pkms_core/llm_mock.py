@@ -4,6 +4,8 @@ class MockLLM:
     """Simple mock LLM adapter used for demos when no API key is present.
     Interface mirrors the real LLMAdapter: .available() and .summarize(text).
     """
+    cacheable = False
+
     def __init__(self):
         pass
 
@@ -5,6 +5,34 @@ import random
 from typing import List, Dict, Optional
 
 
+def extract_text(resp) -> Optional[str]:
+    """Text of the first choice of a chat completion (SDK object or parsed JSON)."""
+    try:
+        if hasattr(resp, "choices"):
+            choice = resp.choices[0]
+        else:
+            choice = resp.get("choices", [{}])[0]
+
+        if hasattr(choice, "message"):
+            msg = choice.message
+            if isinstance(msg, dict):
+                return msg.get("content")
+            # some SDK versions provide a Message object with .content
+            return getattr(msg, "content", None)
+
+        if isinstance(choice, dict):
+            return choice.get("message", {}).get("content") or choice.get("text")
+    except Exception:
+        return None
+    return None
+
+
+def summary_messages(text: str) -> List[Dict[str, str]]:
+    """The chat messages used to ask for a one-sentence summary of `text`."""
+    return [{"role": "system", "content": "You are a concise summarizer."},
+            {"role": "user", "content": f"Summarize the following text in one short sentence:\n\n{text}"}]
+
+
 class OpenAIAdapter:
     """A lightweight OpenAI Chat Completions adapter with retry/backoff.
 
@@ -33,24 +61,7 @@ class OpenAIAdapter:
         return self._client is not None
 
     def _extract_text_from_response(self, resp) -> Optional[str]:
-        try:
-            if hasattr(resp, "choices"):
-                choice = resp.choices[0]
-            else:
-                choice = resp.get("choices", [{}])[0]
-
-            if hasattr(choice, "message"):
-                msg = choice.message
-                if isinstance(msg, dict):
-                    return msg.get("content")
-                # some SDK versions provide a Message object with .content
-                return getattr(msg, "content", None)
-
-            if isinstance(choice, dict):
-                return choice.get("message", {}).get("content") or choice.get("text")
-        except Exception:
-            return None
-        return None
+        return extract_text(resp)
 
     def chat(
         self,
@@ -104,9 +115,7 @@ class OpenAIAdapter:
     def summarize(self, text: str) -> Optional[str]:
         if not self.available():
             return None
-        system = {"role": "system", "content": "You are a concise summarizer."}
-        user = {"role": "user", "content": f"Summarize the following text in one short sentence:\n\n{text}"}
-        return self.chat([system, user], max_tokens=60, temperature=0.2)
+        return self.chat(summary_messages(text), max_tokens=60, temperature=0.2)
 
 
-__all__ = ["OpenAIAdapter"]
+__all__ = ["OpenAIAdapter", "extract_text", "summary_messages"]
@@ -1,9 +1,11 @@
 from __future__ import annotations
 import logging
 
+LOG_FORMAT = '[%(levelname)s] %(message)s'
+
 def init_logging(verbose: bool = False):
     level = logging.DEBUG if verbose else logging.INFO
-    logging.basicConfig(level=level, format='[%(levelname)s] %(message)s')
+    logging.basicConfig(level=level, format=LOG_FORMAT)
     return logging.getLogger('pkms')
 
-__all__ = ["init_logging"]
\ No newline at end of file
+__all__ = ["init_logging", "LOG_FORMAT"]
\ No newline at end of file
@@ -1,7 +1,34 @@
 from __future__ import annotations
-from dataclasses import dataclass, asdict, field
+import sys
+from datetime import datetime, timezone
+from dataclasses import dataclass, asdict, field, fields
 from typing import List, Dict, Optional
 
+def _slotted(cls):
+    """Rebuild a dataclass with ``__slots__`` (``dataclass(slots=True)`` needs Python 3.10+).
+
+    Instances drop their per-object ``__dict__``; the dataclass API (fields, asdict,
+    replace, eq/repr) is unchanged because defaults already live in ``__init__``.
+    Names listed in ``_cache_slots`` get extra (non-field) slots for derived values.
+    """
+    names = tuple(f.name for f in fields(cls)) + tuple(cls.__dict__.get('_cache_slots', ()))
+    ns = {k: v for k, v in cls.__dict__.items() if k not in names and k not in ('__dict__', '__weakref__')}
+    ns['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, ns)
+
+def parse_created(value) -> Optional[datetime]:
+    """Parse an ISO timestamp as an aware datetime (naive means UTC); None if unparseable."""
+    try:
+        dt = datetime.fromisoformat(value)
+    except Exception:
+        return None
+    return dt.replace(tzinfo=timezone.utc) if dt.tzinfo is None else dt
+
+def intern_tags(tags) -> List[str]:
+    """Intern tag strings so large stores share one object per distinct tag."""
+    return [sys.intern(g) if type(g) is str else g for g in tags] if tags else []
+
+@_slotted
 @dataclass
 class Task:
     id: int
@@ -11,10 +38,30 @@ class Task:
     details: List[str] = field(default_factory=list)
     priority: int = 3
     tags: List[str] = field(default_factory=list)
+    _cache_slots = ('_created_at',)
+
+    def created_at(self) -> Optional[datetime]:
+        """`created` as an aware datetime, parsed once and cached until `created` changes."""
+        try:
+            raw, dt = self._created_at
+            if raw == self.created: return dt
+        except AttributeError:
+            pass
+        dt = parse_created(self.created)
+        self._created_at = (self.created, dt)
+        return dt
 
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # hand-written: asdict() deep-copies recursively and dominates large saves
+        return {'id': self.id, 'text': self.text, 'created': self.created, 'completed': self.completed,
+                'details': list(self.details), 'priority': self.priority, 'tags': list(self.tags)}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Task":
+        return cls(id=d['id'], text=d['text'], created=d['created'], completed=d.get('completed', False),
+                   details=d.get('details') or [], priority=d.get('priority', 3), tags=intern_tags(d.get('tags')))
 
+@_slotted
 @dataclass
 class Note:
     id: int
@@ -24,7 +71,12 @@ class Note:
     task_id: Optional[int] = None
 
     def to_dict(self) -> Dict:
-        return asdict(self)
+        return {'id': self.id, 'text': self.text, 'created': self.created,
+                'details': list(self.details), 'task_id': self.task_id}
+
+    @classmethod
+    def from_dict(cls, d: Dict) -> "Note":
+        return cls(id=d['id'], text=d['text'], created=d['created'], details=d.get('details') or [], task_id=d.get('task_id'))
 @dataclass
 class Document:
     id: int
@@ -0,0 +1,636 @@
+from __future__ import annotations
+import gc, heapq, json, math, mmap, os, re, struct
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple, Union
+
+STOPWORDS = {"the","and","or","of","a","to","in","for","on","is","it"}
+_SPLIT = re.compile(r"[^A-Za-z0-9]+")
+_PHRASE = re.compile(r'"([^"]*)"')
+
+# Ranking: BM25 over a boosted term frequency (a title hit counts TITLE_BOOST
+# times a body hit) and the unweighted document length in tokens.
+BM25_K1 = 1.2
+BM25_B = 0.75
+TITLE_BOOST = 2.0
+TAG_BOOST = 1.5
+
+Fields = Union[str, Sequence[Tuple[str, float]]]
+
+def tokenize(text: str) -> List[str]:
+    """Lower-case alphanumeric tokens with stopwords removed."""
+    return [t for t in _SPLIT.split(text.lower()) if t and t not in STOPWORDS]
+
+def document_fields(doc) -> List[Tuple[str, float]]:
+    """The indexed fields of a document with their boosts: title, body and tags."""
+    return [(doc.title, TITLE_BOOST), (doc.text, 1.0), (" ".join(doc.tags), TAG_BOOST)]
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """Split a query into scoring terms and quoted phrases (as token lists)."""
+    phrases = [toks for toks in (tokenize(m) for m in _PHRASE.findall(query)) if toks]
+    terms = tokenize(_PHRASE.sub(" ", query)) + [t for p in phrases for t in p]
+    return list(dict.fromkeys(terms)), phrases
+
+def _analyze(fields: Fields):
+    """Return ({term: [boosted tf, positions]}, length). Each field starts one
+    position past the previous one so phrases never span fields."""
+    if isinstance(fields, str):
+        fields = [(fields, 1.0)]
+    per_term: Dict[str, list] = {}
+    pos = length = 0
+    for text, boost in fields:
+        for tok in tokenize(text):
+            e = per_term.get(tok)
+            if e is None: e = per_term[tok] = [0.0, []]
+            e[0] += boost; e[1].append(pos)
+            pos += 1; length += 1
+        pos += 1
+    return per_term, length
+
+class InvertedIndex:
+    """Term -> {doc id: (boosted tf, positions)} postings plus a forward
+    doc id -> terms map and per-document lengths.
+
+    The forward map lets `remove`/`update` touch only the postings of the
+    affected document instead of re-tokenizing the whole corpus.
+    """
+    def __init__(self):
+        self._postings: Dict[str, Dict[int, Tuple[float, Tuple[int, ...]]]] = {}
+        self._forward: Dict[int, FrozenSet[str]] = {}
+        self._lengths: Dict[int, int] = {}
+        self._total = 0
+    def __len__(self) -> int:
+        return len(self._forward)
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self._forward
+    def add(self, doc_id: int, fields: Fields) -> None:
+        if doc_id in self._forward:
+            self.remove(doc_id)
+        per_term, length = _analyze(fields)
+        self._forward[doc_id] = frozenset(per_term)
+        self._lengths[doc_id] = length; self._total += length
+        for term, (tf, positions) in per_term.items():
+            self._postings.setdefault(term, {})[doc_id] = (tf, tuple(positions))
+    def remove(self, doc_id: int) -> bool:
+        terms = self._forward.pop(doc_id, None)
+        if terms is None:
+            return False
+        self._total -= self._lengths.pop(doc_id, 0)
+        for term in terms:
+            posts = self._postings.get(term)
+            if posts is None: continue
+            posts.pop(doc_id, None)
+            if not posts: del self._postings[term]
+        return True
+    def update(self, doc_id: int, fields: Fields) -> None:
+        self.add(doc_id, fields)
+    def postings(self, term: str) -> Dict[int, float]:
+        return {d: tf for d, (tf, _p) in self._postings.get(term, {}).items()}
+    def positions(self, term: str, doc_id: int) -> Tuple[int, ...]:
+        e = self._postings.get(term, {}).get(doc_id)
+        return e[1] if e else ()
+    def get(self, term: str) -> Set[int]:
+        return set(self._postings.get(term, ()))
+    def doc_length(self, doc_id: int) -> int:
+        return self._lengths.get(doc_id, 0)
+    def stats(self) -> Tuple[int, int]:
+        """(document count, total length in tokens)."""
+        return len(self._forward), self._total
+    def terms(self) -> Iterable[str]:
+        return self._postings.keys()
+    def term_positions(self, term: str, doc_ids: Set[int]) -> Dict[int, Tuple[int, ...]]:
+        posts = self._postings.get(term, {})
+        return {d: posts[d][1] for d in doc_ids if d in posts}
+    @classmethod
+    def build(cls, items: Iterable[Tuple[int, Fields]]) -> "InvertedIndex":
+        idx = cls()
+        # millions of small postings tuples; cyclic GC passes would only rescan them
+        enabled = gc.isenabled(); gc.disable()
+        try:
+            for doc_id, fields in items:
+                idx.add(doc_id, fields)
+        finally:
+            if enabled: gc.enable()
+        return idx
+
+def bm25_scores(index, terms: Iterable[str], k1: float = BM25_K1, b: float = BM25_B) -> Dict[int, float]:
+    """BM25 score per document containing at least one of `terms`."""
+    n, total = index.stats()
+    if not n:
+        return {}
+    avg = (total / n) or 1.0
+    scores: Dict[int, float] = {}
+    norms: Dict[int, float] = {}
+    doc_length = index.doc_length
+    for term in dict.fromkeys(terms):
+        posts = index.postings(term)
+        if not posts: continue
+        df = len(posts)
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for doc_id, tf in posts.items():
+            norm = norms.get(doc_id)
+            if norm is None:
+                norm = norms[doc_id] = k1 * (1 - b + b * doc_length(doc_id) / avg)
+            scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (k1 + 1) / (tf + norm)
+    return scores
+
+def top_k(scores: Dict[int, float], limit: Optional[int] = None, offset: int = 0) -> List[Tuple[int, float]]:
+    """The (id, score) page [offset, offset + limit) in rank order (score desc, id asc).
+
+    With a limit only offset + limit entries are selected with a heap, instead
+    of sorting every match.
+    """
+    key = lambda kv: (-kv[1], kv[0])
+    if limit is None:
+        return sorted(scores.items(), key=key)[offset:]
+    return heapq.nsmallest(offset + limit, scores.items(), key=key)[offset:]
+
+def phrase_matches(index, tokens: List[str]) -> Set[int]:
+    """Ids of documents containing `tokens` at consecutive positions."""
+    cands: Optional[Set[int]] = None
+    for t in tokens:
+        ids = set(index.postings(t))
+        cands = ids if cands is None else cands & ids
+        if not cands: return set()
+    if cands is None or len(tokens) == 1:
+        return cands or set()
+    first = index.term_positions(tokens[0], cands)
+    rest = [index.term_positions(t, cands) for t in tokens[1:]]
+    out = set()
+    for d in cands:
+        following = [set(r.get(d, ())) for r in rest]
+        if any(all(p + i + 1 in s for i, s in enumerate(following)) for p in first.get(d, ())):
+            out.add(d)
+    return out
+
+# Fuzzy matching: a trigram index over the vocabulary (not the records) gives
+# the candidate terms for a query token; candidates are verified with a bounded
+# edit distance and mapped back to record keys through per-term postings.
+FUZZY_MAX_DISTANCE = 2
+
+def levenshtein(a: str, b: str, max_dist: Optional[int] = None, prefix: bool = False) -> int:
+    """Edit distance between `a` and `b` (with ``prefix=True``, between `a` and the
+    closest prefix of `b`). Stops early once every path exceeds `max_dist` and
+    then returns ``max_dist + 1``."""
+    cap = max_dist if max_dist is not None else len(a) + len(b)
+    if prefix:
+        b = b[:len(a) + cap]  # a closer prefix is never longer than this
+    elif abs(len(a) - len(b)) > cap:
+        return cap + 1
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > cap:
+            return cap + 1
+        prev = cur
+    d = min(prev) if prefix else prev[-1]
+    return d if d <= cap else cap + 1
+
+def trigrams(term: str, prefix: bool = False) -> Set[str]:
+    """Padded trigrams of `term`: ``$$`` marks the start so short terms and
+    prefixes still produce grams; the trailing ``$`` is omitted for prefixes."""
+    s = "$$" + term + ("" if prefix else "$")
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+def fuzzy_budget(token: str, max_distance: int) -> int:
+    """Edits allowed for `token`: at most one per three characters, so short
+    tokens do not match half the vocabulary."""
+    return max(0, min(max_distance, len(token) // 3))
+
+class TrigramIndex:
+    """Typo-tolerant, prefix-aware search over keyed text.
+
+    Each distinct term gets an id; trigram -> term ids drives candidate
+    generation (a term within d edits shares all but 3*d of the query's grams),
+    and term id -> record keys maps matches back. When the gram filter is
+    too weak to prune (three-letter tokens with one edit allowed) the
+    vocabulary terms of plausible length are checked instead.
+    """
+    def __init__(self):
+        self._term_ids: Dict[str, int] = {}
+        self._terms: List[str] = []
+        self._grams: Dict[str, Set[int]] = {}
+        self._by_len: Dict[int, List[int]] = {}
+        self._postings: List[Set] = []
+        self._forward: Dict[object, FrozenSet[int]] = {}
+        self._order: Dict[object, int] = {}
+        self._seq = 0
+    def __len__(self) -> int:
+        return len(self._forward)
+    def __contains__(self, key) -> bool:
+        return key in self._forward
+    def _term_id(self, term: str) -> int:
+        tid = self._term_ids.get(term)
+        if tid is None:
+            tid = self._term_ids[term] = len(self._terms)
+            self._terms.append(term); self._postings.append(set())
+            self._by_len.setdefault(len(term), []).append(tid)
+            for g in trigrams(term):
+                self._grams.setdefault(g, set()).add(tid)
+        return tid
+    def add(self, key, text: str) -> None:
+        if key in self._forward:
+            self.remove(key)
+        tids = frozenset(self._term_id(t) for t in tokenize(text))
+        for tid in tids:
+            self._postings[tid].add(key)
+        self._forward[key] = tids
+        self._order[key] = self._seq; self._seq += 1
+    def remove(self, key) -> bool:
+        tids = self._forward.pop(key, None)
+        if tids is None:
+            return False
+        del self._order[key]
+        # terms stay in the vocabulary; an empty posting set simply matches nothing
+        for tid in tids:
+            self._postings[tid].discard(key)
+        return True
+    def update(self, key, text: str) -> None:
+        self.add(key, text)
+    def match_terms(self, token: str, max_distance: int = FUZZY_MAX_DISTANCE, prefix: bool = True) -> Dict[str, int]:
+        """Vocabulary terms within the edit budget of `token` -> their distance.
+        With `prefix`, a term matches when one of its prefixes is close enough."""
+        d = fuzzy_budget(token, max_distance)
+        grams = trigrams(token, prefix=prefix)
+        need = len(grams) - 3 * d
+        if need > 0:
+            counts: Dict[int, int] = {}
+            for g in grams:
+                for tid in self._grams.get(g, ()):
+                    counts[tid] = counts.get(tid, 0) + 1
+            cands = [tid for tid, c in counts.items() if c >= need]
+        else:
+            hi = max(self._by_len, default=0) if prefix else len(token) + d
+            cands = [tid for n in range(max(1, len(token) - d), hi + 1) for tid in self._by_len.get(n, ())]
+        out: Dict[str, int] = {}
+        for tid in cands:
+            term = self._terms[tid]
+            dist = 0 if prefix and term.startswith(token) else levenshtein(token, term, d, prefix=prefix)
+            if dist <= d and self._postings[tid]:
+                out[term] = dist
+        return out
+    def search(self, query: str, max_distance: int = FUZZY_MAX_DISTANCE, prefix: bool = True,
+               limit: Optional[int] = None, offset: int = 0) -> List:
+        """Keys whose text matches every query token (fuzzily), ordered by total
+        edit distance and then insertion order."""
+        best: Optional[Dict[object, int]] = None
+        for token in dict.fromkeys(tokenize(query)):
+            hits: Dict[object, int] = {}
+            for term, dist in self.match_terms(token, max_distance, prefix).items():
+                for key in self._postings[self._term_ids[term]]:
+                    if best is not None and key not in best: continue
+                    if dist < hits.get(key, dist + 1): hits[key] = dist
+            best = hits if best is None else {k: best[k] + dist for k, dist in hits.items()}
+            if not best: return []
+        if not best:
+            return []
+        order = self._order
+        key = lambda k: (best[k], order[k])
+        if limit is None:
+            return sorted(best, key=key)[offset:]
+        return heapq.nsmallest(offset + limit, best, key=key)[offset:]
+    @classmethod
+    def build(cls, items: Iterable[Tuple[object, str]]) -> "TrigramIndex":
+        idx = cls()
+        enabled = gc.isenabled(); gc.disable()
+        try:
+            for key, text in items:
+                idx.add(key, text)
+        finally:
+            if enabled: gc.enable()
+        return idx
+
+# Persisted index: `<name>.idx` next to the JSON snapshot, memory-mapped on open.
+# Layout: header | doc table (id, length) sorted by id | entry table (one per
+# term, sorted by term) | UTF-8 term blob | posting columns (doc ids, boosted
+# tf, position offsets, position counts) | positions. All integers are
+# little-endian uint32 and tf is float32. The header carries the (mtime_ns,
+# size) signature of the snapshot and its journal; a mismatch means the index
+# is stale and is rebuilt from the documents.
+INDEX_MAGIC = b"PKMSIDX\0"
+INDEX_VERSION = 2
+# magic, version, signature, doc count, max id, term count, term blob size, posting count, position count, total length
+_HEADER = struct.Struct("<8sI4qIIIQQQQ")
+_DOC = struct.Struct("<II")            # doc id, length
+_ENTRY = struct.Struct("<IIII")        # term offset, term length, first posting, posting count
+
+def index_path(snapshot_path: str) -> str:
+    return os.path.splitext(snapshot_path)[0] + ".idx"
+
+def index_signature(snapshot_path: str, journal_suffix: str = ".journal") -> Tuple[int, int, int, int]:
+    """(mtime_ns, size) of the snapshot and of its journal; zeros for missing files."""
+    sig: List[int] = []
+    for p in (snapshot_path, snapshot_path + journal_suffix):
+        try:
+            st = os.stat(p); sig += [st.st_mtime_ns, st.st_size]
+        except OSError:
+            sig += [0, 0]
+    return tuple(sig)
+
+def write_index(path: str, index: InvertedIndex, signature: Tuple[int, int, int, int], max_id: int) -> None:
+    """Serialize `index` atomically (write to a temp file, then rename); any
+    delta against the previous index is dropped."""
+    terms = sorted(index._postings)
+    entries = bytearray(); blob = bytearray()
+    docs: List[int] = []; tfs: List[float] = []; offs: List[int] = []; counts: List[int] = []; positions: List[int] = []
+    for term in terms:
+        raw = term.encode("utf-8")
+        posts = index._postings[term]
+        entries += _ENTRY.pack(len(blob), len(raw), len(docs), len(posts))
+        blob += raw
+        for doc_id in sorted(posts):
+            tf, pos = posts[doc_id]
+            docs.append(doc_id); tfs.append(tf); offs.append(len(positions)); counts.append(len(pos))
+            positions.extend(pos)
+    lengths = sorted(index._lengths.items())
+    n = len(docs)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as fh:
+        fh.write(_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, *signature, len(lengths), max_id, len(terms), len(blob),
+                              n, len(positions), index._total))
+        fh.write(struct.pack(f"<{2 * len(lengths)}I", *(v for pair in lengths for v in pair)))
+        fh.write(entries); fh.write(blob)
+        fh.write(struct.pack(f"<{n}I", *docs)); fh.write(struct.pack(f"<{n}f", *tfs))
+        fh.write(struct.pack(f"<{n}I", *offs)); fh.write(struct.pack(f"<{n}I", *counts))
+        fh.write(struct.pack(f"<{len(positions)}I", *positions))
+    os.replace(tmp, path)
+    try: os.remove(delta_path(path))
+    except OSError: pass
+
+class MappedIndex:
+    """Read-only view of a persisted index; terms are binary-searched in the mmap.
+
+    Opening costs a header read regardless of corpus size; postings are only
+    decoded for the terms a query touches, and the doc length table on the
+    first scored query.
+    """
+    def __init__(self, fh, mm: mmap.mmap, header: tuple):
+        self._fh = fh; self._mm = mm
+        self.doc_count, self.max_id, self._nterms, blob_size, self._nposts, npositions, self._total = header[6:13]
+        self._docs = _HEADER.size
+        self._entries = self._docs + self.doc_count * _DOC.size
+        self._blob = self._entries + self._nterms * _ENTRY.size
+        col = self._blob + blob_size
+        self._post_docs, self._post_tf, self._post_off, self._post_cnt = (col + i * 4 * self._nposts for i in range(4))
+        self._positions = col + 16 * self._nposts
+        self._npositions = npositions
+        self._lengths: Optional[Dict[int, int]] = None
+    @classmethod
+    def open(cls, path: str, signature: Tuple[int, int, int, int]) -> Optional["MappedIndex"]:
+        """Map `path` if it exists, is well-formed and matches `signature`; else None."""
+        try:
+            fh = open(path, "rb")
+        except OSError:
+            return None
+        try:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            fh.close(); return None
+        try:
+            header = _HEADER.unpack_from(mm, 0)
+        except struct.error:
+            header = None
+        if not header or header[0] != INDEX_MAGIC or header[1] != INDEX_VERSION or tuple(header[2:6]) != tuple(signature):
+            mm.close(); fh.close(); return None
+        return cls(fh, mm, header)
+    def close(self) -> None:
+        self._mm.close(); self._fh.close()
+    def __len__(self) -> int:
+        return self.doc_count
+    def _term(self, i: int) -> bytes:
+        off, n, _p, _c = _ENTRY.unpack_from(self._mm, self._entries + i * _ENTRY.size)
+        return self._mm[self._blob + off:self._blob + off + n]
+    def _find(self, term: str) -> Optional[Tuple[int, int]]:
+        """(first posting, posting count) for `term`, or None."""
+        key = term.encode("utf-8")
+        lo, hi = 0, self._nterms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._term(mid) < key: lo = mid + 1
+            else: hi = mid
+        if lo == self._nterms or self._term(lo) != key:
+            return None
+        return _ENTRY.unpack_from(self._mm, self._entries + lo * _ENTRY.size)[2:]
+    def postings(self, term: str) -> Dict[int, float]:
+        found = self._find(term)
+        if not found: return {}
+        p, c = found
+        docs = struct.unpack_from(f"<{c}I", self._mm, self._post_docs + 4 * p)
+        tfs = struct.unpack_from(f"<{c}f", self._mm, self._post_tf + 4 * p)
+        return dict(zip(docs, tfs))
+    def positions(self, term: str, doc_id: int) -> Tuple[int, ...]:
+        found = self._find(term)
+        if not found: return ()
+        lo, hi = found[0], found[0] + found[1]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if struct.unpack_from("<I", self._mm, self._post_docs + 4 * mid)[0] < doc_id: lo = mid + 1
+            else: hi = mid
+        if lo == found[0] + found[1] or struct.unpack_from("<I", self._mm, self._post_docs + 4 * lo)[0] != doc_id:
+            return ()
+        off, = struct.unpack_from("<I", self._mm, self._post_off + 4 * lo)
+        cnt, = struct.unpack_from("<I", self._mm, self._post_cnt + 4 * lo)
+        return struct.unpack_from(f"<{cnt}I", self._mm, self._positions + 4 * off)
+    def term_positions(self, term: str, doc_ids: Set[int]) -> Dict[int, Tuple[int, ...]]:
+        """Positions of `term` in each of `doc_ids` (one term lookup for all)."""
+        found = self._find(term)
+        if not found: return {}
+        p, c = found
+        docs = struct.unpack_from(f"<{c}I", self._mm, self._post_docs + 4 * p)
+        offs = struct.unpack_from(f"<{c}I", self._mm, self._post_off + 4 * p)
+        cnts = struct.unpack_from(f"<{c}I", self._mm, self._post_cnt + 4 * p)
+        mm, base = self._mm, self._positions
+        return {d: struct.unpack_from(f"<{n}I", mm, base + 4 * o) for d, o, n in zip(docs, offs, cnts) if d in doc_ids}
+    def get(self, term: str) -> Set[int]:
+        return set(self.postings(term))
+    def _doc_lengths(self) -> Dict[int, int]:
+        if self._lengths is None:
+            flat = struct.unpack_from(f"<{2 * self.doc_count}I", self._mm, self._docs)
+            self._lengths = dict(zip(flat[::2], flat[1::2]))
+        return self._lengths
+    def __contains__(self, doc_id: int) -> bool:
+        if self._lengths is not None:
+            return doc_id in self._lengths
+        # binary search of the id-sorted doc table: a membership check does not decode it
+        lo, hi = 0, self.doc_count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if _DOC.unpack_from(self._mm, self._docs + mid * _DOC.size)[0] < doc_id: lo = mid + 1
+            else: hi = mid
+        return lo < self.doc_count and _DOC.unpack_from(self._mm, self._docs + lo * _DOC.size)[0] == doc_id
+    def doc_length(self, doc_id: int) -> int:
+        return self._doc_lengths().get(doc_id, 0)
+    def stats(self) -> Tuple[int, int]:
+        return self.doc_count, self._total
+    def terms(self) -> Iterable[str]:
+        for i in range(self._nterms):
+            yield self._term(i).decode("utf-8")
+    def to_inverted(self) -> InvertedIndex:
+        """Decode every posting into an `InvertedIndex` (no re-tokenizing)."""
+        mm, n = self._mm, self._nposts
+        docs = struct.unpack_from(f"<{n}I", mm, self._post_docs)
+        tfs = struct.unpack_from(f"<{n}f", mm, self._post_tf)
+        offs = struct.unpack_from(f"<{n}I", mm, self._post_off)
+        cnts = struct.unpack_from(f"<{n}I", mm, self._post_cnt)
+        positions = struct.unpack_from(f"<{self._npositions}I", mm, self._positions)
+        idx = InvertedIndex()
+        forward: Dict[int, List[str]] = {d: [] for d in self._doc_lengths()}
+        for i in range(self._nterms):
+            term = self._term(i).decode("utf-8")
+            p, c = _ENTRY.unpack_from(mm, self._entries + i * _ENTRY.size)[2:]
+            idx._postings[term] = {docs[j]: (tfs[j], positions[offs[j]:offs[j] + cnts[j]]) for j in range(p, p + c)}
+            for j in range(p, p + c): forward[docs[j]].append(term)
+        idx._forward = {d: frozenset(ts) for d, ts in forward.items()}
+        idx._lengths = dict(self._doc_lengths()); idx._total = self._total
+        return idx
+
+class OverlayIndex:
+    """Mutable layer over a `MappedIndex`: changed/removed doc ids hide their
+    persisted postings and new text lives in an in-memory `InvertedIndex`."""
+    def __init__(self, base: MappedIndex):
+        self.base = base
+        self.delta = InvertedIndex()
+        self.hidden: Set[int] = set()
+    def add(self, doc_id: int, fields: Fields) -> None:
+        self.hidden.add(doc_id); self.delta.add(doc_id, fields)
+    update = add
+    def remove(self, doc_id: int) -> bool:
+        self.hidden.add(doc_id); self.delta.remove(doc_id)
+        return True
+    def postings(self, term: str) -> Dict[int, float]:
+        posts = self.base.postings(term)
+        for d in self.hidden.intersection(posts): del posts[d]
+        posts.update(self.delta.postings(term))
+        return posts
+    def positions(self, term: str, doc_id: int) -> Tuple[int, ...]:
+        if doc_id in self.hidden:
+            return self.delta.positions(term, doc_id)
+        return self.base.positions(term, doc_id)
+    def term_positions(self, term: str, doc_ids: Set[int]) -> Dict[int, Tuple[int, ...]]:
+        out = self.base.term_positions(term, doc_ids - self.hidden)
+        out.update(self.delta.term_positions(term, doc_ids & self.hidden))
+        return out
+    def get(self, term: str) -> Set[int]:
+        return set(self.postings(term))
+    def __contains__(self, doc_id: int) -> bool:
+        return doc_id in self.delta if doc_id in self.hidden else doc_id in self.base
+    @property
+    def max_id(self) -> int:
+        return max(self.base.max_id, max(self.delta._forward, default=0))
+    def doc_length(self, doc_id: int) -> int:
+        if doc_id in self.hidden:
+            return self.delta.doc_length(doc_id)
+        return self.base.doc_length(doc_id)
+    def stats(self) -> Tuple[int, int]:
+        n, total = self.base.stats()
+        for d in self.hidden:
+            if d in self.base:
+                n -= 1; total -= self.base.doc_length(d)
+        dn, dt = self.delta.stats()
+        return n + dn, total + dt
+    def terms(self) -> Iterable[str]:
+        # may include terms whose only documents were removed; postings() filters them
+        return set(self.base.terms()) | set(self.delta.terms())
+    def to_inverted(self) -> InvertedIndex:
+        """The merged index as one `InvertedIndex`, e.g. to persist it again."""
+        idx = self.base.to_inverted()
+        for d in self.hidden: idx.remove(d)
+        delta = self.delta
+        for term, posts in delta._postings.items():
+            idx._postings.setdefault(term, {}).update(posts)
+        idx._forward.update(delta._forward); idx._lengths.update(delta._lengths)
+        idx._total += delta._total
+        return idx
+
+# Index deltas: `<name>.idx.delta` logs the documents changed since `<name>.idx`
+# was written (one JSON line per change: id plus indexed fields, or just the id
+# for a removal), so a journaled edit does not make the next process rebuild the
+# index. The header pairs the signature of the `.idx` it extends with the store
+# signature after the last logged change; the delta is folded into a rewritten
+# `.idx` once it passes INDEX_DELTA_COMPACT_RATIO of the index size.
+DELTA_MAGIC = b"PKMSDLT\0"
+_DELTA_HEADER = struct.Struct("<8s4q4q")   # magic, base (.idx) signature, current store signature
+INDEX_DELTA_COMPACT_RATIO = 0.25
+INDEX_DELTA_MIN_BYTES = 64 * 1024
+
+def delta_path(path: str) -> str:
+    return path + ".delta"
+
+def _index_header_signature(path: str) -> Optional[Tuple[int, ...]]:
+    try:
+        with open(path, "rb") as fh:
+            header = _HEADER.unpack(fh.read(_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    return tuple(header[2:6]) if header[0] == INDEX_MAGIC and header[1] == INDEX_VERSION else None
+
+def _delta_header(path: str) -> Optional[Tuple[Tuple[int, ...], Tuple[int, ...]]]:
+    try:
+        with open(path, "rb") as fh:
+            header = _DELTA_HEADER.unpack(fh.read(_DELTA_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    return (tuple(header[1:5]), tuple(header[5:9])) if header[0] == DELTA_MAGIC else None
+
+def index_base(path: str, signature: Tuple[int, int, int, int]) -> Optional[Tuple[int, ...]]:
+    """Signature of the `.idx` at `path` if it, alone or with its delta, describes
+    a store at `signature`; None when the persisted index is stale or missing."""
+    base = _index_header_signature(path)
+    if base is None or base == tuple(signature):
+        return base
+    head = _delta_header(delta_path(path))
+    return base if head == (base, tuple(signature)) else None
+
+def append_delta(path: str, base: Tuple[int, ...], signature: Tuple[int, int, int, int], records: Iterable[Dict]) -> int:
+    """Log `records` against the `.idx` with signature `base`; returns the delta size.
+
+    The header is written last, so an interrupted append leaves a delta whose
+    signature matches no store and is ignored.
+    """
+    dpath = delta_path(path)
+    head = _delta_header(dpath)
+    fresh = head is None or head[0] != tuple(base)
+    with open(dpath, "wb" if fresh else "r+b") as fh:
+        if fresh: fh.write(_DELTA_HEADER.pack(DELTA_MAGIC, *base, 0, 0, 0, 0))
+        fh.seek(0, os.SEEK_END)
+        fh.write("".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8"))
+        size = fh.tell()
+        fh.flush()
+        fh.seek(0); fh.write(_DELTA_HEADER.pack(DELTA_MAGIC, *base, *signature))
+    return size
+
+def needs_compaction(path: str, delta_size: int) -> bool:
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return False
+    return delta_size >= max(INDEX_DELTA_MIN_BYTES, INDEX_DELTA_COMPACT_RATIO * size)
+
+def open_index(path: str, signature: Tuple[int, int, int, int]):
+    """Map the `.idx` at `path` for a store at `signature`: directly when it is
+    current, else as an `OverlayIndex` with its delta replayed; None if stale."""
+    mapped = MappedIndex.open(path, signature)
+    if mapped is not None:
+        return mapped
+    head = _delta_header(delta_path(path))
+    if head is None or head[1] != tuple(signature):
+        return None
+    mapped = MappedIndex.open(path, head[0])
+    if mapped is None:
+        return None
+    idx = OverlayIndex(mapped)
+    try:
+        with open(delta_path(path), "rb") as fh:
+            fh.seek(_DELTA_HEADER.size)
+            for line in fh:
+                rec = json.loads(line)
+                if "fields" in rec: idx.add(rec["id"], [tuple(f) for f in rec["fields"]])
+                else: idx.remove(rec["id"])
+    except (OSError, ValueError, KeyError, TypeError):
+        mapped.close(); return None
+    return idx
+
+__all__ = ["STOPWORDS", "tokenize", "document_fields", "parse_query", "bm25_scores", "top_k", "phrase_matches",
+           "InvertedIndex", "MappedIndex", "OverlayIndex", "index_path", "index_signature", "write_index",
+           "open_index", "index_base", "append_delta", "delta_path",
+           "FUZZY_MAX_DISTANCE", "levenshtein", "trigrams", "fuzzy_budget", "TrigramIndex"]
@@ -0,0 +1,188 @@
+"""Task aggregates behind `Agent.productivity_advice`.
+
+`scan_buckets` computes the advice buckets in one pass over a task list.
+`TaskStats` keeps the same buckets as running aggregates that `TaskManager`
+updates on every mutation: counters for open/done/priority/long tasks,
+lazily-invalidated heaps for the top-3 lists, and creation-ordered heaps
+from which tasks graduate to urgent/stale as the clock advances. Updates
+are O(log n); reading the buckets costs O(log n) plus the tasks that aged
+past a threshold since the previous read.
+"""
+from __future__ import annotations
+import heapq
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import parse_created
+
+# Quick wins: open tasks of at least this priority with at most this many words
+QUICK_WIN_WORDS = 8
+QUICK_WIN_MIN_PRIORITY = 3
+LONG_TASK_WORDS = 12
+HIGH_PRIORITY = 4
+REFINE_MIN_PRIORITY = 3
+URGENT_DAYS = 7    # high priority and at least this many days old
+STALE_DAYS = 14    # more than this many days old
+TOP_N = 3
+
+@dataclass
+class AdviceBuckets:
+    """What the advice text is built from; task lists hold task texts."""
+    total: int = 0
+    incomplete: int = 0
+    high_focus: List[str] = field(default_factory=list)
+    quick_wins: List[str] = field(default_factory=list)
+    urgent: List[str] = field(default_factory=list)
+    refinement: List[str] = field(default_factory=list)
+    stale: int = 0
+    long_tasks: int = 0
+    high_open: int = 0
+    prio_counts: Dict[int, int] = field(default_factory=dict)
+
+def created_at(t) -> Optional[datetime]:
+    """A task's parsed creation time, using the per-task cache when it has one."""
+    cached = getattr(t, 'created_at', None)
+    return cached() if cached is not None else parse_created(getattr(t, 'created', None))
+
+def scan_buckets(tasks: Iterable, now: datetime) -> AdviceBuckets:
+    """All advice buckets in a single traversal of `tasks` (lists keep task order)."""
+    b = AdviceBuckets()
+    high_open: list = []; quick: list = []
+    urgent_cut = now - timedelta(days=URGENT_DAYS); stale_cut = now - timedelta(days=STALE_DAYS + 1)
+    for t in tasks:
+        b.total += 1
+        if t.completed: continue
+        b.incomplete += 1
+        p = getattr(t, 'priority', 3)
+        b.prio_counts[p] = b.prio_counts.get(p, 0) + 1
+        words = len(t.text.split())
+        if words > LONG_TASK_WORDS: b.long_tasks += 1
+        if p >= QUICK_WIN_MIN_PRIORITY and words <= QUICK_WIN_WORDS: quick.append(t)
+        if p >= REFINE_MIN_PRIORITY and not getattr(t, 'details', []) and len(b.refinement) < TOP_N: b.refinement.append(t.text)
+        if p >= HIGH_PRIORITY: high_open.append(t)
+        created = created_at(t)
+        if created is None: continue
+        if created <= stale_cut: b.stale += 1
+        if p >= HIGH_PRIORITY and created <= urgent_cut and len(b.urgent) < TOP_N: b.urgent.append(t.text)
+    by_priority = lambda t: (-getattr(t, 'priority', 3), t.id)
+    b.high_open = len(high_open)
+    b.high_focus = [t.text for t in heapq.nsmallest(TOP_N, high_open, key=by_priority)]
+    b.quick_wins = [t.text for t in heapq.nsmallest(TOP_N, quick, key=by_priority)]
+    return b
+
+# snapshot of a task as last seen: (version, completed, priority, words, has details, created, text)
+_Snap = Tuple[int, bool, int, int, bool, Optional[datetime], str]
+
+class TaskStats:
+    """Running advice aggregates keyed by task id.
+
+    Heap entries end with (task id, version); an entry is live only while the
+    task's current snapshot has that version, so updates and removals never
+    search a heap. Dead entries are dropped when popped or on compaction.
+    Urgent/refine lists are ordered by id, i.e. the store's task order.
+    """
+    def __init__(self):
+        self._snap: Dict[int, _Snap] = {}
+        self._ver = 0
+        self._dead = 0
+        self.total = self.open = self.long_open = self.high_open = 0
+        self.open_by_priority: Dict[int, int] = {}
+        self._focus: list = []      # (-priority, id, ver): open high-priority
+        self._quick: list = []      # (-priority, id, ver): open quick wins
+        self._refine: list = []     # (id, ver): open refinement candidates
+        self._aging: list = []      # (created, id, ver): open, dated, not yet stale
+        self._aging_high: list = [] # (created, id, ver): open high-priority, not yet urgent
+        self._urgent: list = []     # (id, ver): matured urgent tasks
+        self._stale: set = set()
+        self._horizon: Optional[datetime] = None  # `now` the aging heaps were advanced to
+    def __len__(self) -> int:
+        return self.total
+    @classmethod
+    def build(cls, tasks: Iterable) -> "TaskStats":
+        stats = cls()
+        for t in tasks:
+            stats.add(t)
+        return stats
+    def _live(self, tid: int, ver: int) -> bool:
+        s = self._snap.get(tid)
+        return s is not None and s[0] == ver
+    def _count(self, s: _Snap, sign: int) -> None:
+        _v, completed, p, words, _d, _c, _t = s
+        self.total += sign
+        if completed: return
+        self.open += sign
+        n = self.open_by_priority.get(p, 0) + sign
+        if n: self.open_by_priority[p] = n
+        else: self.open_by_priority.pop(p, None)
+        if words > LONG_TASK_WORDS: self.long_open += sign
+        if p >= HIGH_PRIORITY: self.high_open += sign
+    def _index(self, tid: int, s: _Snap) -> None:
+        ver, completed, p, words, has_details, created, _t = s
+        if completed: return
+        push = heapq.heappush
+        if p >= HIGH_PRIORITY: push(self._focus, (-p, tid, ver))
+        if p >= QUICK_WIN_MIN_PRIORITY and words <= QUICK_WIN_WORDS: push(self._quick, (-p, tid, ver))
+        if p >= REFINE_MIN_PRIORITY and not has_details: push(self._refine, (tid, ver))
+        if created is None: return
+        h = self._horizon
+        if h is not None and created <= h - timedelta(days=STALE_DAYS + 1): self._stale.add(tid)
+        else: push(self._aging, (created, tid, ver))
+        if p >= HIGH_PRIORITY:
+            if h is not None and created <= h - timedelta(days=URGENT_DAYS): push(self._urgent, (tid, ver))
+            else: push(self._aging_high, (created, tid, ver))
+    def add(self, t) -> None:
+        """Record a new or changed task."""
+        self.remove(t.id)
+        self._ver += 1
+        s = (self._ver, bool(t.completed), getattr(t, 'priority', 3), len(t.text.split()),
+             bool(getattr(t, 'details', [])), created_at(t), t.text)
+        self._snap[t.id] = s
+        self._count(s, 1); self._index(t.id, s)
+    update = add
+    def remove(self, task_id: int) -> bool:
+        s = self._snap.pop(task_id, None)
+        if s is None:
+            return False
+        self._count(s, -1); self._stale.discard(task_id)
+        self._dead += 1
+        if self._dead > self.total + 64: self._compact()
+        return True
+    def _compact(self) -> None:
+        for name in ('_focus', '_quick', '_refine', '_aging', '_aging_high', '_urgent'):
+            heap = [e for e in getattr(self, name) if self._live(e[-2], e[-1])]
+            heapq.heapify(heap); setattr(self, name, heap)
+        self._dead = 0
+    def _advance(self, now: datetime) -> None:
+        if self._horizon is not None and now < self._horizon:
+            # the clock went backwards (or an older `now` was passed): re-derive the aged sets
+            self._horizon = None
+            self._aging, self._aging_high, self._urgent = [], [], []; self._stale = set()
+            self._focus, self._quick, self._refine = [], [], []
+            for tid, s in self._snap.items(): self._index(tid, s)
+            self._dead = 0
+        self._horizon = now
+        pop = heapq.heappop
+        cut = now - timedelta(days=STALE_DAYS + 1)
+        while self._aging and self._aging[0][0] <= cut:
+            _c, tid, ver = pop(self._aging)
+            if self._live(tid, ver): self._stale.add(tid)
+        cut = now - timedelta(days=URGENT_DAYS)
+        while self._aging_high and self._aging_high[0][0] <= cut:
+            _c, tid, ver = pop(self._aging_high)
+            if self._live(tid, ver): heapq.heappush(self._urgent, (tid, ver))
+    def _top(self, heap: list, n: int = TOP_N) -> List[str]:
+        live = []
+        while heap and len(live) < n:
+            e = heapq.heappop(heap)
+            if self._live(e[-2], e[-1]): live.append(e)
+        for e in live: heapq.heappush(heap, e)
+        return [self._snap[e[-2]][6] for e in live]
+    def buckets(self, now: datetime) -> AdviceBuckets:
+        self._advance(now)
+        return AdviceBuckets(total=self.total, incomplete=self.open, high_focus=self._top(self._focus),
+                             quick_wins=self._top(self._quick), urgent=self._top(self._urgent),
+                             refinement=self._top(self._refine), stale=len(self._stale), long_tasks=self.long_open,
+                             high_open=self.high_open, prio_counts=dict(self.open_by_priority))
+
+__all__ = ["AdviceBuckets", "TaskStats", "scan_buckets", "created_at"]
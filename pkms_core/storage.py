@@ -1,58 +1,317 @@
 from __future__ import annotations
-import json, os, sqlite3
-from typing import List, Optional
-from .utils import map_display_index
+import json, os, re, sqlite3, sys, threading
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
 from dataclasses import asdict
 from .models import Task, Document, Note
+if TYPE_CHECKING:
+    from .search_index import TrigramIndex  # imported on first fuzzy search
 
 class TaskStore:
     def load(self) -> List[Task]:
         raise NotImplementedError
-    def save_all(self, tasks: List[Task]) -> None:
+    def save_all(self, tasks: List[Task], diff: bool = False) -> None:
         raise NotImplementedError
     def add(self, task: Task) -> None:
         raise NotImplementedError
+    def add_many(self, tasks: List[Task]) -> None:
+        for t in tasks: self.add(t)
     def update(self, task: Task) -> None:
         raise NotImplementedError
     def delete(self, task_id: int) -> bool:
         raise NotImplementedError
 
+# Journaled JSON persistence: single-record mutations are appended to a sidecar
+# log (`<snapshot>.journal`) and folded into the snapshot only when the log grows
+# past JOURNAL_COMPACT_BYTES or JOURNAL_COMPACT_RATIO of the snapshot size.
+JOURNAL_SUFFIX = '.journal'
+JOURNAL_COMPACT_BYTES = 1 << 20
+JOURNAL_COMPACT_RATIO = 0.5
+JOURNAL_MIN_BYTES = 64 * 1024
+
+class _JsonJournal:
+    """Append-only NDJSON log of add/update/delete records keyed by `id`."""
+    def __init__(self, snapshot_path: str):
+        self.path = snapshot_path + JOURNAL_SUFFIX
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+    def _open_append(self):
+        """Open the log for appending, starting a fresh line if the last write was torn."""
+        fh = open(self.path, 'a', encoding='utf-8')
+        try:
+            if fh.tell() > 0:
+                with open(self.path, 'rb') as tail:
+                    tail.seek(-1, os.SEEK_END)
+                    if tail.read(1) != b'\n':
+                        # the partial record stays on its own line, which replay skips
+                        fh.write('\n')
+        except Exception:
+            fh.close(); raise
+        return fh
+    def append(self, op: str, item: Optional[dict] = None, item_id: Optional[int] = None) -> None:
+        rec = {'op': op, 'id': item_id if item is None else item.get('id')}
+        if item is not None:
+            rec['item'] = item
+        with self._open_append() as fh:
+            fh.write(json.dumps(rec, ensure_ascii=False) + '\n')
+    def append_many(self, op: str, items: List[dict]) -> None:
+        with self._open_append() as fh:
+            fh.writelines(json.dumps({'op': op, 'id': it.get('id'), 'item': it}, ensure_ascii=False) + '\n' for it in items)
+    def replay(self, items: List[dict]) -> List[dict]:
+        """Apply logged records on top of snapshot `items`, preserving snapshot order."""
+        if not os.path.exists(self.path):
+            return items
+        by_id = {it.get('id'): it for it in items}
+        with open(self.path, 'r', encoding='utf-8') as fh:
+            for line in fh:
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    # a torn trailing write from an interrupted process; ignore it
+                    continue
+                op = rec.get('op')
+                if op == 'add':
+                    by_id[rec['id']] = rec['item']
+                elif op == 'update':
+                    if rec['id'] in by_id: by_id[rec['id']] = rec['item']
+                elif op == 'delete':
+                    by_id.pop(rec['id'], None)
+        return list(by_id.values())
+    def latest(self, item_id: int) -> Optional[dict]:
+        """The last intact record logged for `item_id`, or None."""
+        found = None
+        if os.path.exists(self.path):
+            with open(self.path, 'r', encoding='utf-8') as fh:
+                for line in fh:
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    if rec.get('id') == item_id: found = rec
+        return found
+    def clear(self) -> None:
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+    def needs_compaction(self, snapshot_path: str, compact_bytes: int, compact_ratio: float) -> bool:
+        jb = self.size()
+        try:
+            sb = os.path.getsize(snapshot_path)
+        except OSError:
+            sb = 0
+        return jb >= compact_bytes or jb >= compact_ratio * max(sb, JOURNAL_MIN_BYTES)
+
+def _write_json_atomic(path: str, data, **kw) -> None:
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as fh:
+        json.dump(data, fh, **kw)
+    os.replace(tmp, path)
+
 class JsonTaskStore(TaskStore):
-    def __init__(self, path: str):
+    """JSON-file task store.
+
+    With ``journal=True`` add/update/delete append a small record to
+    ``tasks.json.journal`` instead of rewriting the whole snapshot; the log is
+    compacted into ``tasks.json`` once it passes the size/ratio thresholds.
+    A pending journal is always replayed on load, so stores opened without
+    journaling still see every mutation.
+    """
+    def __init__(self, path: str, journal: bool = False, compact_bytes: int = JOURNAL_COMPACT_BYTES, compact_ratio: float = JOURNAL_COMPACT_RATIO):
         self.path = path
-    def load(self) -> List[Task]:
+        self.journal = journal
+        self.compact_bytes = compact_bytes
+        self.compact_ratio = compact_ratio
+        self._journal = _JsonJournal(path)
+        self._ids: Optional[set] = None
+    def _load_raw(self) -> List[dict]:
+        data = []
         if os.path.exists(self.path):
             try:
                 with open(self.path, 'r', encoding='utf-8') as fh:
                     data = json.load(fh)
-                return [Task(**t) for t in data]
             except Exception:
-                return []
-        return []
-    def save_all(self, tasks: List[Task]) -> None:
-        with open(self.path, 'w', encoding='utf-8') as fh:
-            json.dump([asdict(t) for t in tasks], fh, indent=2)
+                data = []
+        return self._journal.replay(data)
+    def load(self) -> List[Task]:
+        try:
+            tasks = [Task.from_dict(t) for t in self._load_raw()]
+        except Exception:
+            return []
+        self._ids = {t.id for t in tasks}
+        return tasks
+    def save_all(self, tasks: List[Task], diff: bool = False) -> None:
+        # `diff` only matters for row stores; a JSON snapshot is always rewritten whole
+        _write_json_atomic(self.path, [t.to_dict() for t in tasks], indent=2)
+        self._journal.clear()
+        self._ids = {t.id for t in tasks}
+    def compact(self) -> None:
+        """Fold the journal into the snapshot file."""
+        self.save_all(self.load())
+    def _maybe_compact(self) -> None:
+        if self._journal.needs_compaction(self.path, self.compact_bytes, self.compact_ratio):
+            self.compact()
     def add(self, task: Task) -> None:
-        tasks = self.load(); tasks.append(task); self.save_all(tasks)
+        if not self.journal:
+            tasks = self.load(); tasks.append(task); self.save_all(tasks); return
+        self._journal.append('add', task.to_dict())
+        if self._ids is not None: self._ids.add(task.id)
+        self._maybe_compact()
+    def add_many(self, tasks: List[Task]) -> None:
+        """Persist a batch of new tasks with one snapshot write (or one journal append)."""
+        tasks = list(tasks)
+        if not self.journal:
+            self.save_all(self.load() + tasks); return
+        self._journal.append_many('add', [t.to_dict() for t in tasks])
+        if self._ids is not None: self._ids.update(t.id for t in tasks)
+        self._maybe_compact()
     def update(self, task: Task) -> None:
-        tasks = self.load()
-        for i,t in enumerate(tasks):
-            if t.id == task.id: tasks[i]=task; break
-        self.save_all(tasks)
+        if not self.journal:
+            tasks = self.load()
+            for i,t in enumerate(tasks):
+                if t.id == task.id: tasks[i]=task; break
+            self.save_all(tasks); return
+        self._journal.append('update', task.to_dict())
+        self._maybe_compact()
     def delete(self, task_id: int) -> bool:
-        tasks = self.load()
-        for i,t in enumerate(tasks):
-            if t.id == task_id: del tasks[i]; self.save_all(tasks); return True
-        return False
+        if not self.journal:
+            tasks = self.load()
+            for i,t in enumerate(tasks):
+                if t.id == task_id: del tasks[i]; self.save_all(tasks); return True
+            return False
+        if self._ids is None:
+            self.load()
+        if task_id not in self._ids:
+            return False
+        self._journal.append('delete', item_id=task_id)
+        self._ids.discard(task_id)
+        self._maybe_compact()
+        return True
+
+# SQLite tuning shared by the task and note stores. Each store keeps one
+# long-lived connection; `PRAGMA user_version` records the schema version so
+# DDL and column probing only run when a database is older than the code.
+SQLITE_MMAP_SIZE = 64 * 1024 * 1024
+SQLITE_STATEMENT_CACHE = 256
 
-class SqliteTaskStore(TaskStore):
+def _open_sqlite(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, check_same_thread=False, cached_statements=SQLITE_STATEMENT_CACHE)
+    try:
+        conn.execute("PRAGMA journal_mode=WAL")
+    except sqlite3.DatabaseError:
+        # e.g. network filesystems without shared-memory support; keep the default journal
+        pass
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    return conn
+
+class _SqliteStore:
+    """Base for SQLite-backed stores: one pooled connection guarded by a lock."""
+    SCHEMA_VERSION = 1
+    _fts = False
     def __init__(self, path: str):
         self.path = path
         os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.RLock()
         self._ensure_schema()
-    def _conn(self): return sqlite3.connect(self.path)
+    def _conn(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = _open_sqlite(self.path)
+        return self._db
+    @contextmanager
+    def _tx(self):
+        """Serialize access to the shared connection and run the body as one transaction."""
+        with self._lock:
+            conn = self._conn()
+            with conn:
+                yield conn
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close(); self._db = None
     def _ensure_schema(self):
-        with self._conn() as conn:
+        with self._tx() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            if version < self.SCHEMA_VERSION:
+                self._create_schema(conn, version)
+                conn.execute(f"PRAGMA user_version={int(self.SCHEMA_VERSION)}")
+            self._fts = _has_table(conn, self.FTS_TABLE) if self.FTS_TABLE else False
+    def _create_schema(self, conn: sqlite3.Connection, version: int) -> None:
+        """Upgrade a database from `version` to SCHEMA_VERSION."""
+        raise NotImplementedError
+    FTS_TABLE: Optional[str] = None
+    def _fts_match(self, conn, query: str, prefix: bool, select: str, limit: Optional[int] = None, offset: int = 0) -> Optional[list]:
+        """Run a ranked FTS5 match (one LIMIT/OFFSET page); None when full-text search is unavailable for `query`."""
+        match = _fts_query(query, prefix)
+        if not self._fts or match is None:
+            return None
+        return conn.execute(
+            f"{select} JOIN {self.FTS_TABLE} f ON f.rowid = t.id WHERE {self.FTS_TABLE} MATCH ? ORDER BY bm25({self.FTS_TABLE}), t.id"
+            " LIMIT ? OFFSET ?",
+            (match, -1 if limit is None else limit, offset),
+        ).fetchall()
+
+def _has_table(conn: sqlite3.Connection, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE name=?", (name,)).fetchone() is not None
+
+def _fts5_available(conn: sqlite3.Connection) -> bool:
+    try:
+        conn.execute("CREATE VIRTUAL TABLE temp._pkms_fts_probe USING fts5(x)")
+        conn.execute("DROP TABLE temp._pkms_fts_probe")
+        return True
+    except sqlite3.OperationalError:
+        return False
+
+def _fts_query(query: str, prefix: bool = True) -> Optional[str]:
+    """Build an FTS5 MATCH expression: every word must match (as a prefix by default)."""
+    words = re.findall(r"\w+", query or '')
+    if not words:
+        return None
+    return " ".join('"' + w + '"' + ('*' if prefix else '') for w in words)
+
+# Schema v3 keeps details and tags in child tables (task_details, task_tags)
+# instead of JSON text columns; the legacy columns stay but are left NULL.
+_TASK_COLUMNS = "id,text,created,completed,priority"
+_TASK_INSERT = f"INSERT INTO tasks({_TASK_COLUMNS}) VALUES(?,?,?,?,?)"
+_TASK_UPSERT = _TASK_INSERT + (
+    " ON CONFLICT(id) DO UPDATE SET text=excluded.text, created=excluded.created, completed=excluded.completed,"
+    " priority=excluded.priority"
+)
+
+def _task_row(t: Task) -> tuple:
+    """Serialize a task's scalar fields to the column tuple used by the tasks table."""
+    return (t.id, t.text, t.created, int(t.completed), int(getattr(t, 'priority', 3)))
+
+_NOTE_COLUMNS = "id,text,created,details,task_id"
+_NOTE_INSERT = f"INSERT INTO notes({_NOTE_COLUMNS}) VALUES(?,?,?,?,?)"
+_NOTE_UPSERT = _NOTE_INSERT + (
+    " ON CONFLICT(id) DO UPDATE SET text=excluded.text, created=excluded.created, details=excluded.details, task_id=excluded.task_id"
+)
+
+def _note_row(n: Note) -> tuple:
+    return (n.id, n.text, n.created, json.dumps(getattr(n, 'details', [])), getattr(n, 'task_id', None))
+
+_TASK_FTS_TRIGGERS = ("tasks_fts_ai", "tasks_fts_ad", "tasks_fts_au")
+_TASK_DETAILS_SQL = "(SELECT group_concat(text, ' ') FROM task_details WHERE task_id={})"
+_TASK_TAGS_SQL = "(SELECT group_concat(tag, ' ') FROM task_tags WHERE task_id={})"
+# v4: the insert trigger indexes child rows already present, so bulk inserts can write
+# children first and pay one FTS insert per task instead of one FTS rewrite per child row
+_TASK_FTS_AI = ("CREATE TRIGGER tasks_fts_ai AFTER INSERT ON tasks BEGIN"
+                " INSERT INTO tasks_fts(rowid,text,details,tags) VALUES (new.id,new.text,"
+                f" coalesce({_TASK_DETAILS_SQL.format('new.id')}, ''), coalesce({_TASK_TAGS_SQL.format('new.id')}, '')); END")
+
+class SqliteTaskStore(_SqliteStore, TaskStore):
+    # v1: tasks table with priority/tags; v2: tasks_fts full-text index kept in sync by triggers;
+    # v3: normalized task_details/task_tags tables with tag and priority indexes;
+    # v4: FTS insert trigger picks up pre-written child rows
+    SCHEMA_VERSION = 4
+    FTS_TABLE = 'tasks_fts'
+    def _create_schema(self, conn, version):
+        if version < 1:
             conn.execute("""CREATE TABLE IF NOT EXISTS tasks (
                 id INTEGER PRIMARY KEY,
                 text TEXT,
@@ -69,71 +328,286 @@ class SqliteTaskStore(TaskStore):
                 conn.execute("ALTER TABLE tasks ADD COLUMN priority INTEGER DEFAULT 3")
             if 'tags' not in cols:
                 conn.execute("ALTER TABLE tasks ADD COLUMN tags TEXT DEFAULT '[]'")
-    def load(self) -> List[Task]:
-        with self._conn() as conn:
-            rows = conn.execute("SELECT id,text,created,completed,details,priority,tags FROM tasks ORDER BY id ASC").fetchall()
-        import json as _json
-        result: List[Task] = []
-        for r in rows:
-            details = []
-            if r[4]:
+        if version < 2 and _fts5_available(conn):
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS tasks_fts USING fts5(text, details, tags)")
+        if version < 3:
+            self._normalize_details_and_tags(conn)
+        if version < 4 and _has_table(conn, 'tasks_fts'):
+            conn.execute("DROP TRIGGER IF EXISTS tasks_fts_ai")
+            conn.execute(_TASK_FTS_AI)
+    def _normalize_details_and_tags(self, conn) -> None:
+        conn.execute("""CREATE TABLE IF NOT EXISTS task_details (
+            task_id INTEGER NOT NULL,
+            pos INTEGER NOT NULL,
+            text TEXT,
+            PRIMARY KEY (task_id, pos)
+        )""")
+        conn.execute("""CREATE TABLE IF NOT EXISTS task_tags (
+            task_id INTEGER NOT NULL,
+            pos INTEGER NOT NULL,
+            tag TEXT NOT NULL,
+            PRIMARY KEY (task_id, pos)
+        )""")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_task_tags_tag ON task_tags(tag, task_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_completed_priority ON tasks(completed, priority)")
+        # move JSON columns into the child tables, then clear them
+        details_rows, tag_rows = [], []
+        for tid, details, tags in conn.execute("SELECT id, details, tags FROM tasks WHERE details IS NOT NULL OR tags IS NOT NULL"):
+            for col, out in ((details, details_rows), (tags, tag_rows)):
                 try:
-                    details = _json.loads(r[4])
+                    values = json.loads(col) if col else []
                 except Exception:
-                    details = []
-            # parse tags (stored as JSON text)
-            tags = []
-            try:
-                tags = _json.loads(r[6]) if r[6] else []
-            except Exception:
-                tags = []
-            priority = int(r[5]) if r[5] is not None else 3
-            result.append(Task(id=r[0], text=r[1], created=r[2], completed=bool(r[3]), details=details, priority=priority, tags=tags))
-        return result
-    def save_all(self, tasks: List[Task]) -> None:
-        with self._conn() as conn:
-            conn.execute("DELETE FROM tasks")
-            import json as _json
+                    values = []
+                out.extend((tid, pos, v) for pos, v in enumerate(values if isinstance(values, list) else []))
+        conn.executemany("INSERT OR REPLACE INTO task_details(task_id,pos,text) VALUES(?,?,?)", details_rows)
+        conn.executemany("INSERT OR REPLACE INTO task_tags(task_id,pos,tag) VALUES(?,?,?)", tag_rows)
+        conn.execute("UPDATE tasks SET details=NULL, tags=NULL")
+        # child rows go away with their task
+        conn.execute("CREATE TRIGGER IF NOT EXISTS tasks_children_ad AFTER DELETE ON tasks BEGIN"
+                     " DELETE FROM task_details WHERE task_id=old.id; DELETE FROM task_tags WHERE task_id=old.id; END")
+        if _has_table(conn, 'tasks_fts'):
+            for name in _TASK_FTS_TRIGGERS:
+                conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+            details_sql, tags_sql = _TASK_DETAILS_SQL, _TASK_TAGS_SQL
+            conn.execute("DELETE FROM tasks_fts")
+            conn.execute("INSERT INTO tasks_fts(rowid,text,details,tags) SELECT id, text, "
+                         + details_sql.format('tasks.id') + ", " + tags_sql.format('tasks.id') + " FROM tasks")
+            for stmt in (
+                _TASK_FTS_AI,
+                "CREATE TRIGGER tasks_fts_ad AFTER DELETE ON tasks BEGIN"
+                " DELETE FROM tasks_fts WHERE rowid=old.id; END",
+                "CREATE TRIGGER tasks_fts_au AFTER UPDATE OF text ON tasks BEGIN"
+                " UPDATE tasks_fts SET text=new.text WHERE rowid=new.id; END",
+            ):
+                conn.execute(stmt)
+            for table, col, sql in (("task_details", "details", details_sql), ("task_tags", "tags", tags_sql)):
+                for event, ref in (("INSERT", "new"), ("DELETE", "old")):
+                    conn.execute(
+                        f"CREATE TRIGGER IF NOT EXISTS {table}_fts_{event[0].lower()} AFTER {event} ON {table} BEGIN"
+                        f" UPDATE tasks_fts SET {col}=coalesce({sql.format(ref + '.task_id')}, '') WHERE rowid={ref}.task_id; END"
+                    )
+    @staticmethod
+    def _children(conn, ids=None):
+        """Return ({task_id: [details]}, {task_id: [tags]}) for `ids` (all tasks when None)."""
+        details: Dict[int, List[str]] = {}
+        tags: Dict[int, List[str]] = {}
+        if ids is None:
+            where, params = "", ()
+        else:
+            ids = list(ids)
+            if not ids:
+                return details, tags
+            where, params = f" WHERE task_id IN ({','.join('?' * len(ids))})", tuple(ids)
+        for tid, text in conn.execute(f"SELECT task_id, text FROM task_details{where} ORDER BY task_id, pos", params):
+            details.setdefault(tid, []).append(text)
+        for tid, tag in conn.execute(f"SELECT task_id, tag FROM task_tags{where} ORDER BY task_id, pos", params):
+            tags.setdefault(tid, []).append(sys.intern(tag))
+        return details, tags
+    def _assemble(self, conn, rows, all_rows: bool = False) -> List[Task]:
+        details, tags = self._children(conn, None if all_rows else (r[0] for r in rows))
+        return [Task(id=r[0], text=r[1], created=r[2], completed=bool(r[3]), details=details.get(r[0], []),
+                     priority=int(r[4]) if r[4] is not None else 3, tags=tags.get(r[0], [])) for r in rows]
+    @staticmethod
+    def _write_children(conn, tasks, replace: bool = True) -> None:
+        tasks = list(tasks)
+        if replace:
+            conn.executemany("DELETE FROM task_details WHERE task_id=?", ((t.id,) for t in tasks))
+            conn.executemany("DELETE FROM task_tags WHERE task_id=?", ((t.id,) for t in tasks))
+        conn.executemany("INSERT INTO task_details(task_id,pos,text) VALUES(?,?,?)",
+                         ((t.id, pos, d) for t in tasks for pos, d in enumerate(getattr(t, 'details', []))))
+        conn.executemany("INSERT INTO task_tags(task_id,pos,tag) VALUES(?,?,?)",
+                         ((t.id, pos, g) for t in tasks for pos, g in enumerate(getattr(t, 'tags', []))))
+    def load(self) -> List[Task]:
+        with self._tx() as conn:
+            rows = conn.execute(f"SELECT {_TASK_COLUMNS} FROM tasks ORDER BY id ASC").fetchall()
+            return self._assemble(conn, rows, all_rows=True)
+    # Cursor-style accessors used by TaskManager(lazy=True) so callers can page
+    # through large tables without materializing every row.
+    def count(self) -> int:
+        with self._tx() as conn:
+            return conn.execute("SELECT COUNT(*) FROM tasks").fetchone()[0]
+    def max_id(self) -> int:
+        with self._tx() as conn:
+            return conn.execute("SELECT MAX(id) FROM tasks").fetchone()[0] or 0
+    def get(self, task_id: int) -> Optional[Task]:
+        with self._tx() as conn:
+            rows = conn.execute(f"SELECT {_TASK_COLUMNS} FROM tasks WHERE id=?", (task_id,)).fetchall()
+            return self._assemble(conn, rows)[0] if rows else None
+    def load_page(self, offset: int, limit: int) -> List[Task]:
+        """Return up to `limit` tasks in id order starting at position `offset`."""
+        with self._tx() as conn:
+            rows = conn.execute(f"SELECT {_TASK_COLUMNS} FROM tasks ORDER BY id ASC LIMIT ? OFFSET ?", (limit, offset)).fetchall()
+            return self._assemble(conn, rows)
+    def iter_pages(self, page_size: int = 500):
+        """Yield lists of tasks in id order using keyset pagination (WHERE id > last)."""
+        last = None
+        while True:
+            with self._tx() as conn:
+                if last is None:
+                    rows = conn.execute(f"SELECT {_TASK_COLUMNS} FROM tasks ORDER BY id ASC LIMIT ?", (page_size,)).fetchall()
+                else:
+                    rows = conn.execute(f"SELECT {_TASK_COLUMNS} FROM tasks WHERE id > ? ORDER BY id ASC LIMIT ?", (last, page_size)).fetchall()
+                page = self._assemble(conn, rows)
+            if not rows:
+                return
+            yield page
+            last = rows[-1][0]
+    def query(self, tag: Optional[str] = None, priority: Optional[int] = None, completed: Optional[bool] = None) -> List[Task]:
+        """Return tasks matching every given filter, in id order, using the tag/priority indexes."""
+        clauses, params = [], []
+        if tag is not None:
+            clauses.append("id IN (SELECT task_id FROM task_tags WHERE tag=?)"); params.append(tag)
+        if completed is not None:
+            clauses.append("completed=?"); params.append(int(bool(completed)))
+        if priority is not None:
+            clauses.append("priority=?"); params.append(int(priority))
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        with self._tx() as conn:
+            rows = conn.execute(f"SELECT {_TASK_COLUMNS} FROM tasks{where} ORDER BY id ASC", params).fetchall()
+            return self._assemble(conn, rows)
+    def search(self, query: str, prefix: bool = True, limit: Optional[int] = None, offset: int = 0) -> Optional[List[Task]]:
+        """Ranked (bm25) full-text search over text, details and tags.
+
+        Returns None when FTS5 is unavailable or the query has no words, so
+        callers can fall back to a substring scan.
+        """
+        cols = ",".join("t." + c for c in _TASK_COLUMNS.split(","))
+        with self._tx() as conn:
+            rows = self._fts_match(conn, query, prefix, f"SELECT {cols} FROM tasks t", limit, offset)
+            return None if rows is None else self._assemble(conn, rows)
+    def save_all(self, tasks: List[Task], diff: bool = False) -> None:
+        """Replace the table contents with `tasks` in one transaction.
+
+        The default path truncates and bulk-inserts with `executemany`. With
+        ``diff=True`` existing rows are compared and only new/changed rows are
+        upserted and missing ids deleted, which is much cheaper when a caller
+        re-saves a mostly unchanged list.
+        """
+        with self._tx() as conn:
+            if not diff:
+                conn.execute("DELETE FROM task_details")
+                conn.execute("DELETE FROM task_tags")
+                conn.execute("DELETE FROM tasks")
+                self.add_many(tasks, _conn=conn)
+                return
+            rows = conn.execute(f"SELECT {_TASK_COLUMNS} FROM tasks").fetchall()
+            details, tags = self._children(conn)
+            existing = {r[0]: (r, details.get(r[0], []), tags.get(r[0], [])) for r in rows}
+            changed = []
             for t in tasks:
-                conn.execute(
-                    "INSERT INTO tasks(id,text,created,completed,details,priority,tags) VALUES(?,?,?,?,?,?,?)",
-                    (t.id, t.text, t.created, int(t.completed), _json.dumps(getattr(t, 'details', [])), int(getattr(t, 'priority', 3)), _json.dumps(getattr(t, 'tags', []))),
-                )
+                if existing.pop(t.id, None) != (_task_row(t), list(t.details), list(t.tags)):
+                    changed.append(t)
+            conn.executemany(_TASK_UPSERT, (_task_row(t) for t in changed))
+            self._write_children(conn, changed)
+            conn.executemany("DELETE FROM tasks WHERE id=?", ((i,) for i in existing))
+    def add_many(self, tasks, ignore_existing: bool = False, _conn=None) -> None:
+        """Insert many tasks in one transaction (skipping ids already present if `ignore_existing`)."""
+        if _conn is None:
+            with self._tx() as conn:
+                return self.add_many(tasks, ignore_existing, _conn=conn)
+        tasks = list(tasks)
+        if ignore_existing:
+            present = {r[0] for r in _conn.execute("SELECT id FROM tasks")}
+            tasks = [t for t in tasks if t.id not in present]
+        # children first: their FTS triggers find no row yet, and the task insert trigger indexes them once
+        self._write_children(_conn, tasks, replace=False)
+        _conn.executemany(_TASK_INSERT, (_task_row(t) for t in tasks))
     def add(self, task: Task) -> None:
-        with self._conn() as conn:
-            import json as _json
-            conn.execute(
-                "INSERT INTO tasks(id,text,created,completed,details,priority,tags) VALUES(?,?,?,?,?,?,?)",
-                (task.id, task.text, task.created, int(task.completed), _json.dumps(getattr(task, 'details', [])), int(getattr(task, 'priority', 3)), _json.dumps(getattr(task, 'tags', [])) ),
-            )
+        self.add_many([task])
     def update(self, task: Task) -> None:
-        with self._conn() as conn:
-            import json as _json
-            conn.execute(
-                "UPDATE tasks SET text=?, created=?, completed=?, details=?, priority=?, tags=? WHERE id=?",
-                (task.text, task.created, int(task.completed), _json.dumps(getattr(task, 'details', [])), int(getattr(task, 'priority', 3)), _json.dumps(getattr(task, 'tags', [])), task.id),
-            )
+        with self._tx() as conn:
+            row = _task_row(task)
+            cur = conn.execute("UPDATE tasks SET text=?, created=?, completed=?, priority=? WHERE id=?", row[1:] + row[:1])
+            # unknown id: writing children would leave orphan detail/tag rows behind
+            if cur.rowcount: self._write_children(conn, [task])
     def delete(self, task_id: int) -> bool:
-        with self._conn() as conn:
+        with self._tx() as conn:
             cur = conn.execute("DELETE FROM tasks WHERE id=?", (task_id,))
             return cur.rowcount>0
 
 # Document storage simple JSON only for legacy/debug
 class DocumentStore:
-    def __init__(self, path: str):
+    """JSON document store.
+
+    With ``journal=True`` add/update/delete append to ``docs.json.journal``
+    (the same log format and compaction thresholds as the task journal)
+    instead of rewriting the snapshot.
+    """
+    def __init__(self, path: str, journal: bool = False, compact_bytes: int = JOURNAL_COMPACT_BYTES, compact_ratio: float = JOURNAL_COMPACT_RATIO):
         self.path = path
+        self.journal = journal
+        self.compact_bytes = compact_bytes
+        self.compact_ratio = compact_ratio
+        self._journal = _JsonJournal(path)
     def load(self) -> List[Document]:
+        data = []
         if os.path.exists(self.path):
             try:
                 with open(self.path,'r',encoding='utf-8') as fh: data=json.load(fh)
-                return [Document(**d) for d in data]
-            except Exception: return []
-        return []
+            except Exception: data = []
+        try:
+            return [Document(**d) for d in self._journal.replay(data)]
+        except Exception: return []
+    def get(self, doc_id: int) -> Optional[Document]:
+        """One document by id: the latest journal record for it, else the snapshot
+        entry, decoded on its own instead of parsing the whole snapshot."""
+        rec = self._journal.latest(doc_id)
+        if rec is not None:
+            return Document(**rec['item']) if rec.get('op') != 'delete' else None
+        return self._snapshot_get(doc_id)
+    def _snapshot_get(self, doc_id: int) -> Optional[Document]:
+        try:
+            with open(self.path,'r',encoding='utf-8') as fh: raw = fh.read()
+        except OSError:
+            return None
+        # a '{' followed by a quote only occurs outside strings (inside one the quote is escaped)
+        m = re.search(r'\{\s*"id"\s*:\s*%d\s*[,}]' % doc_id, raw)
+        if m is not None:
+            try:
+                d = json.JSONDecoder().raw_decode(raw, m.start())[0]
+                if d.get('id') == doc_id: return Document(**d)
+            except Exception:
+                pass
+        # an external writer may order keys differently
+        try:
+            items = json.loads(raw)
+        except ValueError:
+            return None
+        d = next((d for d in items if d.get('id') == doc_id), None)
+        return Document(**d) if d is not None else None
     def save_all(self, docs: List[Document]) -> None:
-        with open(self.path,'w',encoding='utf-8') as fh:
-            json.dump([asdict(d) for d in docs], fh, indent=2)
+        _write_json_atomic(self.path, [asdict(d) for d in docs], indent=2)
+        self._journal.clear()
+    def compact(self) -> None:
+        self.save_all(self.load())
+    def _append(self, op: str, doc: Optional[Document] = None, doc_id: Optional[int] = None) -> None:
+        if doc is not None:
+            self._journal.append(op, asdict(doc))
+        else:
+            self._journal.append(op, item_id=doc_id)
+        if self._journal.needs_compaction(self.path, self.compact_bytes, self.compact_ratio):
+            self.compact()
+    def add(self, doc: Document) -> None:
+        if not self.journal:
+            self.save_all(self.load() + [doc]); return
+        self._append('add', doc)
+    def update(self, doc: Document) -> None:
+        if not self.journal:
+            self.save_all([doc if d.id == doc.id else d for d in self.load()]); return
+        self._append('update', doc)
+    def delete(self, doc_id: int) -> None:
+        if not self.journal:
+            self.save_all([d for d in self.load() if d.id != doc_id]); return
+        self._append('delete', doc_id=doc_id)
 
-def make_task_store(kind: str, base_dir: str) -> TaskStore:
+def make_task_store(kind: str, base_dir: str, journal: Optional[bool] = None) -> TaskStore:
+    """Create a task store for 'json' or 'sqlite' backends.
+
+    ``journal`` enables the append-only journal for the JSON backend; when
+    omitted it follows the ``PKMS_JSON_JOURNAL=1`` environment variable.
+    """
+    if journal is None:
+        journal = os.getenv('PKMS_JSON_JOURNAL', '0') == '1'
     data_dir = os.path.join(base_dir, 'app_data'); os.makedirs(data_dir, exist_ok=True)
     # If migrating to sqlite, look for legacy JSON stores in common legacy locations and import them.
     db_path = os.path.join(data_dir, 'tasks.db')
@@ -152,16 +626,12 @@ def make_task_store(kind: str, base_dir: str) -> TaskStore:
             if not isinstance(data, list) or not data:
                 return
             # Ensure DB exists and schema present
-            SqliteTaskStore(target_db)._ensure_schema()
-            conn = SqliteTaskStore(target_db)._conn()
-            with conn:
-                for item in data:
-                    # Item expected to have id, text, created, completed, details
-                    details = _json.dumps(item.get('details', []))
-                    conn.execute(
-                        "INSERT OR IGNORE INTO tasks(id,text,created,completed,details) VALUES(?,?,?,?,?)",
-                        (item.get('id'), item.get('text'), item.get('created'), int(bool(item.get('completed'))), details),
-                    )
+            store = SqliteTaskStore(target_db)
+            # Items expected to have id, text, created, completed, details
+            store.add_many((Task(id=item.get('id'), text=item.get('text'), created=item.get('created'),
+                                 completed=bool(item.get('completed')), details=item.get('details', []) or [])
+                            for item in data), ignore_existing=True)
+            store.close()
         except Exception:
             # Best-effort: ignore migration failures
             return
@@ -187,9 +657,16 @@ def make_task_store(kind: str, base_dir: str) -> TaskStore:
                     break
             except Exception:
                 continue
-    return JsonTaskStore(json_path)
+    return JsonTaskStore(json_path, journal=journal)
+
+def make_document_store(base_dir: str, journal: Optional[bool] = None) -> DocumentStore:
+    """Create the JSON document store under ``base_dir/app_data``.
 
-def make_document_store(base_dir: str) -> DocumentStore:
+    Document mutations are journaled by default; set ``PKMS_DOCS_JOURNAL=0``
+    to rewrite ``docs.json`` on every change instead.
+    """
+    if journal is None:
+        journal = os.getenv('PKMS_DOCS_JOURNAL', '1') == '1'
     data_dir = os.path.join(base_dir, 'app_data'); os.makedirs(data_dir, exist_ok=True)
     dest = os.path.join(data_dir,'docs.json')
     # If docs.json not present, attempt best-effort migration from legacy locations
@@ -248,136 +725,248 @@ def make_document_store(base_dir: str) -> DocumentStore:
                     break
             if os.path.exists(dest):
                 break
-    return DocumentStore(dest)
+    return DocumentStore(dest, journal=journal)
 
 
-def make_note_store(kind: str, base_dir: str):
-    """Create a note store for 'json' or 'sqlite' backends.
-    Notes are stored in `app_data/notes.json` or `app_data/notes.db` (sqlite path uses tasks.db dir).
+def _copy_note(n: Note) -> Note:
+    return Note(id=n.id, text=n.text, created=n.created, details=list(n.details), task_id=n.task_id)
+
+class JsonNoteStore:
+    """JSON-file note store with an in-process id -> position index.
+
+    The parsed notes are cached until the file changes on disk (mtime/size),
+    so id and display-index lookups are dict/list accesses rather than a
+    reload and linear scan. Callers get copies: mutating a returned note
+    (or one passed to a save) never changes the cache behind the store's back.
     """
-    data_dir = os.path.join(base_dir, 'app_data'); os.makedirs(data_dir, exist_ok=True)
-    db_path = os.path.join(data_dir, 'notes.db')
-    json_path = os.path.join(data_dir, 'notes.json')
+    def __init__(self, path: str):
+        self.path = path
+        self._notes: List[Note] = []
+        self._pos: Dict[int, int] = {}
+        self._sig: Optional[Tuple[int, int]] = None
+        self._fuzzy = None
+    def _signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+    def _refresh(self) -> None:
+        sig = self._signature()
+        if sig is not None and sig == self._sig:
+            return
+        notes: List[Note] = []
+        if sig is not None:
+            try:
+                with open(self.path, 'r', encoding='utf-8') as fh:
+                    data = json.load(fh)
+                notes = [Note.from_dict(n) for n in data]
+            except Exception:
+                notes = []
+        self._set(notes, sig)
+    def _set(self, notes: List[Note], sig: Optional[Tuple[int, int]]) -> None:
+        self._notes = notes
+        self._pos = {n.id: i for i, n in enumerate(notes)}
+        self._sig = sig
+        self._fuzzy = None
+    def fuzzy_index(self):
+        """Trigram index over note text/details, cached with the parsed notes."""
+        self._refresh()
+        if self._fuzzy is None:
+            self._fuzzy = _notes_fuzzy_index(self._notes)
+        return self._fuzzy
+    def load(self) -> List[Note]:
+        self._refresh()
+        return [_copy_note(n) for n in self._notes]
+    def count(self) -> int:
+        self._refresh()
+        return len(self._notes)
+    def next_id(self) -> int:
+        self._refresh()
+        return max(self._pos, default=0) + 1
+    def get(self, note_id: int) -> Optional[Note]:
+        self._refresh()
+        i = self._pos.get(note_id)
+        return _copy_note(self._notes[i]) if i is not None else None
+    def get_at(self, display_index: int) -> Note:
+        """Return the note shown at 1-based `display_index`; IndexError if out of range."""
+        self._refresh()
+        if display_index < 1 or display_index > len(self._notes):
+            raise IndexError("Display index out of range")
+        return _copy_note(self._notes[display_index - 1])
+    def save_all(self, notes: List[Note], diff: bool = False) -> None:
+        # atomic: a failed write keeps both the old file and the cache that mirrors it
+        _write_json_atomic(self.path, [n.to_dict() for n in notes], indent=2, ensure_ascii=False)
+        self._set([_copy_note(n) for n in notes], self._signature())
+    def add(self, note: Note) -> None:
+        self.add_many([note])
+    def add_many(self, notes: List[Note]) -> None:
+        self._refresh()
+        self.save_all(self._notes + list(notes))
+    def delete(self, note_id: int) -> bool:
+        self._refresh()
+        i = self._pos.get(note_id)
+        if i is None:
+            return False
+        self.save_all(self._notes[:i] + self._notes[i+1:])
+        return True
+    def update(self, note: Note) -> None:
+        self._refresh()
+        i = self._pos.get(note.id)
+        notes = list(self._notes)
+        if i is not None:
+            notes[i] = note
+        self.save_all(notes)
 
-    class JsonNoteStore:
-        def __init__(self, path: str):
-            self.path = path
-        def load(self) -> List[Note]:
-            if os.path.exists(self.path):
+class SqliteNoteStore(_SqliteStore):
+    # v1: notes table with task_id; v2: notes_fts full-text index kept in sync by triggers
+    SCHEMA_VERSION = 2
+    FTS_TABLE = 'notes_fts'
+    def _create_schema(self, conn, version):
+        if version < 1:
+            conn.execute("""CREATE TABLE IF NOT EXISTS notes (
+                id INTEGER PRIMARY KEY,
+                text TEXT,
+                created TEXT,
+                details TEXT,
+                task_id INTEGER
+            )""")
+            # Ensure task_id column exists for older DBs
+            cur = conn.execute("PRAGMA table_info(notes)").fetchall()
+            cols = [c[1] for c in cur]
+            if 'task_id' not in cols:
                 try:
-                    with open(self.path, 'r', encoding='utf-8') as fh:
-                        data = json.load(fh)
-                    return [Note(**n) for n in data]
+                    conn.execute("ALTER TABLE notes ADD COLUMN task_id INTEGER")
                 except Exception:
-                    return []
-            return []
-        def save_all(self, notes: List[Note]) -> None:
-            with open(self.path, 'w', encoding='utf-8') as fh:
-                json.dump([asdict(n) for n in notes], fh, indent=2, ensure_ascii=False)
-        def add(self, note: Note) -> None:
-            notes = self.load(); notes.append(note); self.save_all(notes)
-        def delete(self, note_id: int) -> bool:
-            notes = self.load()
-            for i,n in enumerate(notes):
-                if n.id == note_id:
-                    del notes[i]; self.save_all(notes); return True
-            return False
-        def update(self, note: Note) -> None:
-            notes = self.load()
-            for i,n in enumerate(notes):
-                if n.id == note.id: notes[i]=note; break
-            self.save_all(notes)
-
-    class SqliteNoteStore:
-        def __init__(self, path: str):
-            self.path = path
-            os.makedirs(os.path.dirname(path), exist_ok=True)
-            self._ensure_schema()
-        def _conn(self): return sqlite3.connect(self.path)
-        def _ensure_schema(self):
-            with self._conn() as conn:
-                conn.execute("""CREATE TABLE IF NOT EXISTS notes (
-                    id INTEGER PRIMARY KEY,
-                    text TEXT,
-                    created TEXT,
-                    details TEXT,
-                    task_id INTEGER
-                )""")
-                # Ensure task_id column exists for older DBs
-                cur = conn.execute("PRAGMA table_info(notes)").fetchall()
-                cols = [c[1] for c in cur]
-                if 'task_id' not in cols:
-                    try:
-                        conn.execute("ALTER TABLE notes ADD COLUMN task_id INTEGER")
-                    except Exception:
-                        pass
-        def load(self) -> List[Note]:
-            with self._conn() as conn:
-                rows = conn.execute("SELECT id,text,created,details,task_id FROM notes ORDER BY id ASC").fetchall()
-            import json as _json
-            result: List[Note] = []
-            for r in rows:
+                    pass
+        if version < 2 and _fts5_available(conn):
+            conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(text, details)")
+            conn.execute("INSERT INTO notes_fts(rowid,text,details) SELECT id,text,details FROM notes")
+            for stmt in (
+                "CREATE TRIGGER IF NOT EXISTS notes_fts_ai AFTER INSERT ON notes BEGIN"
+                " INSERT INTO notes_fts(rowid,text,details) VALUES (new.id,new.text,new.details); END",
+                "CREATE TRIGGER IF NOT EXISTS notes_fts_ad AFTER DELETE ON notes BEGIN"
+                " DELETE FROM notes_fts WHERE rowid=old.id; END",
+                "CREATE TRIGGER IF NOT EXISTS notes_fts_au AFTER UPDATE ON notes BEGIN"
+                " DELETE FROM notes_fts WHERE rowid=old.id;"
+                " INSERT INTO notes_fts(rowid,text,details) VALUES (new.id,new.text,new.details); END",
+            ):
+                conn.execute(stmt)
+    @staticmethod
+    def _from_row(r) -> Note:
+        details = []
+        if r[3]:
+            try:
+                details = json.loads(r[3])
+            except Exception:
                 details = []
-                if r[3]:
-                    try:
-                        details = _json.loads(r[3])
-                    except Exception:
-                        details = []
-                # task_id may be NULL
-                task_id = r[4] if len(r) > 4 else None
-                result.append(Note(id=r[0], text=r[1], created=r[2], details=details, task_id=task_id))
-            return result
-        def save_all(self, notes: List[Note]) -> None:
-            with self._conn() as conn:
-                conn.execute("DELETE FROM notes")
-                import json as _json
-                for n in notes:
-                    conn.execute("INSERT INTO notes(id,text,created,details,task_id) VALUES(?,?,?,?,?)",
-                                 (n.id, n.text, n.created, _json.dumps(getattr(n, 'details', [])), getattr(n, 'task_id', None)),)
-        def add(self, note: Note) -> None:
-            with self._conn() as conn:
-                import json as _json
-                conn.execute("INSERT INTO notes(id,text,created,details,task_id) VALUES(?,?,?,?,?)",
-                             (note.id, note.text, note.created, _json.dumps(getattr(note, 'details', [])), getattr(note, 'task_id', None)),)
-        def update(self, note: Note) -> None:
-            with self._conn() as conn:
-                import json as _json
-                conn.execute("UPDATE notes SET text=?, created=?, details=?, task_id=? WHERE id=?",
-                             (note.text, note.created, _json.dumps(getattr(note, 'details', [])), getattr(note, 'task_id', None), note.id))
-        def delete(self, note_id: int) -> bool:
-            with self._conn() as conn:
-                cur = conn.execute("DELETE FROM notes WHERE id=?", (note_id,))
-                return cur.rowcount>0
-
-    # Migration or legacy best-effort: if sqlite requested and DB missing, try to migrate from legacy json
-    def _migrate_from_json(src_json: str, target_db: str) -> None:
-        try:
-            if not os.path.exists(src_json):
+        # task_id may be NULL
+        return Note(id=r[0], text=r[1], created=r[2], details=details, task_id=r[4])
+    def load(self) -> List[Note]:
+        with self._tx() as conn:
+            rows = conn.execute(f"SELECT {_NOTE_COLUMNS} FROM notes ORDER BY id ASC").fetchall()
+        return [self._from_row(r) for r in rows]
+    def count(self) -> int:
+        with self._tx() as conn:
+            return conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+    def next_id(self) -> int:
+        with self._tx() as conn:
+            return (conn.execute("SELECT MAX(id) FROM notes").fetchone()[0] or 0) + 1
+    def get(self, note_id: int) -> Optional[Note]:
+        with self._tx() as conn:
+            r = conn.execute(f"SELECT {_NOTE_COLUMNS} FROM notes WHERE id=?", (note_id,)).fetchone()
+        return self._from_row(r) if r else None
+    def iter_pages(self, page_size: int = 500):
+        """Yield lists of notes in id order using keyset pagination."""
+        last = 0
+        while True:
+            with self._tx() as conn:
+                rows = conn.execute(f"SELECT {_NOTE_COLUMNS} FROM notes WHERE id > ? ORDER BY id ASC LIMIT ?", (last, page_size)).fetchall()
+            if not rows:
                 return
-            import json as _json
-            with open(src_json, 'r', encoding='utf-8') as fh:
-                data = _json.load(fh)
-            if not isinstance(data, list) or not data:
+            yield [self._from_row(r) for r in rows]
+            last = rows[-1][0]
+    def search(self, query: str, prefix: bool = True) -> Optional[List[Note]]:
+        """Ranked (bm25) full-text search over text and details; None if unavailable."""
+        cols = ",".join("t." + c for c in _NOTE_COLUMNS.split(","))
+        with self._tx() as conn:
+            rows = self._fts_match(conn, query, prefix, f"SELECT {cols} FROM notes t")
+        return None if rows is None else [self._from_row(r) for r in rows]
+    def get_at(self, display_index: int) -> Note:
+        """Return the note shown at 1-based `display_index`; IndexError if out of range."""
+        r = None
+        if display_index >= 1:
+            with self._tx() as conn:
+                r = conn.execute(f"SELECT {_NOTE_COLUMNS} FROM notes ORDER BY id ASC LIMIT 1 OFFSET ?", (display_index - 1,)).fetchone()
+        if r is None:
+            raise IndexError("Display index out of range")
+        return self._from_row(r)
+    def save_all(self, notes: List[Note], diff: bool = False) -> None:
+        with self._tx() as conn:
+            if not diff:
+                conn.execute("DELETE FROM notes")
+                conn.executemany(_NOTE_INSERT, (_note_row(n) for n in notes))
                 return
-            SqliteNoteStore(target_db)._ensure_schema()
-            conn = SqliteNoteStore(target_db)._conn()
-            with conn:
-                for item in data:
-                    details = _json.dumps(item.get('details', []))
-                    task_id = item.get('task_id') if isinstance(item, dict) else None
-                    conn.execute("INSERT OR IGNORE INTO notes(id,text,created,details,task_id) VALUES(?,?,?,?,?)",
-                                 (item.get('id'), item.get('text'), item.get('created'), details, task_id),)
-        except Exception:
+            existing = {r[0]: r for r in conn.execute(f"SELECT {_NOTE_COLUMNS} FROM notes")}
+            changed = []
+            for n in notes:
+                row = _note_row(n)
+                if existing.pop(n.id, None) != row:
+                    changed.append(row)
+            conn.executemany(_NOTE_UPSERT, changed)
+            conn.executemany("DELETE FROM notes WHERE id=?", ((i,) for i in existing))
+    def add(self, note: Note) -> None:
+        with self._tx() as conn:
+            conn.execute(_NOTE_INSERT, _note_row(note))
+    def add_many(self, notes: List[Note]) -> None:
+        with self._tx() as conn:
+            conn.executemany(_NOTE_INSERT, (_note_row(n) for n in notes))
+    def update(self, note: Note) -> None:
+        with self._tx() as conn:
+            row = _note_row(note)
+            conn.execute("UPDATE notes SET text=?, created=?, details=?, task_id=? WHERE id=?", row[1:] + row[:1])
+    def delete(self, note_id: int) -> bool:
+        with self._tx() as conn:
+            cur = conn.execute("DELETE FROM notes WHERE id=?", (note_id,))
+            return cur.rowcount>0
+
+# Migration or legacy best-effort: if sqlite requested and DB missing, try to migrate from legacy json
+def _migrate_notes_from_json(src_json: str, target_db: str) -> None:
+    try:
+        if not os.path.exists(src_json):
+            return
+        import json as _json
+        with open(src_json, 'r', encoding='utf-8') as fh:
+            data = _json.load(fh)
+        if not isinstance(data, list) or not data:
             return
+        store = SqliteNoteStore(target_db)
+        with store._tx() as conn:
+            for item in data:
+                details = _json.dumps(item.get('details', []))
+                task_id = item.get('task_id') if isinstance(item, dict) else None
+                conn.execute("INSERT OR IGNORE INTO notes(id,text,created,details,task_id) VALUES(?,?,?,?,?)",
+                             (item.get('id'), item.get('text'), item.get('created'), details, task_id),)
+        store.close()
+    except Exception:
+        return
 
-    # Return appropriate store
+# Note stores are cached per (backend, base_dir) so a process opens each store,
+# probes legacy locations and checks the schema at most once.
+_NOTE_STORES: Dict[Tuple[str, str], object] = {}
+_NOTE_STORES_LOCK = threading.Lock()
+
+def _open_note_store(kind: str, base_dir: str):
+    data_dir = os.path.join(base_dir, 'app_data'); os.makedirs(data_dir, exist_ok=True)
+    db_path = os.path.join(data_dir, 'notes.db')
+    json_path = os.path.join(data_dir, 'notes.json')
     if kind == 'sqlite':
         if not os.path.exists(db_path):
             # attempt legacy json locations
             for loc in (os.path.join(base_dir, 'data_pkms'), os.path.join(base_dir, 'demo_data')):
                 try_src = os.path.join(loc, 'notes.json')
-                _migrate_from_json(try_src, db_path)
-            _migrate_from_json(os.path.join(base_dir, 'notes.json'), db_path)
+                _migrate_notes_from_json(try_src, db_path)
+            _migrate_notes_from_json(os.path.join(base_dir, 'notes.json'), db_path)
         return SqliteNoteStore(db_path)
     # json backend: copy from legacy if missing
     if not os.path.exists(json_path):
@@ -392,54 +981,101 @@ def make_note_store(kind: str, base_dir: str):
                 continue
     return JsonNoteStore(json_path)
 
+def make_note_store(kind: str, base_dir: str):
+    """Return the note store for 'json' or 'sqlite' backends.
+    Notes are stored in `app_data/notes.json` or `app_data/notes.db` (sqlite path uses tasks.db dir).
+    Stores are cached per (backend, base_dir); call `clear_note_stores()` to drop them.
+    """
+    key = (kind, os.path.abspath(base_dir))
+    with _NOTE_STORES_LOCK:
+        store = _NOTE_STORES.get(key)
+        # a cached handle is only reused while its backing file/dir is still there
+        if store is not None and os.path.exists(store.path if kind == 'sqlite' else os.path.dirname(store.path)):
+            return store
+        if store is not None and hasattr(store, 'close'):
+            store.close()
+        store = _NOTE_STORES[key] = _open_note_store(kind, base_dir)
+        return store
+
+def clear_note_stores() -> None:
+    """Close and forget every cached note store."""
+    with _NOTE_STORES_LOCK:
+        for store in _NOTE_STORES.values():
+            if hasattr(store, 'close'):
+                store.close()
+        _NOTE_STORES.clear()
+
 
 ### Outward-facing helpers for notes (backend dispatch)
-# Use map_display_index from pkms_core.utils for mapping 1-based display indexes to ids
+# Display indexes are 1-based positions in id order; stores resolve them via `get_at`.
 
 def list_notes(backend: str, base_dir: str) -> List[Note]:
     store = make_note_store(backend, base_dir)
     return store.load()
 
 def add_note(backend: str, base_dir: str, text: str, task_id: int = None) -> Note:
-    notes = list_notes(backend, base_dir)
-    next_id = (max((n.id for n in notes), default=0) + 1) if notes else 1
+    store = make_note_store(backend, base_dir)
     from datetime import datetime, timezone
     created = datetime.now(timezone.utc).isoformat()
-    note = Note(id=next_id, text=text, created=created, details=[], task_id=task_id)
-    store = make_note_store(backend, base_dir)
+    note = Note(id=store.next_id(), text=text, created=created, details=[], task_id=task_id)
     store.add(note)
     return note
 
+def add_notes(backend: str, base_dir: str, items) -> List[Note]:
+    """Bulk-create notes from dicts (text, details, created): ids are allocated in
+    one pass and the batch is persisted with a single store write/transaction."""
+    store = make_note_store(backend, base_dir)
+    from datetime import datetime, timezone
+    now = datetime.now(timezone.utc).isoformat()
+    next_id = store.next_id()
+    notes = [Note(id=next_id + i, text=it.get('text', ''), created=it.get('created') or now,
+                  details=list(it.get('details') or []), task_id=it.get('task_id')) for i, it in enumerate(items)]
+    if notes: store.add_many(notes)
+    return notes
+
 def describe_note(backend: str, base_dir: str, display_index: int, detail: str) -> None:
-    notes = list_notes(backend, base_dir)
-    note_id = map_display_index(notes, display_index)
     store = make_note_store(backend, base_dir)
-    # find note modify then update
-    for n in notes:
-        if n.id == note_id:
-            n.details.append(detail)
-            store.update(n)
-            return
-    raise KeyError('note not found')
+    note = store.get_at(display_index)
+    note.details.append(detail)
+    store.update(note)
 
 def delete_note(backend: str, base_dir: str, display_index: int) -> bool:
-    notes = list_notes(backend, base_dir)
-    note_id = map_display_index(notes, display_index)
     store = make_note_store(backend, base_dir)
-    return store.delete(note_id)
+    return store.delete(store.get_at(display_index).id)
 
-def search_notes(backend: str, base_dir: str, query: str) -> List[Note]:
+def _notes_fuzzy_index(notes) -> TrigramIndex:
+    from .search_index import TrigramIndex
+    return TrigramIndex.build((n.id, " ".join([n.text or '', *(d or '' for d in n.details)])) for n in notes)
+
+def search_notes(backend: str, base_dir: str, query: str, prefix: bool = True, fuzzy: bool = False,
+                 max_distance: Optional[int] = None) -> List[Note]:
+    """Find notes whose text or details match `query`.
+
+    The sqlite backend uses its ranked full-text index (word prefixes unless
+    ``prefix=False``); the JSON backend, or a query with no words the index
+    can match (e.g. only punctuation), falls back to a case-insensitive
+    substring scan. ``fuzzy=True`` instead
+    matches every query word within `max_distance` edits through a trigram
+    index (cached by the JSON store, built per call for sqlite).
+    """
+    store = make_note_store(backend, base_dir)
+    if fuzzy:
+        if hasattr(store, 'fuzzy_index'):
+            idx = store.fuzzy_index()
+        else:
+            idx = _notes_fuzzy_index(n for page in store.iter_pages() for n in page)
+        from .search_index import FUZZY_MAX_DISTANCE
+        ids = idx.search(query, FUZZY_MAX_DISTANCE if max_distance is None else max_distance, prefix)
+        return [n for n in (store.get(i) for i in ids) if n is not None]
+    ranked = store.search(query, prefix=prefix) if hasattr(store, 'search') else None
+    if ranked is not None:
+        return ranked
     q = (query or '').lower()
     results: List[Note] = []
-    for n in list_notes(backend, base_dir):
+    for n in store.load():
         if q in (n.text or '').lower() or any(q in (d or '').lower() for d in getattr(n, 'details', [])):
             results.append(n)
     return results
 
 def get_note_by_display_index(backend: str, base_dir: str, display_index: int) -> Note:
-    notes = list_notes(backend, base_dir)
-    note_id = map_display_index(notes, display_index)
-    for n in notes:
-        if n.id == note_id:
-            return n
-    raise KeyError('note not found')
+    return make_note_store(backend, base_dir).get_at(display_index)
@@ -0,0 +1,189 @@
+"""Document-derived task suggestions and their content-hash cache.
+
+`extract_suggestions` is the TODO/verb heuristic behind
+`Agent.suggest_tasks_from_document`. `SuggestionCache` stores its output per
+document as doc id -> content hash -> suggestions in `<name>.suggest.json`
+next to the document snapshot, stamped with the snapshot/journal signature
+(the same one `docs.idx` uses). While the stamp matches, the merged
+suggestion list is served without reading any document, and a changed or
+re-added text whose hash is already known is never re-scanned.
+
+`extract_many` shards large batches of texts across a process (or thread)
+pool; results come back in input order, so de-duplication stays stable.
+The worker count comes from ``PKMS_SUGGEST_WORKERS`` (a number or ``auto``;
+default 1, i.e. serial).
+"""
+from __future__ import annotations
+import hashlib, json, os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .search_index import index_signature
+
+SUGGEST_CACHE_VERSION = 1
+# below this many bytes of text a pool costs more to start than it saves
+PARALLEL_MIN_BYTES = 4 << 20
+
+_VERBS = {"add","create","implement","write","refactor","plan","review","test","fix","update","remove","design"}
+
+def extract_suggestions(text: str) -> List[str]:
+    """TODO lines (marker stripped) and lines starting with an action verb."""
+    suggestions: List[str] = []
+    for line in text.splitlines():
+        l = line.strip()
+        if not l: continue
+        upper = l.upper()
+        if "TODO" in upper or upper.startswith("TODO:"):
+            suggestions.append(l.replace("TODO:", "").replace("TODO", "").strip())
+            continue
+        first = l.split()[0].lower()
+        if first in _VERBS:
+            suggestions.append(l)
+    return suggestions
+
+def suggest_workers(workers: Optional[int] = None) -> int:
+    """Explicit `workers`, else ``PKMS_SUGGEST_WORKERS`` (``auto`` = CPU count); at least 1."""
+    if workers is None:
+        raw = os.environ.get('PKMS_SUGGEST_WORKERS', '1').strip().lower()
+        workers = (os.cpu_count() or 1) if raw == 'auto' else int(raw) if raw.isdigit() else 1
+    return max(1, workers)
+
+def _extract_shard(texts: List[str]) -> List[List[str]]:
+    return [extract_suggestions(t) for t in texts]
+
+def extract_many(texts: Sequence[str], workers: Optional[int] = None, pool: str = 'process',
+                 min_bytes: Optional[int] = None) -> List[List[str]]:
+    """`extract_suggestions` for every text, in input order.
+
+    With more than one worker and at least `min_bytes` of text, contiguous
+    shards are mapped over a ``'process'`` or ``'thread'`` pool; if the pool
+    cannot be used the batch is processed serially. `min_bytes` defaults to
+    PARALLEL_MIN_BYTES.
+    """
+    texts = list(texts)
+    n = suggest_workers(workers)
+    if min_bytes is None: min_bytes = PARALLEL_MIN_BYTES
+    if n <= 1 or len(texts) < 2 or sum(map(len, texts)) < min_bytes:
+        return _extract_shard(texts)
+    # a few shards per worker evens out skewed document sizes
+    step = max(1, -(-len(texts) // (n * 4)))
+    shards = [texts[i:i + step] for i in range(0, len(texts), step)]
+    # imported here: concurrent.futures.process (multiprocessing) costs more than the rest of pkms_core to load
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+    executor = ThreadPoolExecutor if pool == 'thread' else ProcessPoolExecutor
+    try:
+        with executor(max_workers=n) as ex:
+            return [r for part in ex.map(_extract_shard, shards) for r in part]
+    except Exception:
+        return _extract_shard(texts)
+
+def content_hash(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+def suggestions_path(snapshot_path: str) -> str:
+    return os.path.splitext(snapshot_path)[0] + ".suggest.json"
+
+def merge_suggestions(lists: Iterable[List[str]], limit: Optional[int] = None) -> List[str]:
+    """Concatenate per-document lists, dropping repeats (first occurrence wins)."""
+    seen = set(); out: List[str] = []
+    for items in lists:
+        for s in items:
+            if s not in seen:
+                out.append(s); seen.add(s)
+                if limit is not None and len(out) >= limit:
+                    return out
+    return out
+
+class SuggestionCache:
+    """Per-document suggestions keyed by content hash, in document order."""
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self._docs: Dict[int, str] = {}           # doc id -> content hash, in document order
+        self._by_hash: Dict[str, List[str]] = {}
+        self._refs: Dict[str, int] = {}           # content hash -> number of documents with it
+    def __len__(self) -> int:
+        return len(self._docs)
+    @classmethod
+    def load(cls, path: str, signature: Optional[Tuple[int, ...]]) -> Optional["SuggestionCache"]:
+        """The persisted cache if it was written for `signature` (any, if None); None if missing, stale or corrupt."""
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                data = json.load(fh)
+            if data.get("version") != SUGGEST_CACHE_VERSION:
+                return None
+            if signature is not None and tuple(data.get("signature") or ()) != tuple(signature):
+                return None
+            cache = cls(path)
+            cache._by_hash = {h: list(s) for h, s in data["by_hash"].items()}
+            cache._docs = {int(i): h for i, h in data["docs"] if h in cache._by_hash}
+            for h in cache._docs.values(): cache._refs[h] = cache._refs.get(h, 0) + 1
+            return cache
+        except Exception:
+            return None
+    def save(self, signature: Tuple[int, ...]) -> None:
+        if not self.path:
+            return
+        data = {"version": SUGGEST_CACHE_VERSION, "signature": list(signature),
+                "docs": [[i, h] for i, h in self._docs.items()], "by_hash": self._by_hash}
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(data, fh, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass  # the cache is an optimization; it is rebuilt on the next read
+    def put(self, doc) -> List[str]:
+        """Suggestions for `doc`, extracted only if its text hash is new."""
+        h = content_hash(doc.text or "")
+        found = self._by_hash.get(h)
+        if found is None:
+            found = self._by_hash[h] = extract_suggestions(doc.text or "")
+        old = self._docs.get(doc.id)
+        if old != h:
+            self._docs[doc.id] = h; self._refs[h] = self._refs.get(h, 0) + 1
+            if old is not None: self._unref(old)
+        return found
+    def discard(self, doc_id: int) -> None:
+        old = self._docs.pop(doc_id, None)
+        if old is not None: self._unref(old)
+    def _unref(self, h: str) -> None:
+        n = self._refs.get(h, 0) - 1
+        if n > 0:
+            self._refs[h] = n
+        else:
+            self._refs.pop(h, None); self._by_hash.pop(h, None)
+    def sync(self, docs: Iterable, workers: Optional[int] = None) -> None:
+        """Make the cache mirror `docs` (in their order), reusing known hashes;
+        new texts are extracted in one `extract_many` batch."""
+        known = self._by_hash
+        self._docs, self._by_hash, self._refs = {}, {}, {}
+        todo: Dict[str, str] = {}
+        for d in docs:
+            h = content_hash(d.text or "")
+            if h not in self._by_hash and h not in todo:
+                found = known.get(h)
+                if found is not None: self._by_hash[h] = found
+                else: todo[h] = d.text or ""
+            if d.id not in self._docs:
+                self._docs[d.id] = h; self._refs[h] = self._refs.get(h, 0) + 1
+        self._by_hash.update(zip(todo, extract_many(list(todo.values()), workers)))
+    def merged(self, limit: Optional[int] = None) -> List[str]:
+        return merge_suggestions((self._by_hash[h] for h in self._docs.values()), limit)
+
+def load_or_build(snapshot_path: Optional[str], docs_loader, workers: Optional[int] = None) -> SuggestionCache:
+    """The fresh persisted cache for `snapshot_path`, or one rebuilt from
+    `docs_loader()` (and persisted when the snapshot did not change meanwhile).
+    A stale cache still supplies the suggestions of unchanged texts."""
+    if not snapshot_path:
+        cache = SuggestionCache(); cache.sync(docs_loader(), workers); return cache
+    path = suggestions_path(snapshot_path)
+    sig = index_signature(snapshot_path)
+    cache = SuggestionCache.load(path, sig)
+    if cache is not None:
+        return cache
+    cache = SuggestionCache.load(path, None) or SuggestionCache(path)
+    cache.sync(docs_loader(), workers)
+    if sig == index_signature(snapshot_path):
+        cache.save(sig)
+    return cache
+
+__all__ = ["extract_suggestions", "extract_many", "suggest_workers", "content_hash", "suggestions_path", "merge_suggestions", "SuggestionCache", "load_or_build"]
@@ -0,0 +1,203 @@
+"""Streaming export/import of tasks and notes.
+
+The NDJSON format writes one JSON object per line: a `meta` header followed by
+`task` and `note` records. Both directions stream, so memory stays bounded by
+the batch size rather than the dump size; imports are written in batches, each
+batch in a single store transaction (or a single file write for JSON stores).
+The legacy `{"tasks": [...], "notes": [...]}` document is still read, one
+array element at a time, so it streams in batches too.
+"""
+from __future__ import annotations
+import json
+from itertools import chain, islice
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+NDJSON_FORMAT = "pkms-ndjson"
+NDJSON_VERSION = 1
+DEFAULT_BATCH_SIZE = 1000
+
+Progress = Callable[[str, int], None]
+
+
+def export_format_for(path: str, requested: Optional[str] = None) -> str:
+    """Pick 'ndjson' or 'json' from an explicit choice or the file extension."""
+    if requested:
+        return requested
+    return "ndjson" if path.lower().endswith((".ndjson", ".jsonl")) else "json"
+
+
+def _iter_store(store) -> Iterator:
+    if hasattr(store, "iter_pages"):
+        for page in store.iter_pages():
+            yield from page
+    else:
+        yield from store.load()
+
+
+def iter_export_records(tasks: Iterable, note_store) -> Iterator[Dict]:
+    yield {"type": "meta", "format": NDJSON_FORMAT, "version": NDJSON_VERSION}
+    for t in tasks:
+        rec = t.to_dict(); rec["type"] = "task"
+        yield rec
+    for n in _iter_store(note_store):
+        rec = n.to_dict(); rec["type"] = "note"
+        yield rec
+
+
+def write_ndjson(path: str, records: Iterable[Dict], progress: Optional[Progress] = None, every: int = DEFAULT_BATCH_SIZE) -> int:
+    """Write `records` one per line; returns the number of task/note records written."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as fh:
+        for rec in records:
+            fh.write(json.dumps(rec, ensure_ascii=False))
+            fh.write("\n")
+            if rec.get("type") != "meta":
+                count += 1
+                if progress and count % every == 0:
+                    progress("exported", count)
+    if progress:
+        progress("exported", count)
+    return count
+
+
+_WS = " \t\r\n"
+_DECODER = json.JSONDecoder()
+
+
+class _JsonReader:
+    """Decodes JSON values one at a time from a file, keeping only the unread tail buffered."""
+    def __init__(self, fh, chunk: int = 1 << 16):
+        self.fh = fh; self.chunk = chunk
+        self.buf = ""; self.pos = 0; self.eof = False
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        data = self.fh.read(self.chunk)
+        if not data:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + data; self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or '' at end of input."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WS:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def expect(self, ch: str) -> None:
+        if self.peek() != ch:
+            raise ValueError(f"malformed JSON export: expected {ch!r}")
+        self.pos += 1
+
+    def skip(self, ch: str) -> bool:
+        if self.peek() != ch:
+            return False
+        self.pos += 1
+        return True
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                val, end = _DECODER.raw_decode(self.buf, self.pos)
+            except ValueError:
+                # the value continues past the buffer; invalid JSON still fails at end of input
+                if self._fill(): continue
+                raise
+            # a number ending at the buffer edge may continue in the next chunk
+            if end == len(self.buf) and self._fill():
+                continue
+            self.pos = end
+            return val
+
+
+def _iter_legacy_records(fh) -> Iterator[Dict]:
+    kinds = {"tasks": "task", "notes": "note"}
+    r = _JsonReader(fh)
+    r.expect("{")
+    if r.skip("}"):
+        return
+    while True:
+        key = r.value(); r.expect(":")
+        kind = kinds.get(key)
+        if kind and r.skip("["):
+            if not r.skip("]"):
+                while True:
+                    yield dict(r.value(), type=kind)
+                    if not r.skip(","):
+                        r.expect("]"); break
+        else:
+            r.value()
+        if not r.skip(","):
+            r.expect("}")
+            return
+
+
+def iter_import_records(path: str) -> Iterator[Dict]:
+    """Yield task/note records from an NDJSON dump or a legacy JSON export."""
+    with open(path, "r", encoding="utf-8") as fh:
+        first = fh.readline()
+        try:
+            head = json.loads(first)
+        except ValueError:
+            head = None
+        if not (isinstance(head, dict) and "type" in head):
+            # legacy single-document export: decoded element by element
+            fh.seek(0)
+            yield from _iter_legacy_records(fh)
+            return
+        for line in chain([first], fh):
+            if not line.strip():
+                continue
+            rec = json.loads(line)
+            if rec.get("type") in ("task", "note"):
+                yield rec
+
+
+def _batches(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    """Chunk `records` into lists of `size`; size <= 0 yields everything as one batch."""
+    it = iter(records)
+    if size <= 0:
+        batch = list(it)
+        if batch: yield batch
+        return
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def import_records(records: Iterable[Dict], tm, note_backend: str, base_dir: str, batch_size: int = DEFAULT_BATCH_SIZE,
+                   progress: Optional[Progress] = None) -> Dict[str, int]:
+    """Import records in batches through the bulk APIs (`TaskManager.add_many`,
+    `storage.add_notes`): one store write per kind per batch, ids reallocated.
+    Returns per-kind counts."""
+    from .storage import add_notes
+    counts = {"tasks": 0, "notes": 0}
+    for batch in _batches(records, batch_size):
+        tasks = [r for r in batch if r.get("type") == "task"]
+        # note ids are reallocated, so links to the exporting tree's task ids are dropped
+        notes = [dict(r, task_id=None) for r in batch if r.get("type") == "note"]
+        if tasks:
+            tm.add_many(tasks)
+            counts["tasks"] += len(tasks)
+        if notes:
+            add_notes(note_backend, base_dir, notes)
+            counts["notes"] += len(notes)
+        if progress:
+            progress("imported", counts["tasks"] + counts["notes"])
+    return counts
+
+
+__all__ = [
+    "export_format_for",
+    "iter_export_records",
+    "write_ndjson",
+    "iter_import_records",
+    "import_records",
+]
@@ -74,7 +74,7 @@ def run_tui(task_manager, doc_manager, agent):
                 console.print('usage: remove-detail <id> <index>')
             continue
         if cmd.startswith('advise'):
-            for line in agent.productivity_advice(task_manager.list(), doc_manager.list()):
+            for line in agent.advice_for(task_manager, doc_manager):
                 console.print(line)
             continue
         console.print('unknown command')
@@ -0,0 +1,66 @@
+"""Benchmark BM25 document search over a synthetic corpus.
+
+Builds the in-memory index, persists it, and times term, multi-term and
+phrase queries against both the in-memory and the memory-mapped index.
+Vocabulary frequencies are Zipf-like so common and rare terms both occur.
+
+Usage:
+  python scripts/bench_bm25.py --docs 100000
+"""
+from __future__ import annotations
+import argparse, os, random, sys, tempfile, time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pkms_core.search_index import (InvertedIndex, MappedIndex, bm25_scores, index_signature, parse_query,
+                                    phrase_matches, top_k, write_index)
+
+QUERIES = ["w3", "w17 w250", "w1 w2 w3 w4", "w4000", '"w1 w2"', 'w5 "w10 w11"']
+
+
+def make_fields(n: int, vocab: int = 20000, seed: int = 7):
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(1, vocab + 1)]
+    cum, total = [], 0.0
+    for i in range(1, vocab + 1):
+        total += 1.0 / i; cum.append(total)
+    for doc_id in range(1, n + 1):
+        title = " ".join(rng.choices(words, cum_weights=cum, k=4))
+        body = " ".join(rng.choices(words, cum_weights=cum, k=40))
+        yield doc_id, [(title, 2.0), (body, 1.0), ("bench", 1.5)]
+
+
+def run_query(index, query: str):
+    terms, phrases = parse_query(query)
+    scores = bm25_scores(index, terms)
+    for p in phrases:
+        keep = phrase_matches(index, p)
+        scores = {d: s for d, s in scores.items() if d in keep}
+    return top_k(scores, 10)
+
+
+def timed(fn):
+    start = time.perf_counter(); out = fn(); return (time.perf_counter() - start) * 1000, out
+
+
+def bench(n: int) -> None:
+    t_build, idx = timed(lambda: InvertedIndex.build(make_fields(n)))
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "docs.idx"); sig = index_signature(os.path.join(td, "docs.json"))
+        t_write, _ = timed(lambda: write_index(path, idx, sig, n))
+        size = os.path.getsize(path)
+        t_open, mapped = timed(lambda: MappedIndex.open(path, sig))
+        print(f"{n} docs | build {t_build:.0f} ms | persist {t_write:.0f} ms ({size / 2**20:.1f} MiB) | mmap open {t_open:.2f} ms")
+        for q in QUERIES:
+            t_mem, top_mem = timed(lambda: run_query(idx, q))
+            t_map, top_map = timed(lambda: run_query(mapped, q))
+            same = [d for d, _ in top_mem] == [d for d, _ in top_map]
+            print(f"  {q:<16} in-memory {t_mem:8.2f} ms | mapped {t_map:8.2f} ms | same top-10: {same}")
+        mapped.close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    p = argparse.ArgumentParser(description="Benchmark BM25 document search")
+    p.add_argument("--docs", type=int, default=100000)
+    args = p.parse_args()
+    bench(args.docs)
@@ -0,0 +1,58 @@
+"""Benchmark scripted CLI use with and without a resident `pkms serve` process.
+
+Seeds a temporary data directory with N tasks and N documents, then times
+a batch of fresh `pkms` processes per command, first in-process
+(``PKMS_NO_DAEMON=1``) and then forwarded to a server started for the
+directory.
+
+Usage:
+  python scripts/bench_daemon.py --size 20000 --runs 10
+"""
+from __future__ import annotations
+import argparse, os, subprocess, sys, tempfile, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from pkms_core.daemon import socket_path
+
+from bench_startup import seed
+
+COMMANDS = [['search', 'roadmap', '--limit', '5'], ['add', 'Bench task'], ['advise'], ['info']]
+
+
+def batch(cmd, runs: int, cwd: str, env) -> float:
+    start = time.perf_counter()
+    for _ in range(runs):
+        subprocess.run([sys.executable, '-m', 'pkms_core.cli', *cmd], cwd=cwd, env=env,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) * 1000 / runs
+
+
+def bench(n: int, runs: int) -> None:
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    env.pop('PKMS_NO_DAEMON', None)
+    with tempfile.TemporaryDirectory() as td:
+        seed(td, n)
+        local = {tuple(c): batch(c, runs, td, dict(env, PKMS_NO_DAEMON='1')) for c in COMMANDS}
+        server = subprocess.Popen([sys.executable, '-m', 'pkms_core.cli', 'serve'], cwd=td, env=env,
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            while not os.path.exists(socket_path(td)):
+                time.sleep(0.05)
+            batch(COMMANDS[0], 1, td, env)  # let the server load the stores once
+            print(f"{n} tasks/docs, mean of {runs} runs | in-process | via server")
+            for c in COMMANDS:
+                print(f"  {' '.join(c)[:24]:<24} {local[tuple(c)]:8.1f} ms {batch(c, runs, td, env):8.1f} ms")
+        finally:
+            subprocess.run([sys.executable, '-m', 'pkms_core.cli', 'serve', '--stop'], cwd=td, env=env,
+                           stdout=subprocess.DEVNULL)
+            server.wait(timeout=10)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    p = argparse.ArgumentParser(description="Benchmark pkms with and without the resident server")
+    p.add_argument("--size", type=int, default=20000)
+    p.add_argument("--runs", type=int, default=10)
+    args = p.parse_args()
+    bench(args.size, args.runs)
@@ -0,0 +1,50 @@
+"""Benchmark DocumentManager startup and first query with the persisted index.
+
+For each corpus size, times construction, the first search when `docs.idx`
+must be built, and construction plus a search-id lookup when the index is
+memory-mapped from disk: as written, and again after a journaled add and a
+delete (mapped plus the replayed `docs.idx.delta`).
+
+Usage:
+  python scripts/bench_doc_startup.py --sizes 10000 50000
+"""
+from __future__ import annotations
+import argparse, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pkms_core.core import DocumentManager
+from pkms_core.models import Document
+from pkms_core.storage import DocumentStore
+
+
+def make_docs(n: int):
+    return [Document(id=i, title=f"Doc {i}", text=f"Meeting notes {i}: review roadmap item {i % 97} and plan sprint {i % 13} w{i}",
+                     tags=["bench", f"t{i % 7}"], links=[], created="2025-01-01T00:00:00+00:00", updated="2025-01-01T00:00:00+00:00")
+            for i in range(1, n + 1)]
+
+
+def timed(fn) -> float:
+    start = time.perf_counter(); fn(); return (time.perf_counter() - start) * 1000
+
+
+def bench(n: int) -> None:
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "docs.json")
+        DocumentStore(path).save_all(make_docs(n))
+        t_init = timed(lambda: DocumentManager(store=DocumentStore(path)))
+        t_cold = timed(lambda: DocumentManager(store=DocumentStore(path)).search("roadmap"))
+        t_warm = timed(lambda: DocumentManager(store=DocumentStore(path))._search_index().get("w42"))
+        DocumentManager(store=DocumentStore(path, journal=True)).add("Fresh", "fresh roadmap")
+        DocumentManager(store=DocumentStore(path, journal=True)).delete(n // 2)
+        t_edit = timed(lambda: DocumentManager(store=DocumentStore(path, journal=True))._search_index().get("w42"))
+    print(f"{n:>8} docs | construct {t_init:6.2f} ms | first search, build+persist {t_cold:8.1f} ms | mapped open + lookup {t_warm:6.2f} ms"
+          f" | after add+delete {t_edit:6.2f} ms")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    p = argparse.ArgumentParser(description="Benchmark document index startup")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 50000])
+    args = p.parse_args()
+    for n in args.sizes:
+        bench(n)
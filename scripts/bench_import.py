@@ -0,0 +1,70 @@
+"""Benchmark bulk import of an NDJSON dump into the json and sqlite backends.
+
+Compares the legacy per-item path (`TaskManager.add` + `add_detail`, `add_note`)
+against the batched `transfer.import_records` pipeline.
+
+Usage:
+  python scripts/bench_import.py --records 50000 --legacy 2000
+"""
+from __future__ import annotations
+import argparse, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pkms_core.core import TaskManager
+from pkms_core.storage import add_note, clear_note_stores
+from pkms_core.transfer import import_records, iter_import_records, write_ndjson
+
+
+def make_records(n: int):
+    yield {"type": "meta"}
+    for i in range(n):
+        if i % 10 == 9:
+            yield {"type": "note", "text": f"Note {i}", "details": ["context"]}
+        else:
+            yield {"type": "task", "text": f"Task {i} sample text", "priority": (i % 5) + 1,
+                   "tags": ["bench"], "details": ["first step", "second step"], "completed": i % 3 == 0}
+
+
+def legacy_import(tm: TaskManager, backend: str, base: str, path: str) -> None:
+    for r in iter_import_records(path):
+        if r["type"] == "task":
+            t = tm.add(r["text"], priority=r["priority"], tags=r["tags"])
+            for d in r["details"]:
+                tm.add_detail(t.id, d)
+        else:
+            add_note(backend, base, r["text"])
+
+
+def bench(backend: str, n: int, legacy_n: int) -> None:
+    for label, count, fn in (("legacy", legacy_n, legacy_import), ("batched", n, None)):
+        if not count:
+            continue
+        with tempfile.TemporaryDirectory() as td:
+            cwd = os.getcwd(); os.chdir(td)
+            try:
+                src = os.path.join(td, "dump.ndjson")
+                write_ndjson(src, make_records(count))
+                tm = TaskManager(backend=backend, lazy=True)
+                start = time.perf_counter()
+                if fn:
+                    fn(tm, backend, td, src)
+                else:
+                    import_records(iter_import_records(src), tm, backend, td, batch_size=1000 if tm.lazy else 0)
+                elapsed = time.perf_counter() - start
+                close = getattr(tm.store, "close", None)
+                if close: close()
+                clear_note_stores()
+            finally:
+                os.chdir(cwd)
+        print(f"{backend:>6} {label:>7} | {count:>7} records | {elapsed:8.2f} s | {count / elapsed:10.0f} records/s")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    p = argparse.ArgumentParser(description="Benchmark bulk import")
+    p.add_argument("--records", type=int, default=50000)
+    p.add_argument("--legacy", type=int, default=2000, help="records for the per-item baseline (0 to skip)")
+    p.add_argument("--backends", nargs="+", default=["json", "sqlite"])
+    args = p.parse_args()
+    for b in args.backends:
+        bench(b, args.records, args.legacy)
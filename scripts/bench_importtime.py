@@ -0,0 +1,61 @@
+"""Import-time regression check for CLI commands, based on `python -X importtime`.
+
+Runs each command in a fresh interpreter (in a temporary data directory),
+sums the cumulative import time of every top-level module loaded after
+interpreter startup, and lists the most expensive ones. Exits non-zero when
+a command exceeds --budget-ms of imports or loads one of the --forbid
+modules (by default the optional heavy dependencies, which `add`, `notes add`
+and `info` must never import).
+
+Usage:
+  python scripts/bench_importtime.py --budget-ms 60 --top 8
+"""
+from __future__ import annotations
+import argparse, os, re, subprocess, sys, tempfile, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+COMMANDS = [['add', 'Bench task'], ['notes', 'add', 'Bench note'], ['info'], ['search', 'bench']]
+FORBID = ['rich', 'keyring', 'openai', 'multiprocessing', 'pkms_core.llm', 'pkms_core.chat']
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def importtime(code: str, cwd: str, env):
+    """[(module, cumulative us, depth)] for one interpreter run, and its wall time in ms."""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=cwd, env=env,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    wall = (time.perf_counter() - start) * 1000
+    rows = [(m.group(4), int(m.group(2)), len(m.group(3)) // 2) for m in map(_LINE.match, proc.stderr.splitlines()) if m]
+    return rows, wall
+
+
+def bench(budget_ms: float, top: int, forbid) -> int:
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    failures = 0
+    with tempfile.TemporaryDirectory() as td:
+        startup = {name for name, _us, _d in importtime('pass', td, env)[0]}
+        for cmd in COMMANDS:
+            rows, wall = importtime(f"from pkms_core.cli import main; main({cmd!r})", td, env)
+            loaded = {name for name, _us, _d in rows}
+            roots = [(name, us) for name, us, depth in rows if depth == 0 and name not in startup]
+            total = sum(us for _n, us in roots) / 1000
+            bad = sorted(m for m in loaded if any(m == f or m.startswith(f + '.') for f in forbid))
+            ok = total <= budget_ms and not bad
+            failures += not ok
+            print(f"{' '.join(cmd)[:24]:<24} imports {total:6.1f} ms | wall {wall:6.1f} ms | {'ok' if ok else 'FAIL'}")
+            for name, us in sorted(((n, us) for n, us, _d in rows if n not in startup), key=lambda r: -r[1])[:top]:
+                print(f"    {us / 1000:6.1f} ms  {name}")
+            if bad:
+                print(f"    forbidden: {', '.join(bad)}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    p = argparse.ArgumentParser(description="Import-time regression check for pkms commands")
+    p.add_argument("--budget-ms", type=float, default=60.0, help="max cumulative import time per command")
+    p.add_argument("--top", type=int, default=8, help="show the N most expensive imports")
+    p.add_argument("--forbid", nargs="*", default=FORBID, help="modules that must not be imported")
+    args = p.parse_args()
+    raise SystemExit(bench(args.budget_ms, args.top, args.forbid))
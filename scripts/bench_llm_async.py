@@ -0,0 +1,63 @@
+"""Benchmark batched LLM summaries against one-at-a-time requests.
+
+Starts a local Chat Completions stub that answers after --latency-ms and
+summarizes N texts twice: sequentially through `AsyncOpenAIAdapter.summarize`
+(one request per item, like `Agent.summarize_task` in a loop) and in one
+`summarize_many` batch (bounded by --concurrency over pooled connections).
+
+Usage:
+  python scripts/bench_llm_async.py --size 40 --latency-ms 100 --concurrency 4
+"""
+from __future__ import annotations
+import argparse, json, os, sys, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from pkms_core.llm_async import AsyncOpenAIAdapter
+
+
+def stub_server(latency: float) -> ThreadingHTTPServer:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        def log_message(self, *a): pass
+        def do_POST(self):
+            self.rfile.read(int(self.headers["Content-Length"]))
+            time.sleep(latency)
+            data = json.dumps({"choices": [{"message": {"content": "summary"}}]}).encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers(); self.wfile.write(data)
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def bench(n: int, latency_ms: float, concurrency: int) -> None:
+    httpd = stub_server(latency_ms / 1000)
+    url = f"http://127.0.0.1:{httpd.server_address[1]}/v1"
+    texts = [f"Bench task {i} with a fairly long description to summarize" for i in range(n)]
+    try:
+        seq = AsyncOpenAIAdapter(api_key="bench", base_url=url, max_concurrency=concurrency)
+        start = time.perf_counter()
+        for t in texts: seq.summarize(t)
+        seq_ms = (time.perf_counter() - start) * 1000
+        batch = AsyncOpenAIAdapter(api_key="bench", base_url=url, max_concurrency=concurrency)
+        start = time.perf_counter()
+        batch.summarize_many(texts)
+        batch_ms = (time.perf_counter() - start) * 1000
+        print(f"{n} summaries, {latency_ms:.0f} ms latency, concurrency {concurrency}")
+        print(f"  sequential      {seq_ms:8.1f} ms  ({seq.pool.opened} connections)")
+        print(f"  summarize_many  {batch_ms:8.1f} ms  ({batch.pool.opened} connections)")
+    finally:
+        httpd.shutdown(); httpd.server_close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    p = argparse.ArgumentParser(description="Benchmark batched vs sequential LLM summaries")
+    p.add_argument("--size", type=int, default=40)
+    p.add_argument("--latency-ms", type=float, default=100.0)
+    p.add_argument("--concurrency", type=int, default=4)
+    args = p.parse_args()
+    bench(args.size, args.latency_ms, args.concurrency)
@@ -0,0 +1,53 @@
+"""Benchmark the persistent LLM response cache.
+
+Summarizes N prompts through an adapter that answers after --latency-ms,
+first uncached and then through `CachedLLM` twice (cold, then warm), in a
+temporary cache database.
+
+Usage:
+  python scripts/bench_llm_cache.py --size 50 --latency-ms 200
+"""
+from __future__ import annotations
+import argparse, os, sys, tempfile, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from pkms_core.llm_cache import CachedLLM, ResponseCache
+
+
+class SlowLLM:
+    model = "bench"
+    def __init__(self, latency: float):
+        self.latency = latency
+    def available(self) -> bool:
+        return True
+    def summarize(self, text: str) -> str:
+        time.sleep(self.latency)
+        return "summary of " + text[:20]
+
+
+def timed(llm, prompts) -> float:
+    start = time.perf_counter()
+    for p in prompts: llm.summarize(p)
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(n: int, latency_ms: float) -> None:
+    prompts = [f"Tasks: {i} open. Provide 3 prioritized suggestions." for i in range(n)]
+    slow = SlowLLM(latency_ms / 1000)
+    with tempfile.TemporaryDirectory() as td:
+        llm = CachedLLM(slow, ResponseCache(os.path.join(td, 'llm_cache.db')))
+        print(f"{n} prompts, {latency_ms:.0f} ms per LLM call")
+        print(f"  uncached     {timed(slow, prompts):8.1f} ms")
+        print(f"  cache cold   {timed(llm, prompts):8.1f} ms")
+        print(f"  cache warm   {timed(llm, prompts):8.1f} ms  {llm.cache.stats()}")
+        llm.cache.close()
+
+
+if __name__ == "__main__":  # pragma: no cover
+    p = argparse.ArgumentParser(description="Benchmark the LLM response cache")
+    p.add_argument("--size", type=int, default=50)
+    p.add_argument("--latency-ms", type=float, default=200.0)
+    args = p.parse_args()
+    bench(args.size, args.latency_ms)
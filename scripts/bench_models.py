@@ -0,0 +1,62 @@
+"""Benchmark memory and serialization cost of the Task model.
+
+Compares a plain (dict-backed) dataclass with the same fields against the
+slotted `pkms_core.models.Task`, and `dataclasses.asdict` against the
+hand-written `Task.to_dict`.
+
+Usage:
+  python scripts/bench_models.py --count 100000
+"""
+from __future__ import annotations
+import argparse, json, os, sys, time, tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import List
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pkms_core.models import Task
+
+
+@dataclass
+class PlainTask:
+    id: int
+    text: str
+    created: str
+    completed: bool = False
+    details: List[str] = field(default_factory=list)
+    priority: int = 3
+    tags: List[str] = field(default_factory=list)
+
+
+def raw(n: int):
+    return [{"id": i, "text": f"Task {i}", "created": "2025-01-01T00:00:00+00:00", "completed": False,
+             "details": [f"detail {i}"], "priority": (i % 5) + 1, "tags": ["bench", f"t{i % 7}"]} for i in range(n)]
+
+
+def measure(build) -> tuple:
+    tracemalloc.start()
+    objs = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return objs, size
+
+
+def timed(fn) -> float:
+    start = time.perf_counter(); fn(); return (time.perf_counter() - start) * 1000
+
+
+def bench(n: int) -> None:
+    blob = json.dumps(raw(n))  # both sides build from freshly parsed JSON, as a store load does
+    plain, plain_mem = measure(lambda: [PlainTask(**d) for d in json.loads(blob)])
+    slotted, slot_mem = measure(lambda: [Task.from_dict(d) for d in json.loads(blob)])
+    print(f"{n:>8} tasks | memory: dataclass {plain_mem / 2**20:7.1f} MiB | slotted+interned {slot_mem / 2**20:7.1f} MiB")
+    t_asdict = timed(lambda: [asdict(t) for t in plain])
+    t_to_dict = timed(lambda: [t.to_dict() for t in slotted])
+    print(f"{n:>8} tasks | serialize: asdict {t_asdict:8.1f} ms | to_dict {t_to_dict:8.1f} ms")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    p = argparse.ArgumentParser(description="Benchmark Task memory and serialization")
+    p.add_argument("--count", type=int, default=100000)
+    args = p.parse_args()
+    bench(args.count)
@@ -0,0 +1,55 @@
+"""Benchmark SQLite `save_all` paths for the task store.
+
+Compares the legacy per-row INSERT loop against the bulk `executemany` path
+and the `diff=True` upsert path (with ~1% of rows changed) at several sizes.
+
+Usage:
+  python scripts/bench_save_all.py --sizes 10000 100000
+"""
+from __future__ import annotations
+import argparse, json, os, sys, tempfile, time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pkms_core.models import Task
+from pkms_core.storage import SqliteTaskStore
+
+
+def make_tasks(n: int):
+    return [Task(id=i, text=f"Task {i} sample text", created="2025-01-01T00:00:00+00:00",
+                 details=[f"detail {i}"], priority=(i % 5) + 1, tags=["bench", f"t{i % 7}"]) for i in range(1, n + 1)]
+
+
+def legacy_save_all(store: SqliteTaskStore, tasks) -> None:
+    with store._tx() as conn:
+        conn.execute("DELETE FROM tasks")
+        for t in tasks:
+            conn.execute(
+                "INSERT INTO tasks(id,text,created,completed,details,priority,tags) VALUES(?,?,?,?,?,?,?)",
+                (t.id, t.text, t.created, int(t.completed), json.dumps(t.details), int(t.priority), json.dumps(t.tags)),
+            )
+
+
+def timed(fn) -> float:
+    start = time.perf_counter(); fn(); return (time.perf_counter() - start) * 1000
+
+
+def bench(size: int) -> None:
+    tasks = make_tasks(size)
+    with tempfile.TemporaryDirectory() as td:
+        store = SqliteTaskStore(os.path.join(td, 'tasks.db'))
+        legacy = timed(lambda: legacy_save_all(store, tasks))
+        bulk = timed(lambda: store.save_all(tasks))
+        for t in tasks[:: 100]:
+            t.text += " (edited)"
+        diff = timed(lambda: store.save_all(tasks, diff=True))
+        store.close()
+    print(f"{size:>8} tasks | legacy loop {legacy:9.1f} ms | executemany {bulk:9.1f} ms | diff (1% changed) {diff:9.1f} ms")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    p = argparse.ArgumentParser(description="Benchmark SqliteTaskStore.save_all")
+    p.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    args = p.parse_args()
+    for n in args.sizes:
+        bench(n)
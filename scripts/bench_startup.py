@@ -0,0 +1,59 @@
+"""Benchmark CLI cold start: wall time of fresh `pkms` processes per command.
+
+Seeds a temporary data directory with N tasks and N documents, then runs
+each command in a new interpreter several times and reports the median.
+Commands that do not touch documents (add, notes add, info) should not
+grow with the document count.
+
+Usage:
+  python scripts/bench_startup.py --size 20000 --repeat 5
+"""
+from __future__ import annotations
+import argparse, os, statistics, subprocess, sys, tempfile, time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT)
+
+from pkms_core.models import Task, Document
+from pkms_core.storage import make_task_store, make_document_store
+
+COMMANDS = [['info'], ['add', 'Bench task'], ['notes', 'add', 'Bench note'], ['search', 'roadmap', '--limit', '5'], ['advise'], ['list']]
+
+
+def seed(base: str, n: int) -> None:
+    make_task_store('json', base, journal=False).save_all(
+        [Task(id=i, text=f"Review roadmap item {i}", created="2025-01-01T00:00:00+00:00") for i in range(1, n + 1)])
+    make_document_store(base, journal=False).save_all(
+        [Document(id=i, title=f"Doc {i}", text=f"TODO: plan sprint {i % 13}\nwrite notes {i}", tags=[], links=[],
+                  created="2025-01-01T00:00:00+00:00", updated="2025-01-01T00:00:00+00:00") for i in range(1, n + 1)])
+
+
+def run(cmd, cwd: str, env) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-m', 'pkms_core.cli', *cmd], cwd=cwd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(n: int, repeat: int) -> None:
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    with tempfile.TemporaryDirectory() as td:
+        seed(td, n)
+        baseline = statistics.median(run_python(env) for _ in range(repeat))
+        print(f"{n} tasks/docs | bare interpreter {baseline:6.1f} ms")
+        for cmd in COMMANDS:
+            ms = statistics.median(run(cmd, td, env) for _ in range(repeat))
+            print(f"  {' '.join(cmd)[:24]:<24} {ms:7.1f} ms")
+
+
+def run_python(env) -> float:
+    start = time.perf_counter()
+    subprocess.run([sys.executable, '-c', 'pass'], env=env, check=True)
+    return (time.perf_counter() - start) * 1000
+
+
+if __name__ == "__main__":  # pragma: no cover
+    p = argparse.ArgumentParser(description="Benchmark pkms CLI cold start per command")
+    p.add_argument("--size", type=int, default=20000)
+    p.add_argument("--repeat", type=int, default=5)
+    args = p.parse_args()
+    bench(args.size, args.repeat)
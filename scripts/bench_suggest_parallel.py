@@ -0,0 +1,52 @@
+"""Benchmark parallel suggestion extraction across worker counts.
+
+Generates a synthetic corpus of roughly --mb megabytes (documents are built
+from repeated blocks so large sizes are cheap to generate) and times
+`extract_many` serially and with 2, 4, ... up to --max-workers processes.
+Use --mb 2048 or more for a multi-GB run on a machine with enough memory.
+
+Usage:
+  python scripts/bench_suggest_parallel.py --mb 256 --max-workers 8
+"""
+from __future__ import annotations
+import argparse, os, random, sys, time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pkms_core.suggestions import extract_many, merge_suggestions
+
+LINES = ["TODO: follow up on item {i}", "write summary for {i}", "plain prose line about topic {i}",
+         "another descriptive sentence {i}", "background and context for {i}", "meeting recap {i}"]
+
+
+def make_corpus(mb: int, doc_kb: int = 32, seed: int = 8):
+    rng = random.Random(seed)
+    blocks = ["\n".join(rng.choice(LINES).format(i=rng.randint(1, 10**6)) for _ in range(doc_kb * 30)) for _ in range(64)]
+    n = max(1, mb * 1024 // doc_kb)
+    return [blocks[rng.randrange(len(blocks))] for _ in range(n)]
+
+
+def timed(fn):
+    start = time.perf_counter(); out = fn(); return time.perf_counter() - start, out
+
+
+def bench(mb: int, max_workers: int, pool: str) -> None:
+    texts = make_corpus(mb)
+    size = sum(map(len, texts)) / 2**20
+    print(f"{len(texts)} docs, {size:.0f} MiB | {pool} pool | {os.cpu_count()} CPUs")
+    base, ref = timed(lambda: merge_suggestions(extract_many(texts, workers=1)))
+    print(f"  workers  1: {base:7.2f} s  ({size / base:6.1f} MiB/s)")
+    n = 2
+    while n <= max_workers:
+        t, out = timed(lambda: merge_suggestions(extract_many(texts, workers=n, pool=pool, min_bytes=0)))
+        print(f"  workers {n:2d}: {t:7.2f} s  ({size / t:6.1f} MiB/s) | speedup {base / t:4.2f}x | same: {out == ref}")
+        n *= 2
+
+
+if __name__ == "__main__":  # pragma: no cover
+    p = argparse.ArgumentParser(description="Benchmark parallel suggestion extraction")
+    p.add_argument("--mb", type=int, default=256, help="approximate corpus size in MiB")
+    p.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    p.add_argument("--pool", choices=["process", "thread"], default="process")
+    args = p.parse_args()
+    bench(args.mb, max(1, args.max_workers), args.pool)
@@ -0,0 +1,58 @@
+"""Benchmark document-derived suggestions: full scan vs the content-hash cache.
+
+Writes a synthetic document store, then times (a) loading every document and
+scanning every line, (b) the first cached read (builds docs.suggest.json),
+(c) a cold read from a new DocumentManager served from the persisted cache
+and (d) a document update followed by another cold read.
+
+Usage:
+  python scripts/bench_suggestions.py --docs 20000
+"""
+from __future__ import annotations
+import argparse, os, random, sys, tempfile, time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from pkms_core.agent import Agent
+from pkms_core.core import DocumentManager
+from pkms_core.models import Document
+from pkms_core.storage import DocumentStore
+
+# one line in four yields a suggestion
+LINES = ["TODO: follow up on item {i}", "write summary for {i}", "plain prose line about topic {i}",
+         "another descriptive sentence {i}", "background and context for {i}", "meeting recap {i}",
+         "the figures for quarter {i} look fine", "links and references {i}"]
+
+
+def make_docs(n: int, lines: int, seed: int = 2):
+    rng = random.Random(seed)
+    return [Document(id=i, title=f"Doc {i}", text="\n".join(rng.choice(LINES).format(i=rng.randint(1, n)) for _ in range(lines)),
+                     tags=[], links=[], created="", updated="") for i in range(1, n + 1)]
+
+
+def timed(fn):
+    start = time.perf_counter(); out = fn(); return (time.perf_counter() - start) * 1000, out
+
+
+def bench(n: int, lines: int) -> None:
+    with tempfile.TemporaryDirectory() as td:
+        path = os.path.join(td, "docs.json")
+        DocumentStore(path, journal=True).save_all(make_docs(n, lines))
+        size = os.path.getsize(path) / 2**20
+        manager = lambda: DocumentManager(store=DocumentStore(path, journal=True))
+        agent = Agent()
+        t_scan, scanned = timed(lambda: agent.suggest_tasks_from_documents(manager().list()))
+        t_build, built = timed(lambda: manager().task_suggestions())
+        t_cold, cached = timed(lambda: manager().task_suggestions())
+        dm = manager(); dm.update(1, text="TODO: freshly edited")
+        t_after, _ = timed(lambda: manager().task_suggestions())
+        print(f"{n} docs ({size:.1f} MiB) | load + scan {t_scan:.0f} ms | first cached read {t_build:.0f} ms | "
+              f"cold cached read {t_cold:.1f} ms | after update {t_after:.1f} ms | same: {scanned == built == cached}")
+
+
+if __name__ == "__main__":  # pragma: no cover
+    p = argparse.ArgumentParser(description="Benchmark cached document suggestions")
+    p.add_argument("--docs", type=int, default=20000)
+    p.add_argument("--lines", type=int, default=40)
+    args = p.parse_args()
+    bench(args.docs, args.lines)
@@ -3,13 +3,16 @@ from __future__ import annotations
 import sys
 import argparse
 
-from src.services.search import search_tasks
+from src.services.search import search_tasks, DEFAULT_MAX_DISTANCE
 from .common import load_tasks, print_tasks, print_error
 
 
 def build_parser(subparsers) -> argparse.ArgumentParser:
     p = subparsers.add_parser("search", help="Search tasks by substring (title or description)")
     p.add_argument("query", help="Substring to search (case-insensitive)")
+    p.add_argument("--fuzzy", action="store_true", help="Typo-tolerant word/prefix matching")
+    p.add_argument("--max-distance", type=int, default=DEFAULT_MAX_DISTANCE,
+                   help=f"Edit-distance threshold for --fuzzy (default {DEFAULT_MAX_DISTANCE})")
     return p
 
 
@@ -19,6 +22,9 @@ def run(args: argparse.Namespace, json_mode: bool) -> int:
         print_error("Search query cannot be blank", json_mode)
         return 1
     tasks = load_tasks()
-    matches = search_tasks(tasks, query)
+    if args.max_distance < 0:
+        print_error("--max-distance cannot be negative", json_mode)
+        return 1
+    matches = search_tasks(tasks, query, fuzzy=args.fuzzy, max_distance=args.max_distance)
     print_tasks(matches, json_mode)
     return 0
@@ -1,17 +1,124 @@
-"""Search service providing case-insensitive substring matching over tasks."""
+"""Search service: case-insensitive substring matching, plus typo-tolerant
+fuzzy matching backed by a trigram index over the task vocabulary."""
 from __future__ import annotations
 
-from typing import Iterable, List
+import re
+from typing import Dict, Iterable, List, Optional, Set
+
 from src.models.task import Task
 
+DEFAULT_MAX_DISTANCE = 2
+_WORD = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: Optional[str]) -> List[str]:
+    return _WORD.findall(text.lower()) if text else []
+
+
+def _trigrams(word: str, prefix: bool = False) -> Set[str]:
+    """Padded trigrams; the trailing pad is left off when matching prefixes."""
+    s = "$$" + word + ("" if prefix else "$")
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def edit_distance(a: str, b: str, max_dist: int, prefix: bool = False) -> int:
+    """Levenshtein distance from `a` to `b` (or to the closest prefix of `b`),
+    returning ``max_dist + 1`` as soon as the bound is exceeded."""
+    if prefix:
+        b = b[:len(a) + max_dist]
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > max_dist:
+            return max_dist + 1
+        prev = cur
+    d = min(prev) if prefix else prev[-1]
+    return min(d, max_dist + 1)
+
+
+class TaskSearchIndex:
+    """Trigram index over the words of task titles and descriptions.
+
+    Candidate words are those sharing enough trigrams with a query word (a
+    word within d edits keeps all but 3*d of them), so only a small part of
+    the vocabulary is compared with the edit-distance check.
+    """
+
+    def __init__(self, tasks: Iterable[Task]):
+        self._tasks: List[Task] = []
+        self._words: List[str] = []
+        self._word_ids: Dict[str, int] = {}
+        self._grams: Dict[str, Set[int]] = {}
+        self._postings: List[Set[int]] = []
+        for t in tasks:
+            pos = len(self._tasks)
+            self._tasks.append(t)
+            for w in set(_words(t.title) + _words(t.description)):
+                self._postings[self._word_id(w)].add(pos)
+
+    def _word_id(self, word: str) -> int:
+        wid = self._word_ids.get(word)
+        if wid is None:
+            wid = self._word_ids[word] = len(self._words)
+            self._words.append(word)
+            self._postings.append(set())
+            for g in _trigrams(word):
+                self._grams.setdefault(g, set()).add(wid)
+        return wid
+
+    def _matches(self, word: str, max_distance: int) -> Dict[int, int]:
+        """Task position -> best edit distance for one query word."""
+        d = max(0, min(max_distance, len(word) // 3))  # at most one edit per three letters
+        grams = _trigrams(word, prefix=True)
+        need = len(grams) - 3 * d
+        if need > 0:
+            counts: Dict[int, int] = {}
+            for g in grams:
+                for wid in self._grams.get(g, ()):
+                    counts[wid] = counts.get(wid, 0) + 1
+            candidates: Iterable[int] = [wid for wid, c in counts.items() if c >= need]
+        else:
+            candidates = range(len(self._words))
+        hits: Dict[int, int] = {}
+        for wid in candidates:
+            vocab = self._words[wid]
+            dist = 0 if vocab.startswith(word) else edit_distance(word, vocab, d, prefix=True)
+            if dist > d:
+                continue
+            for pos in self._postings[wid]:
+                if dist < hits.get(pos, dist + 1):
+                    hits[pos] = dist
+        return hits
+
+    def search(self, query: str, max_distance: int = DEFAULT_MAX_DISTANCE) -> List[Task]:
+        """Tasks matching every query word (or a prefix of it) within the edit
+        budget, closest first and otherwise in input order."""
+        total: Optional[Dict[int, int]] = None
+        for word in dict.fromkeys(_words(query)):
+            hits = self._matches(word, max_distance)
+            total = hits if total is None else {p: total[p] + d for p, d in hits.items() if p in total}
+            if not total:
+                return []
+        if not total:
+            return []
+        return [self._tasks[p] for p in sorted(total, key=lambda p: (total[p], p))]
+
 
-def search_tasks(tasks: Iterable[Task], query: str) -> List[Task]:
+def search_tasks(tasks: Iterable[Task], query: str, fuzzy: bool = False,
+                 max_distance: int = DEFAULT_MAX_DISTANCE,
+                 index: Optional[TaskSearchIndex] = None) -> List[Task]:
     """Return tasks whose title or description contains the substring query (case-insensitive).
 
-    Raises ValueError if query is blank.
+    With ``fuzzy=True`` each query word instead matches a word (or word
+    prefix) within `max_distance` edits; pass a prebuilt `index` to reuse it
+    across searches. Raises ValueError if query is blank.
     """
     if not isinstance(query, str) or not query.strip():
         raise ValueError("Search query cannot be blank")
+    if fuzzy:
+        return (index or TaskSearchIndex(tasks)).search(query, max_distance)
     needle = query.lower()
     results: List[Task] = []
     for t in tasks:
@@ -19,4 +126,4 @@ def search_tasks(tasks: Iterable[Task], query: str) -> List[Task]:
             results.append(t)
     return results
 
-__all__ = ["search_tasks"]
+__all__ = ["search_tasks", "TaskSearchIndex", "edit_distance", "DEFAULT_MAX_DISTANCE"]
@@ -50,3 +50,15 @@ def test_cli_search_blank_query_error(tmp_path, monkeypatch, capsys):
     assert rc == 1
     captured = capsys.readouterr()
     assert "Search query cannot be blank" in captured.err
+
+
+def test_cli_search_fuzzy(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    create("Refactor code", "Improve clarity")
+    capsys.readouterr()
+    rc = main(["search", "refactr"])  # substring search has no typo tolerance
+    assert rc == 0
+    assert "Refactor code" not in capsys.readouterr().out
+    rc = main(["search", "--fuzzy", "refactr"])
+    assert rc == 0
+    assert "Refactor code" in capsys.readouterr().out
@@ -35,3 +35,19 @@ def test_search_empty_query_raises():
     tasks = sample_tasks()
     with pytest.raises(ValueError):
         search_tasks(tasks, "")
+
+
+def test_fuzzy_search_tolerates_typos_and_prefixes():
+    tasks = sample_tasks()
+    assert [t.id for t in search_tasks(tasks, "refactr", fuzzy=True)] == [2]
+    assert [t.id for t in search_tasks(tasks, "clar", fuzzy=True)] == [2]
+    assert [t.id for t in search_tasks(tasks, "tast serch", fuzzy=True)] == [3]
+    assert search_tasks(tasks, "refactr", fuzzy=True, max_distance=0) == []
+
+
+def test_fuzzy_search_orders_closest_first():
+    tasks = [
+        Task(id=1, title="Draft spoc", description=None, status="todo"),
+        Task(id=2, title="Draft spec", description=None, status="todo"),
+    ]
+    assert [t.id for t in search_tasks(tasks, "spec", fuzzy=True)] == [2, 1]
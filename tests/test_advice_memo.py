@@ -0,0 +1,76 @@
+from datetime import datetime, timezone, timedelta
+from pkms_core import agent as agent_mod, models
+from pkms_core.agent import Agent
+from pkms_core.core import DocumentManager, TaskManager
+from pkms_core.models import Task
+from pkms_core.storage import DocumentStore, JsonTaskStore
+
+
+def test_created_at_parsed_once_and_refreshed_on_change(monkeypatch):
+    calls = []
+    real = models.parse_created
+    monkeypatch.setattr(models, 'parse_created', lambda v: calls.append(v) or real(v))
+    t = Task(id=1, text='x', created='2024-01-02T03:04:05')
+    assert t.created_at() == datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+    t.created_at(); t.created_at()
+    assert len(calls) == 1
+    t.created = 'garbage'
+    assert t.created_at() is None and t.created_at() is None
+    assert len(calls) == 2
+    assert t == Task(id=1, text='x', created='garbage')
+
+
+def test_single_pass_advice_buckets():
+    now = datetime(2025, 6, 1, tzinfo=timezone.utc)
+    old = (now - timedelta(days=20)).isoformat()
+    tasks = [Task(id=i, text=f'ship part {i}', created=old, priority=5) for i in range(1, 8)]
+    tasks.append(Task(id=8, text=' '.join(['word'] * 13), created='bad', priority=2))
+    tasks.append(Task(id=9, text='done', created=old, completed=True))
+    advice = Agent().productivity_advice(tasks, [], now=now)
+    assert advice[0] == 'Tasks: 8 open / 1 done (total 9)'
+    assert 'High focus: ship part 1; ship part 2; ship part 3' in advice
+    assert 'Urgent (high priority + aging): ship part 1; ship part 2; ship part 3' in advice
+    assert 'Stale: 7 tasks older than 14 days.' in advice
+    assert 'Break down 1 long tasks (>12 words) for momentum.' in advice
+    assert 'Focus overload: 7 high-priority tasks; consider delegating or pausing.' in advice
+    assert advice[-1] == 'Priority spread (open): P5:7, P2:1'
+
+
+def test_advice_for_memoized_per_generation(tmp_path, monkeypatch):
+    tm = TaskManager(store=JsonTaskStore(str(tmp_path / 'tasks.json')))
+    dm = DocumentManager(store=DocumentStore(str(tmp_path / 'docs.json'), journal=True))
+    agent = Agent()
+    calls = []
+    real = agent.productivity_advice
+    monkeypatch.setattr(agent, 'productivity_advice', lambda tasks, docs, **kw: calls.append(1) or real(tasks, docs, **kw))
+    tm.add('first task')
+    first = agent.advice_for(tm, dm)
+    first.append('caller mutation')
+    assert agent.advice_for(tm, dm)[0] == 'Tasks: 1 open / 0 done (total 1)'
+    assert len(calls) == 1
+    tm.toggle(1)
+    assert agent.advice_for(tm, dm)[0] == 'Tasks: 0 open / 1 done (total 1)'
+    dm.add('Plan', 'TODO: book venue')
+    assert 'Doc suggestions: book venue' in agent.advice_for(tm, dm)
+    assert len(calls) == 3
+    monkeypatch.setattr(agent_mod, 'ADVICE_TTL', 0)
+    agent.advice_for(tm, dm)
+    assert len(calls) == 4
+
+
+def test_chat_advise_does_not_list_all_tasks(tmp_path, monkeypatch):
+    from pkms_core.chat import ChatEngine, ChatHistory
+    from pkms_core.llm_mock import MockLLM
+    from pkms_core.storage import SqliteTaskStore
+    store = SqliteTaskStore(str(tmp_path / 'tasks.db'))
+    store.add_many([Task(id=i, text=f'task {i}', created='2025-01-01T00:00:00+00:00', completed=i % 3 == 0) for i in range(1, 1201)])
+    tm = TaskManager(store=store, lazy=True)
+    dm = DocumentManager(store=DocumentStore(str(tmp_path / 'docs.json')))
+    tm.stats  # built once; later advice reads it incrementally
+    def boom(*a, **kw): raise AssertionError('whole task table read')
+    monkeypatch.setattr(store, 'load', boom); monkeypatch.setattr(store, 'iter_pages', boom)
+    monkeypatch.setattr(TaskManager, 'list', boom)
+    heuristic = ChatEngine(Agent(), tm, dm, ChatHistory([])).handle_message('advise')
+    assert heuristic.startswith('Tasks: 800 open / 400 done (total 1200)')
+    prompt = ChatEngine(Agent(llm=MockLLM()), tm, dm, ChatHistory([])).handle_message('advise')
+    assert prompt.startswith('[mock-llm]')
@@ -0,0 +1,54 @@
+import pytest
+from pkms_core.core import DocumentManager
+from pkms_core.search_index import InvertedIndex, MappedIndex, bm25_scores, phrase_matches, parse_query, write_index, index_signature
+from pkms_core.storage import DocumentStore
+
+
+def _dm(tmp_path):
+    return DocumentManager(store=DocumentStore(str(tmp_path / 'docs.json'), journal=True))
+
+
+def test_title_and_tag_hits_outrank_body_hits(tmp_path):
+    dm = _dm(tmp_path)
+    body = dm.add('Weekly notes', 'budget numbers for the team')
+    title = dm.add('Budget', 'numbers for the weekly team')
+    tag = dm.add('Weekly team', 'numbers for the week', tags=['budget'])
+    assert [d.id for d in dm.search('budget')] == [title.id, tag.id, body.id]
+
+
+def test_rare_terms_and_frequency_drive_ranking(tmp_path):
+    dm = _dm(tmp_path)
+    for i in range(5):
+        dm.add(f'Doc {i}', 'project status update')
+    rare = dm.add('Doc rare', 'project kickoff')
+    assert dm.search('project kickoff')[0].id == rare.id
+    many = dm.add('Doc many', 'status status status report')
+    assert dm.search('status')[0].id == many.id
+
+
+def test_quoted_phrases_require_adjacent_tokens(tmp_path):
+    dm = _dm(tmp_path)
+    a = dm.add('Plan', 'quarterly roadmap review')
+    dm.add('Other', 'roadmap for the quarterly offsite')
+    c = dm.add('Roadmap', 'review of budget')
+    assert parse_query('"quarterly roadmap" budget') == (['budget', 'quarterly', 'roadmap'], [['quarterly', 'roadmap']])
+    assert [d.id for d in dm.search('"quarterly roadmap"')] == [a.id]
+    # phrases never span the title/body boundary
+    assert [d.id for d in dm.search('"roadmap review"')] == [a.id]
+    assert c.id in [d.id for d in dm.search('roadmap review')]
+
+
+def test_mapped_index_scores_match_in_memory(tmp_path):
+    idx = InvertedIndex.build([(1, [('Alpha beta', 2.0), ('beta gamma beta', 1.0)]), (2, 'gamma delta'), (3, 'alpha gamma delta epsilon')])
+    path = str(tmp_path / 'docs.idx')
+    sig = index_signature(str(tmp_path / 'docs.json'))
+    write_index(path, idx, sig, 3)
+    mapped = MappedIndex.open(path, sig)
+    for q in (['alpha'], ['beta', 'gamma'], ['delta', 'epsilon', 'missing']):
+        expected = bm25_scores(idx, q)
+        got = bm25_scores(mapped, q)
+        assert got.keys() == expected.keys()
+        assert all(got[d] == pytest.approx(expected[d], rel=1e-6) for d in got)
+    assert phrase_matches(mapped, ['gamma', 'delta']) == phrase_matches(idx, ['gamma', 'delta']) == {2, 3}
+    assert mapped.positions('beta', 1) == (1, 3, 5) and mapped.positions('beta', 2) == ()
+    mapped.close()
@@ -0,0 +1,44 @@
+import json
+from pkms_core.cli import main
+from pkms_core.core import TaskManager
+from pkms_core.storage import JsonTaskStore, JsonNoteStore, add_note, add_notes, list_notes
+
+
+def test_add_notes_allocates_ids_in_one_write(tmp_path, monkeypatch):
+    add_note('json', str(tmp_path), 'existing')
+    writes = []
+    orig = JsonNoteStore.save_all
+    monkeypatch.setattr(JsonNoteStore, 'save_all', lambda self, notes, diff=False: (writes.append(len(notes)), orig(self, notes))[1])
+    created = add_notes('json', str(tmp_path), [{'text': f'n{i}', 'details': ['d']} for i in range(3)])
+    assert [n.id for n in created] == [2, 3, 4]
+    assert writes == [4]
+    assert [n.text for n in list_notes('json', str(tmp_path))] == ['existing', 'n0', 'n1', 'n2']
+
+
+def test_cli_import_is_one_json_write_and_reports_throughput(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / 'dump.json'
+    tasks = [{'text': f'task {i}', 'details': ['a', 'b'], 'priority': 4, 'completed': True, 'created': '2024-01-01T00:00:00+00:00'} for i in range(200)]
+    src.write_text(json.dumps({'tasks': tasks, 'notes': [{'text': 'n'}]}), encoding='utf-8')
+    writes = []
+    orig = JsonTaskStore.save_all
+    monkeypatch.setattr(JsonTaskStore, 'save_all', lambda self, ts, diff=False: (writes.append(len(ts)), orig(self, ts))[1])
+    main(['import', str(src)])
+    assert writes == [200]
+    out = capsys.readouterr().out
+    assert 'Imported 201 records in' in out and '/s)' in out
+    loaded = TaskManager(backend='json').list()
+    assert loaded[0].details == ['a', 'b'] and loaded[0].completed and loaded[0].created.startswith('2024-01-01')
+
+
+def test_sqlite_bulk_add_indexes_children_for_search(tmp_path):
+    from pkms_core.models import Task
+    from pkms_core.storage import SqliteTaskStore
+    store = SqliteTaskStore(str(tmp_path / 'tasks.db'))
+    store.add_many([Task(id=i, text=f'task {i}', created='t', details=[f'step{i}', 'shared'], tags=[f'tag{i}']) for i in range(1, 4)])
+    if store.search('shared') is None:
+        return  # FTS5 unavailable
+    assert [t.id for t in store.search('step2')] == [2]
+    assert [t.id for t in store.search('tag3')] == [3]
+    assert sorted(t.id for t in store.search('shared')) == [1, 2, 3]
+    store.close()
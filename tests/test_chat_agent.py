@@ -2,7 +2,9 @@ from pkms_core.core import TaskManager, DocumentManager
 from pkms_core.agent import Agent
 from pkms_core.chat import ChatHistory, ChatEngine
 
-def test_agent_suggestions_and_chat_flow():
+def test_agent_suggestions_and_chat_flow(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # default stores live under the cwd
+    monkeypatch.setattr('pkms_core.chat.CHAT_HISTORY_FILE', str(tmp_path / 'data_pkms' / 'chat_history.json'))
     tm = TaskManager()
     dm = DocumentManager()
     dm.add("Dev Plan", "TODO: implement chat\nRefactor core module\nAdd tests soon", tags=["plan"])
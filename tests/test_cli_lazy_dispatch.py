@@ -0,0 +1,39 @@
+import pytest
+from pkms_core import cli
+from pkms_core.core import TaskManager, DocumentManager
+from pkms_core.llm import LLMAdapter
+from pkms_core.chat import ChatHistory
+
+
+def _forbid(monkeypatch, *targets):
+    def boom(*a, **k):
+        raise AssertionError('constructed eagerly')
+    for cls, name in targets:
+        monkeypatch.setattr(cls, name, boom)
+
+
+def test_add_and_notes_add_build_only_what_they_use(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    _forbid(monkeypatch, (DocumentManager, '__init__'), (LLMAdapter, '__init__'), (ChatHistory, 'load'))
+    assert cli.main(['add', 'Write report', '--priority', '4']) == 0
+    assert cli.main(['notes', 'add', 'meeting', 'notes']) == 0
+    out = capsys.readouterr().out
+    assert 'added task 1: Write report' in out and 'Note added' in out
+    assert [t.text for t in TaskManager(backend='json').list()] == ['Write report']
+
+
+def test_info_opens_stores_without_managers(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    _forbid(monkeypatch, (TaskManager, '__init__'), (DocumentManager, '__init__'), (LLMAdapter, '__init__'))
+    cli.main(['info'])
+    out = capsys.readouterr().out
+    assert 'tasks.json' in out and 'docs.json' in out
+
+
+def test_context_shares_stores_and_every_command_is_registered(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    args = cli.build_parser().parse_args(['list'])
+    ctx = cli.CommandContext(args)
+    assert ctx.tm.store is ctx.task_store and ctx.chat.tm is ctx.tm and ctx.chat.dm is ctx.dm
+    sub = next(a for a in cli.build_parser()._actions if a.dest == 'command')
+    assert set(sub.choices) == set(cli.COMMANDS)
@@ -0,0 +1,82 @@
+import io
+import os
+import subprocess
+import sys
+import time
+import pytest
+from pkms_core import cli, daemon
+from pkms_core.core import TaskManager
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(server, argv):
+    out, err = io.StringIO(), io.StringIO()
+    rc = server.run(argv, out, err)
+    return rc, out.getvalue(), err.getvalue()
+
+
+def test_server_keeps_managers_warm_and_notices_outside_writes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    server = daemon.PkmsServer(str(tmp_path))
+    assert _run(server, ['add', 'Write report']) == (0, 'added task 1: Write report\n', '')
+    tm = server._per_backend[None]['tm']
+    assert _run(server, ['search', 'report'])[1] == '1: Write report\n'
+    assert server._per_backend[None]['tm'] is tm
+    # a write made without the server replaces the warm state
+    TaskManager(backend='json').add('Call plumber')
+    assert _run(server, ['search', 'plumber'])[1] == '2: Call plumber\n'
+    assert server._per_backend[None]['tm'] is not tm
+    rc, out, err = _run(server, ['search'])
+    assert rc == 2 and 'required' in err
+
+
+def test_eligibility_and_socket_path(tmp_path):
+    parse = cli.build_parser().parse_args
+    assert daemon.eligible(parse(['add', 'x'])) and daemon.eligible(parse(['chat', 'advise']))
+    for argv in (['shell'], ['reset', '--yes'], ['chat'], ['chat', 'advise', '--interactive'], ['dashboard', '--interactive']):
+        assert not daemon.eligible(parse(argv))
+    assert daemon.socket_path('/srv/notes') == '/srv/notes/app_data/pkms.sock'
+    base = {'HOME': '/a', 'PKMS_NO_DAEMON': '1'}
+    assert daemon.env_fingerprint(base) == daemon.env_fingerprint({'HOME': '/b'})
+    assert daemon.env_fingerprint({'OPENAI_API_KEY': 'k'}) != daemon.env_fingerprint({})
+    deep = '/' + 'd' * 120
+    assert daemon.socket_path(deep) == daemon.socket_path(deep) and len(daemon.socket_path(deep)) < 100
+
+
+@pytest.mark.skipif(not hasattr(__import__('socket'), 'AF_UNIX'), reason='needs Unix domain sockets')
+def test_cli_forwards_to_running_server_and_falls_back(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('PKMS_NO_DAEMON', raising=False)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    proc = subprocess.Popen([sys.executable, '-m', 'pkms_core.cli', 'serve'], cwd=str(tmp_path), env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        deadline = time.time() + 10
+        while daemon.request('ping', out=io.StringIO()) is None:
+            assert time.time() < deadline and proc.poll() is None
+            time.sleep(0.05)
+        assert cli.main(['add', 'Served task']) == 0
+        assert cli.main(['search', 'served']) == 0
+        assert capsys.readouterr().out == 'added task 1: Served task\n1: Served task\n'
+        status = io.StringIO()
+        assert daemon.request('ping', out=status) == 0 and '2 commands served' in status.getvalue()
+        assert oct(os.stat(daemon.socket_path()).st_mode & 0o777) == oct(0o600)
+        # a client configured differently is declined and runs the command itself
+        monkeypatch.setenv('PKMS_JSON_JOURNAL', '1')
+        assert daemon.request('run', ['search', 'served'], out=io.StringIO()) is None
+        monkeypatch.delenv('PKMS_JSON_JOURNAL')
+        monkeypatch.setenv('PKMS_NO_DAEMON', '1')
+        cli.main(['add', 'Local task'])
+        monkeypatch.delenv('PKMS_NO_DAEMON')
+        capsys.readouterr()
+        cli.main(['search', 'task'])
+        assert capsys.readouterr().out == '1: Served task\n2: Local task\n'
+        assert cli.main(['serve', '--stop']) == 0
+        assert proc.wait(timeout=10) == 0
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+    assert not os.path.exists(daemon.socket_path(str(tmp_path)))
+    capsys.readouterr()
+    assert cli.main(['serve', '--status']) == 1
@@ -0,0 +1,47 @@
+import os
+import pkms_core.search_index as SI
+from pkms_core.core import DocumentManager
+from pkms_core.storage import DocumentStore, make_document_store
+
+
+def _dm(tmp_path, journal=True):
+    return DocumentManager(store=DocumentStore(str(tmp_path / 'docs.json'), journal=journal))
+
+
+def test_delete_and_update_touch_only_affected_postings(tmp_path, monkeypatch):
+    dm = _dm(tmp_path)
+    a = dm.add('Alpha plan', 'write the roadmap', tags=['planning'])
+    b = dm.add('Beta notes', 'roadmap review meeting')
+    assert [d.id for d in dm.search('roadmap')] == [a.id, b.id]  # opens the index
+    calls = []
+    real = SI.tokenize
+    monkeypatch.setattr(SI, 'tokenize', lambda text: calls.append(text) or real(text))
+    assert dm.delete(a.id) is True and dm.delete(a.id) is False
+    assert calls == []  # no corpus re-tokenization on delete
+    assert [d.id for d in dm.search('roadmap')] == [b.id]
+    assert 'alpha' not in dm._index.terms() and 'planning' not in dm._index.terms()
+    calls.clear()
+    dm.update(b.id, text='retrospective')
+    assert calls == ['Beta notes', 'retrospective', '']  # only the updated doc's fields
+    assert dm.search('roadmap') == []
+    assert [d.id for d in dm.search('retrospective')] == [b.id]
+    assert dm.get(a.id) is None and dm.get(b.id).text == 'retrospective'
+
+
+def test_journaled_documents_persist_without_rewriting_snapshot(tmp_path):
+    dm = _dm(tmp_path)
+    dm.add('one', 'first'); dm.add('two', 'second')
+    path = str(tmp_path / 'docs.json')
+    assert not os.path.exists(path) and os.path.exists(path + '.journal')
+    dm.delete(1); dm.update(2, title='two!')
+    reloaded = _dm(tmp_path, journal=False)
+    assert [(d.id, d.title) for d in reloaded.docs] == [(2, 'two!')]
+    reloaded.add('three', 'third')  # a non-journaled save folds the log
+    assert not os.path.exists(path + '.journal')
+    assert [d.title for d in _dm(tmp_path).docs] == ['two!', 'three']
+
+
+def test_make_document_store_journal_env(tmp_path, monkeypatch):
+    assert make_document_store(str(tmp_path)).journal is True
+    monkeypatch.setenv('PKMS_DOCS_JOURNAL', '0')
+    assert make_document_store(str(tmp_path)).journal is False
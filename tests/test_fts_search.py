@@ -0,0 +1,59 @@
+import sqlite3
+from pkms_core import storage as S
+from pkms_core.core import TaskManager
+from pkms_core.storage import SqliteTaskStore
+
+
+def test_task_fts_ranked_prefix_and_fallback(tmp_path, monkeypatch):
+    store = SqliteTaskStore(str(tmp_path / 'app_data' / 'tasks.db'))
+    tm = TaskManager(store=store)
+    a = tm.add('Write release notes')
+    b = tm.add('Plan release release release party', tags=['social'])
+    c = tm.add('Buy milk')
+    tm.add_detail(c.id, 'semi-skimmed from the corner shop')
+    # bm25 ranks the denser match first
+    assert [t.id for t in tm.search('release')] == [b.id, a.id]
+    # word prefixes match by default, not with prefix=False
+    assert [t.id for t in tm.search('relea')] == [b.id, a.id]
+    assert store.search('relea', prefix=False) == []
+    # details and tags are indexed; results are the manager's own objects
+    assert tm.search('corner')[0] is c
+    assert [t.id for t in tm.search('social')] == [b.id]
+    # triggers keep the index in sync with edits and deletes
+    tm.edit(c.id, 'Buy oat milk')
+    assert [t.id for t in tm.search('oat')] == [c.id]
+    tm.delete(b.id)
+    assert [t.id for t in tm.search('release')] == [a.id]
+    # a miss is answered by the index alone; only word-less queries fall back to the scan
+    d = tm.add('fix C++ build')
+    monkeypatch.setattr(store, 'load', lambda: (_ for _ in ()).throw(AssertionError('full load')))
+    lazy = TaskManager(store=store, lazy=True)
+    assert lazy.search('lease') == [] and lazy.search('nothing here', offset=5) == []
+    assert [t.id for t in tm.search('++')] == [d.id]
+
+
+def test_existing_db_is_backfilled(tmp_path):
+    path = tmp_path / 'app_data' / 'tasks.db'
+    path.parent.mkdir()
+    raw = sqlite3.connect(str(path))
+    raw.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, text TEXT, created TEXT, completed INTEGER, details TEXT, priority INTEGER DEFAULT 3, tags TEXT DEFAULT '[]')")
+    raw.execute("INSERT INTO tasks VALUES (1,'legacy entry','t',0,'[]',3,'[]')")
+    raw.execute("PRAGMA user_version=1")
+    raw.commit(); raw.close()
+    assert [t.id for t in SqliteTaskStore(str(path)).search('legacy')] == [1]
+
+
+def test_note_fts_search(tmp_path, monkeypatch):
+    base = str(tmp_path)
+    S.add_note('sqlite', base, 'Vector databases overview')
+    S.add_note('sqlite', base, 'Groceries')
+    S.describe_note('sqlite', base, 2, 'vectors of apples')
+    res = S.search_notes('sqlite', base, 'vector')
+    assert [n.text for n in res] == ['Vector databases overview', 'Groceries']
+    assert [n.text for n in S.search_notes('sqlite', base, 'vector', prefix=False)] == ['Vector databases overview']
+    # a sqlite miss does not load the store
+    monkeypatch.setattr(S.SqliteNoteStore, 'load', lambda self: (_ for _ in ()).throw(AssertionError('full load')))
+    assert S.search_notes('sqlite', base, 'ector') == []
+    # json keeps the substring scan
+    S.add_note('json', base, 'Vector json note')
+    assert len(S.search_notes('json', base, 'ector')) == 1
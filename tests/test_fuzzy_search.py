@@ -0,0 +1,75 @@
+import random
+import string
+from pkms_core import storage as S
+from pkms_core.cli import main
+from pkms_core.core import TaskManager
+from pkms_core.search_index import TrigramIndex, levenshtein
+from pkms_core.storage import JsonTaskStore, SqliteTaskStore
+
+
+def test_levenshtein_bounded_and_prefix():
+    assert levenshtein('kitten', 'sitting') == 3
+    assert levenshtein('kitten', 'sitting', 1) == 2
+    assert levenshtein('clar', 'clarity') == 3
+    assert levenshtein('clar', 'clarity', prefix=True) == 0
+    assert levenshtein('calr', 'clarity', 2, prefix=True) == 2
+
+
+def test_trigram_index_matches_brute_force():
+    rng = random.Random(5)
+    vocab = [''.join(rng.choices(string.ascii_lowercase[:6], k=rng.randint(3, 8))) for _ in range(200)]
+    texts = {i: ' '.join(rng.choices(vocab, k=4)) for i in range(1, 300)}
+    idx = TrigramIndex.build(texts.items())
+    for q in rng.sample(vocab, 25):
+        q = q[:-1] + 'z' if len(q) > 4 else q
+        for d in (0, 1, 2):
+            budget = min(d, len(q) // 3)
+            expected = {i for i, text in texts.items() if any(levenshtein(q, w, budget, prefix=True) <= budget for w in text.split())}
+            assert set(idx.search(q, d)) == expected, (q, d)
+
+
+def test_trigram_index_ranking_and_updates():
+    idx = TrigramIndex.build([(1, 'draft spoc'), (2, 'draft spec'), (3, 'unrelated')])
+    assert idx.search('spec') == [2, 1]
+    assert idx.search('drft spec') == [2, 1]
+    assert idx.search('spec', prefix=False, max_distance=0) == [2]
+    idx.update(2, 'something else'); idx.remove(1)
+    assert idx.search('spec') == []
+    assert idx.search('som') == [2]
+
+
+def test_task_manager_fuzzy_search_tracks_mutations(tmp_path):
+    sq = TaskManager(store=SqliteTaskStore(str(tmp_path / 'tasks.db')), lazy=True)
+    js = TaskManager(store=JsonTaskStore(str(tmp_path / 'tasks.json')))
+    for tm in (sq, js):
+        a = tm.add('Refactor parser module')
+        b = tm.add('Write release notes', tags=['docs'])
+        assert [t.id for t in tm.search('refactr', fuzzy=True)] == [a.id]
+        assert [t.id for t in tm.search('relase', fuzzy=True)] == [b.id]
+        assert tm.search('refactr', fuzzy=True, max_distance=0) == []
+        tm.edit(a.id, 'Rewrite lexer')
+        assert tm.search('refactr', fuzzy=True) == []
+        tm.add_detail(a.id, 'tokenizer cleanup')
+        assert [t.id for t in tm.search('tokeniser', fuzzy=True)] == [a.id]
+        tm.delete(b.id)
+        assert tm.search('relase', fuzzy=True) == []
+        c = tm.add('Release checklist')
+        assert [t.id for t in tm.search('relase', fuzzy=True)] == [c.id]
+    sq.store.close()
+
+
+def test_notes_and_cli_fuzzy_search(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    for backend in ('json', 'sqlite'):
+        base = str(tmp_path / backend)
+        S.add_note(backend, base, 'Vector database notes')
+        S.add_note(backend, base, 'Grocery list')
+        assert S.search_notes(backend, base, 'vectr') == []
+        assert [n.text for n in S.search_notes(backend, base, 'vectr', fuzzy=True)] == ['Vector database notes']
+        assert S.search_notes(backend, base, 'vectr', fuzzy=True, max_distance=0) == []
+    S.clear_note_stores()
+    TaskManager(backend='json').add('Schedule dentist appointment')
+    main(['search', 'apointment', '--fuzzy'])
+    assert capsys.readouterr().out.splitlines() == ['1: Schedule dentist appointment']
+    main(['search', 'apointment', '--fuzzy', '--max-distance', '0'])
+    assert capsys.readouterr().out == ''
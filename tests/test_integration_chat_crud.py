@@ -7,7 +7,8 @@ from pkms_core.agent import Agent
 from pkms_core.models import Task
 
 
-def test_chat_crud_end_to_end(tmp_path):
+def test_chat_crud_end_to_end(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
     # setup managers with json store in temp dir
     tm = TaskManager(store=None)
     dm = type('D', (), {'list': lambda self: []})()
@@ -0,0 +1,77 @@
+import json, os
+from pkms_core.storage import JsonTaskStore, make_task_store
+from pkms_core.models import Task
+
+
+def test_journal_appends_without_rewriting_snapshot(tmp_path):
+    path = str(tmp_path / 'tasks.json')
+    store = JsonTaskStore(path, journal=True)
+    store.save_all([Task(id=1, text='seed', created='t0')])
+    before = os.path.getmtime(path), os.path.getsize(path)
+    store.add(Task(id=2, text='second', created='t1'))
+    store.update(Task(id=1, text='seed updated', created='t0', completed=True))
+    assert store.delete(2) is True
+    assert store.delete(99) is False
+    # snapshot untouched; mutations live in the sidecar journal
+    assert (os.path.getmtime(path), os.path.getsize(path)) == before
+    assert os.path.exists(path + '.journal')
+    loaded = store.load()
+    assert [(t.id, t.text, t.completed) for t in loaded] == [(1, 'seed updated', True)]
+    # a non-journaled store sees the same state and folds the log on save
+    plain = JsonTaskStore(path)
+    assert [t.text for t in plain.load()] == ['seed updated']
+    plain.save_all(plain.load())
+    assert not os.path.exists(path + '.journal')
+    assert json.load(open(path, encoding='utf-8'))[0]['text'] == 'seed updated'
+
+
+def test_journal_compacts_past_threshold(tmp_path):
+    path = str(tmp_path / 'tasks.json')
+    store = JsonTaskStore(path, journal=True, compact_bytes=2048)
+    for i in range(1, 40):
+        store.add(Task(id=i, text=f'task {i}', created='t'))
+    # at least one compaction folded the log into the snapshot
+    data = json.load(open(path, encoding='utf-8'))
+    assert 0 < len(data) < 39
+    assert store._journal.size() < 2048
+    assert [t.id for t in store.load()] == list(range(1, 40))
+
+
+def test_journal_ignores_torn_trailing_record(tmp_path):
+    path = str(tmp_path / 'tasks.json')
+    store = JsonTaskStore(path, journal=True)
+    store.add(Task(id=1, text='kept', created='t'))
+    with open(path + '.journal', 'a', encoding='utf-8') as fh:
+        fh.write('{"op": "add", "id": 2, "item": {"id"')
+    assert [t.id for t in store.load()] == [1]
+
+
+def test_journal_append_after_torn_record_keeps_both(tmp_path):
+    path = str(tmp_path / 'tasks.json')
+    store = JsonTaskStore(path, journal=True)
+    store.add(Task(id=1, text='kept', created='t'))
+    with open(path + '.journal', 'a', encoding='utf-8') as fh:
+        fh.write('{"op": "add", "id": 2, "item": {"id"')
+    store.add(Task(id=3, text='after crash', created='t'))
+    store.add_many([Task(id=4, text='batch', created='t')])
+    assert [t.id for t in JsonTaskStore(path).load()] == [1, 3, 4]
+
+
+def test_make_task_store_journal_env(tmp_path, monkeypatch):
+    monkeypatch.setenv('PKMS_JSON_JOURNAL', '1')
+    store = make_task_store('json', str(tmp_path))
+    assert store.journal is True
+    store.add(Task(id=1, text='x', created='t'))
+    assert os.path.exists(store.path + '.journal')
+
+
+def test_document_journal_append_after_torn_record(tmp_path):
+    from pkms_core.storage import DocumentStore
+    from pkms_core.models import Document
+    path = str(tmp_path / 'docs.json')
+    store = DocumentStore(path, journal=True)
+    store.add(Document(id=1, title='a', text='x', tags=[], links=[], created='t', updated='t'))
+    with open(path + '.journal', 'a', encoding='utf-8') as fh:
+        fh.write('{"op": "add", "id": 2')
+    store.add(Document(id=3, title='c', text='z', tags=[], links=[], created='t', updated='t'))
+    assert [d.id for d in DocumentStore(path).load()] == [1, 3]
@@ -0,0 +1,61 @@
+from pkms_core.core import TaskManager, LazyTaskList
+from pkms_core.storage import SqliteTaskStore, JsonTaskStore
+
+
+def _seed(path, n):
+    tm = TaskManager(store=SqliteTaskStore(path))
+    for i in range(n):
+        tm.add(f'task {i}')
+    return tm
+
+
+def test_lazy_manager_pages_instead_of_loading(tmp_path, monkeypatch):
+    path = str(tmp_path / 'app_data' / 'tasks.db')
+    _seed(path, 25)
+    store = SqliteTaskStore(path)
+    monkeypatch.setattr(store, 'load', lambda: (_ for _ in ()).throw(AssertionError('full load')))
+    tm = TaskManager(store=store, lazy=True)
+    tm.tasks.page_size = 10
+    assert tm.lazy and isinstance(tm.list(), LazyTaskList)
+    assert tm._next_id == 26
+    assert len(tm.tasks) == 25
+    assert tm.tasks[0].text == 'task 0' and tm.tasks[-1].text == 'task 24' and tm.tasks[12].id == 13
+    assert [t.id for t in tm.tasks[3:5]] == [4, 5]
+    assert [t.id for t in tm.tasks] == list(range(1, 26))
+    assert len(tm.tasks._pages) <= LazyTaskList.MAX_PAGES
+
+
+def test_lazy_manager_mutations_go_to_store(tmp_path):
+    path = str(tmp_path / 'app_data' / 'tasks.db')
+    _seed(path, 3)
+    tm = TaskManager(store=SqliteTaskStore(path), lazy=True)
+    assert len(tm.list()) == 3
+    t = tm.add('fresh', priority=5)
+    assert t.id == 4 and len(tm.list()) == 4
+    assert tm.add_detail(2, 'more').details == ['more']
+    assert tm.set_completed(2, True).completed
+    assert tm.edit(1, 'renamed').text == 'renamed'
+    assert tm.delete(3) is True and tm.delete(3) is False
+    assert [(t.id, t.text, t.completed) for t in tm.list()] == [(1, 'renamed', False), (2, 'task 1', True), (4, 'fresh', False)]
+    assert [t.id for t in tm.list(include_completed=False)] == [1, 4]
+    assert [t.id for t in tm.search('task')] == [2]
+    assert tm.get(99) is None
+
+
+def test_lazy_falls_back_to_eager_for_json(tmp_path):
+    tm = TaskManager(store=JsonTaskStore(str(tmp_path / 'tasks.json')), lazy=True)
+    assert not tm.lazy and tm.list() == []
+
+
+def test_clear_resets_store_and_derived_state(tmp_path):
+    path = str(tmp_path / 'app_data' / 'tasks.db')
+    _seed(path, 4)
+    for lazy in (True, False):
+        tm = TaskManager(store=SqliteTaskStore(path), lazy=lazy)
+        assert tm.stats.total == 4 and tm.search('task', fuzzy=True)
+        gen = tm.generation
+        tm.clear()
+        assert tm.lazy == lazy and tm.generation > gen
+        assert len(tm.list()) == 0 and tm.stats.total == 0 and not tm.search('task', fuzzy=True)
+        assert tm.add('again').id == 1 and tm.stats.total == 1
+        _seed(path, 3)
@@ -0,0 +1,121 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pkms_core.agent import Agent
+from pkms_core.llm_async import AsyncOpenAIAdapter
+from pkms_core.models import Task
+
+NOW = "2026-01-01T00:00:00+00:00"
+
+
+class StubServer:
+    """Local Chat Completions stand-in: echoes the prompt, can fail first calls."""
+    def __init__(self, delay=0.0, fail=()):
+        self.delay = delay; self.fail = list(fail)
+        self.calls = 0; self.inflight = 0; self.max_inflight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            def log_message(self, *a): pass
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                with stub.lock:
+                    stub.calls += 1; stub.inflight += 1
+                    stub.max_inflight = max(stub.max_inflight, stub.inflight)
+                    status = stub.fail.pop(0) if stub.fail else 200
+                time.sleep(stub.delay)
+                with stub.lock:
+                    stub.inflight -= 1
+                prompt = body["messages"][-1]["content"]
+                data = json.dumps({"choices": [{"message": {"content": f"sum:{' '.join(prompt.split()[-2:])}"}}]} if status == 200
+                                  else {"error": "nope"}).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers(); self.wfile.write(data)
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/v1"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+    def close(self):
+        self.httpd.shutdown(); self.httpd.server_close()
+
+
+@pytest.fixture
+def stub():
+    servers = []
+    def make(**kw):
+        servers.append(StubServer(**kw)); return servers[-1]
+    yield make
+    for s in servers: s.close()
+
+
+def adapter(url, **kw):
+    kw.setdefault("backoff_factor", 0); kw.setdefault("jitter", 0)
+    return AsyncOpenAIAdapter(api_key="test", base_url=url, **kw)
+
+
+def test_summarize_many_bounded_and_reuses_connections(stub):
+    srv = stub(delay=0.05)
+    a = adapter(srv.url, max_concurrency=3)
+    texts = [f"text number {i:04d}" for i in range(12)]
+    out = a.summarize_many(texts)
+    assert out == [f"sum:number {i:04d}" for i in range(12)]
+    assert srv.calls == 12
+    assert 1 < srv.max_inflight <= 3
+    assert a.pool.opened <= 3
+
+
+def test_retries_transient_status_then_succeeds(stub):
+    srv = stub(fail=[429, 503])
+    a = adapter(srv.url, retries=3)
+    assert a.summarize("retry me please") == "sum:me please"
+    assert srv.calls == 3
+
+
+def test_client_error_is_not_retried(stub):
+    srv = stub(fail=[401])
+    a = adapter(srv.url, retries=3)
+    assert a.chat([{"role": "user", "content": "hi"}]) is None
+    assert srv.calls == 1
+
+
+def test_unreachable_server_gives_none():
+    a = adapter("http://127.0.0.1:9/v1", retries=2, timeout=2)
+    assert a.summarize_many(["x", "y"]) == [None, None]
+
+
+def test_agent_batches_summaries_and_advice(stub):
+    srv = stub()
+    agent = Agent(adapter(srv.url))
+    assert agent.batch_summaries()
+    tasks = [Task(id=i, text=f"short {i}", created=NOW) for i in range(1, 4)]
+    assert agent.summarize_tasks(tasks) == ["sum:short 1", "sum:short 2", "sum:short 3"]
+    long_text = " ".join(["word"] * 40) + " finalxyz"
+    advice = agent.productivity_advice([Task(id=1, text=long_text, created=NOW, priority=5)], [])
+    assert any("sum:word finalxyz" in line for line in advice)
+    assert not any(long_text in line for line in advice)
+
+
+def test_agent_without_batching_llm_unchanged():
+    agent = Agent(None)
+    assert not agent.batch_summaries()
+    assert agent.summarize_texts(["a", "b"]) == [None, None]
+    assert agent.summarize_tasks([Task(id=1, text="one two three", created=NOW)]) == ["one two three"]
+
+
+def test_dashboard_shows_batched_long_task_summaries(stub):
+    from pkms_core.dashboard import build_plain
+    srv = stub()
+    long_text = " ".join(["step"] * 20) + " wrapup"
+    tasks = [Task(id=1, text="tiny", created=NOW), Task(id=2, text=long_text, created=NOW)]
+    out = build_plain(tasks, [], Agent(adapter(srv.url)))
+    assert "    ↳ sum:step wrapup" in out
+    assert srv.calls == 1
+    assert "↳" not in build_plain(tasks, [], Agent(None))
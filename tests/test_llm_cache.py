@@ -0,0 +1,121 @@
+import time
+
+from pkms_core.agent import Agent
+from pkms_core.llm_cache import CachedLLM, ResponseCache, cached, prompt_key
+
+
+class CountingLLM:
+    model = "counting"
+    def __init__(self, answer="fresh"):
+        self.answer = answer; self.calls = 0
+    def available(self):
+        return True
+    def summarize(self, text):
+        self.calls += 1
+        return f"{self.answer}:{text}"
+    def chat(self, messages, **kw):
+        self.calls += 1
+        return f"{self.answer}:{messages[-1]['content']}"
+
+
+class BatchingLLM(CountingLLM):
+    def __init__(self):
+        super().__init__(); self.batches = []
+    def summarize_many(self, texts):
+        self.batches.append(list(texts))
+        return [f"many:{t}" for t in texts]
+
+
+def make(tmp_path, llm=None, **kw):
+    return CachedLLM(llm or CountingLLM(), ResponseCache(str(tmp_path / "llm_cache.db"), **kw))
+
+
+def test_repeated_prompt_hits_cache_across_instances(tmp_path):
+    inner = CountingLLM()
+    c = make(tmp_path, inner)
+    assert c.summarize("plan the week") == "fresh:plan the week"
+    assert c.summarize("plan the week") == "fresh:plan the week"
+    assert inner.calls == 1
+    assert (c.cache.hits, c.cache.misses) == (1, 1)
+    # a new process sees the stored answer and the persisted counters
+    again = make(tmp_path, CountingLLM("other"))
+    assert again.summarize("plan the week") == "fresh:plan the week"
+    assert again.cache.stats() == {"entries": 1, "hits": 2, "misses": 1}
+
+
+def test_key_covers_model_and_params(tmp_path):
+    assert prompt_key("a", "chat", "x") != prompt_key("b", "chat", "x")
+    assert prompt_key("a", "chat", "x", max_tokens=10) != prompt_key("a", "chat", "x", max_tokens=20)
+    inner = CountingLLM()
+    c = make(tmp_path, inner)
+    msgs = [{"role": "user", "content": "hi"}]
+    c.chat(msgs, max_tokens=10, retries=1); c.chat(msgs, max_tokens=10, retries=5); c.chat(msgs, max_tokens=20)
+    assert inner.calls == 2
+
+
+def test_ttl_expiry(tmp_path):
+    inner = CountingLLM()
+    c = make(tmp_path, inner, ttl=0.05)
+    c.summarize("x"); time.sleep(0.1); c.summarize("x")
+    assert inner.calls == 2
+
+
+def test_lru_eviction(tmp_path):
+    inner = CountingLLM()
+    c = make(tmp_path, inner, max_entries=2)
+    c.summarize("a"); time.sleep(0.01)
+    c.summarize("b"); time.sleep(0.01)
+    c.summarize("a"); time.sleep(0.01)   # refreshes "a"
+    c.summarize("c")                      # evicts "b"
+    assert c.cache.stats()["entries"] == 2
+    calls = inner.calls
+    c.summarize("a"); c.summarize("c")
+    assert inner.calls == calls
+    c.summarize("b")
+    assert inner.calls == calls + 1
+
+
+def test_bypass_refreshes_without_reading(tmp_path):
+    inner = CountingLLM()
+    c = make(tmp_path, inner)
+    c.summarize("x")
+    c.bypass = True; inner.answer = "newer"
+    assert c.summarize("x") == "newer:x"
+    c.bypass = False
+    assert c.summarize("x") == "newer:x"
+    assert inner.calls == 2
+
+
+def test_batch_sends_only_misses(tmp_path):
+    inner = BatchingLLM()
+    c = make(tmp_path, inner)
+    assert Agent(c).batch_summaries()
+    c.summarize_many(["a", "b"])
+    assert c.summarize_many(["a", "b", "c"]) == ["many:a", "many:b", "many:c"]
+    assert inner.batches == [["a", "b"], ["c"]]
+    assert not hasattr(make(tmp_path), "summarize_many")
+
+
+def test_wrapper_mirrors_adapter_methods(tmp_path):
+    class SummarizeOnly:
+        def available(self): return True
+        def summarize(self, text): return "s"
+    c = make(tmp_path, SummarizeOnly())
+    assert not hasattr(c, "chat") and hasattr(make(tmp_path), "chat")
+
+
+def test_cached_skips_unavailable_and_disabled(tmp_path, monkeypatch):
+    class Off(CountingLLM):
+        def available(self): return False
+    off = Off()
+    assert cached(off, str(tmp_path)) is off
+    monkeypatch.setenv("PKMS_LLM_CACHE", "0")
+    on = CountingLLM()
+    assert cached(on, str(tmp_path)) is on
+    monkeypatch.delenv("PKMS_LLM_CACHE")
+    from pkms_core.llm import LLMAdapter
+    monkeypatch.setenv("OPENAI_API_KEY", "k")
+    local = LLMAdapter()
+    assert local.available() and cached(local, str(tmp_path)) is local
+    assert isinstance(cached(on, str(tmp_path)), CachedLLM)
+    assert (tmp_path / "app_data" / "llm_cache.db").exists()
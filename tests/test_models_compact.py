@@ -0,0 +1,29 @@
+from dataclasses import asdict, fields, replace
+from pkms_core.models import Task, Note
+
+
+def test_task_and_note_are_slotted_dataclasses():
+    t = Task(id=1, text='x', created='t', tags=['a'])
+    assert not hasattr(t, '__dict__')
+    assert [f.name for f in fields(Task)] == ['id', 'text', 'created', 'completed', 'details', 'priority', 'tags']
+    assert replace(t, text='y').text == 'y' and t == Task(id=1, text='x', created='t', tags=['a'])
+    assert Task(id=2, text='', created='').details == [] and Task(id=2, text='', created='').priority == 3
+    n = Note(id=1, text='n', created='t')
+    assert not hasattr(n, '__dict__') and n.task_id is None
+
+
+def test_to_dict_matches_asdict_and_copies_lists():
+    t = Task(id=1, text='x', created='t', completed=True, details=['d'], priority=5, tags=['a'])
+    d = t.to_dict()
+    assert d == asdict(t) and list(d) == list(asdict(t))
+    d['details'].append('mutated')
+    assert t.details == ['d']
+    n = Note(id=3, text='n', created='t', details=['x'], task_id=7)
+    assert n.to_dict() == asdict(n)
+
+
+def test_from_dict_interns_tags():
+    a = Task.from_dict({'id': 1, 'text': 'a', 'created': 't', 'tags': [''.join(['wo', 'rk'])]})
+    b = Task.from_dict({'id': 2, 'text': 'b', 'created': 't', 'tags': [''.join(['w', 'ork'])]})
+    assert a.tags[0] is b.tags[0]
+    assert Task.from_dict(a.to_dict()) == a
@@ -0,0 +1,62 @@
+import json, os
+from pkms_core.cli import main
+from pkms_core.core import TaskManager
+from pkms_core.storage import JsonTaskStore, make_note_store, add_note, clear_note_stores
+from pkms_core.transfer import iter_import_records, import_records, write_ndjson
+
+
+def test_ndjson_export_streams_one_record_per_line(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    tm = TaskManager(backend='json')
+    tm.add('first', priority=4, tags=['a'])
+    tm.add_detail(1, 'step one')
+    add_note('json', str(tmp_path), 'a note')
+    out = str(tmp_path / 'dump.ndjson')
+    assert main(['export', out]) in (0, None)
+    lines = [json.loads(l) for l in open(out, encoding='utf-8')]
+    assert lines[0]['type'] == 'meta' and lines[0]['format'] == 'pkms-ndjson'
+    assert [l['type'] for l in lines[1:]] == ['task', 'note']
+    assert lines[1]['details'] == ['step one'] and lines[1]['tags'] == ['a']
+
+
+def test_import_batches_and_reports_progress(tmp_path):
+    src = str(tmp_path / 'in.ndjson')
+    recs = [{'type': 'task', 'text': f't{i}', 'priority': 2, 'completed': i % 2 == 0, 'details': ['d']} for i in range(25)]
+    recs += [{'type': 'note', 'text': f'n{i}', 'details': ['x']} for i in range(5)]
+    write_ndjson(src, [{'type': 'meta'}] + recs)
+    tm = TaskManager(store=JsonTaskStore(str(tmp_path / 'tasks.json')))
+    seen = []
+    counts = import_records(iter_import_records(src), tm, 'json', str(tmp_path), batch_size=10, progress=lambda s, n: seen.append(n))
+    assert counts == {'tasks': 25, 'notes': 5}
+    assert seen == [10, 20, 30]
+    tasks = tm.store.load()
+    assert [t.id for t in tasks] == list(range(1, 26))
+    assert tasks[0].completed is True and tasks[0].details == ['d']
+    assert [(n.id, n.details) for n in make_note_store('json', str(tmp_path)).load()] == [(i, ['x']) for i in range(1, 6)]
+    clear_note_stores()
+
+
+def test_import_still_reads_legacy_json(tmp_path):
+    src = str(tmp_path / 'legacy.json')
+    json.dump({'tasks': [{'text': 'old', 'priority': 5}], 'notes': [{'text': 'old note'}]}, open(src, 'w'))
+    assert [r['type'] for r in iter_import_records(src)] == ['task', 'note']
+
+
+def test_legacy_json_streams_in_batches(tmp_path, monkeypatch):
+    import pkms_core.transfer as transfer
+    src = str(tmp_path / 'legacy.json')
+    data = {'version': 1, 'tasks': [{'text': f'old {i} ünïcode', 'priority': 12345 + i, 'details': ['d']} for i in range(25)],
+            'meta': {'nested': [1, 2]}, 'notes': [{'text': 'old note', 'task_id': 3}]}
+    json.dump(data, open(src, 'w', encoding='utf-8'), indent=2, ensure_ascii=False)
+    # tiny reads split keys, strings and numbers across buffer refills
+    monkeypatch.setattr(transfer._JsonReader.__init__, '__defaults__', (7,))
+    with monkeypatch.context() as m:
+        m.setattr(json, 'load', lambda *a, **k: (_ for _ in ()).throw(AssertionError('whole-file parse')))
+        recs = list(iter_import_records(src))
+    assert recs == [dict(t, type='task') for t in data['tasks']] + [dict(data['notes'][0], type='note')]
+    tm = TaskManager(store=JsonTaskStore(str(tmp_path / 'tasks.json')))
+    seen = []
+    import_records(iter_import_records(src), tm, 'json', str(tmp_path), batch_size=10, progress=lambda s, n: seen.append(n))
+    assert seen == [10, 20, 26] and len(tm.store.load()) == 25
+    clear_note_stores()
+
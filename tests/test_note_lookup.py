@@ -0,0 +1,47 @@
+import pytest
+from pkms_core import storage as S
+
+
+@pytest.mark.parametrize('backend', ['json', 'sqlite'])
+def test_display_index_and_id_lookup(tmp_path, backend):
+    base = str(tmp_path)
+    for text in ('first', 'second', 'third'):
+        S.add_note(backend, base, text)
+    store = S.make_note_store(backend, base)
+    assert store.count() == 3 and store.next_id() == 4
+    assert store.get_at(2).text == 'second'
+    assert store.get(3).text == 'third' and store.get(99) is None
+    with pytest.raises(IndexError):
+        store.get_at(4)
+    with pytest.raises(IndexError):
+        S.get_note_by_display_index(backend, base, 0)
+    S.describe_note(backend, base, 2, 'detail')
+    assert S.get_note_by_display_index(backend, base, 2).details == ['detail']
+    assert S.delete_note(backend, base, 1) is True
+    assert [n.text for n in S.list_notes(backend, base)] == ['second', 'third']
+    assert store.get_at(1).text == 'second'
+
+
+def test_json_index_follows_external_writes(tmp_path):
+    base = str(tmp_path)
+    S.add_note('json', base, 'one')
+    store = S.make_note_store('json', base)
+    assert store.count() == 1
+    # another process rewrites the file
+    other = S.JsonNoteStore(store.path)
+    other.save_all(other.load() + [S.Note(id=7, text='external', created='t')])
+    assert store.get(7).text == 'external'
+
+
+def test_json_store_hands_out_copies(tmp_path, monkeypatch):
+    base = str(tmp_path)
+    S.add_note('json', base, 'one')
+    store = S.make_note_store('json', base)
+    store.get(1).details.append('stray'); store.get_at(1).text = 'changed'; store.load()[0].task_id = 9
+    assert store.get(1) == S.Note(id=1, text='one', created=store.get(1).created)
+    # a save that fails after the caller mutated its note leaves the cache untouched
+    monkeypatch.setattr(S.json, 'dump', lambda *a, **k: (_ for _ in ()).throw(OSError('disk full')))
+    with pytest.raises(OSError):
+        S.describe_note('json', base, 1, 'lost')
+    monkeypatch.undo()
+    assert store.get(1).details == []
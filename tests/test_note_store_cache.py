@@ -0,0 +1,36 @@
+import os
+from pkms_core import storage as S
+
+
+def test_note_store_is_cached_per_backend_and_dir(tmp_path):
+    a = S.make_note_store('sqlite', str(tmp_path))
+    assert S.make_note_store('sqlite', str(tmp_path)) is a
+    assert S.make_note_store('json', str(tmp_path)) is not a
+    other = tmp_path / 'other'; other.mkdir()
+    assert S.make_note_store('sqlite', str(other)) is not a
+    assert isinstance(a, S.SqliteNoteStore)
+
+
+def test_legacy_migration_probed_once(tmp_path, monkeypatch):
+    calls = []
+    real = S._open_note_store
+    monkeypatch.setattr(S, '_open_note_store', lambda kind, base: calls.append(kind) or real(kind, base))
+    S.add_note('json', str(tmp_path), 'one')
+    S.describe_note('json', str(tmp_path), 1, 'detail')
+    S.delete_note('json', str(tmp_path), 1)
+    assert calls == ['json']
+
+
+def test_cached_store_reopens_when_db_removed(tmp_path):
+    store = S.make_note_store('sqlite', str(tmp_path))
+    store.close()
+    os.remove(store.path)
+    again = S.make_note_store('sqlite', str(tmp_path))
+    assert again is not store
+    assert again.load() == []
+
+
+def test_clear_note_stores(tmp_path):
+    store = S.make_note_store('sqlite', str(tmp_path))
+    S.clear_note_stores()
+    assert S.make_note_store('sqlite', str(tmp_path)) is not store
@@ -0,0 +1,37 @@
+import random
+import pytest
+from pkms_core import suggestions as sugg
+from pkms_core.agent import Agent
+from pkms_core.models import Document
+from pkms_core.suggestions import SuggestionCache, extract_many, extract_suggestions, suggest_workers
+
+
+def _texts(n, seed=4):
+    rng = random.Random(seed)
+    lines = ['TODO: item {}', 'write report {}', 'just prose {}', 'fix bug {}']
+    return ['\n'.join(rng.choice(lines).format(rng.randint(1, 30)) for _ in range(rng.randint(0, 12))) for _ in range(n)]
+
+
+@pytest.mark.parametrize('pool', ['process', 'thread'])
+def test_extract_many_matches_serial_order(pool):
+    texts = _texts(57)
+    assert extract_many(texts, workers=3, pool=pool, min_bytes=0) == [extract_suggestions(t) for t in texts]
+
+
+def test_worker_count_from_environment(monkeypatch):
+    monkeypatch.delenv('PKMS_SUGGEST_WORKERS', raising=False)
+    assert suggest_workers() == 1
+    monkeypatch.setenv('PKMS_SUGGEST_WORKERS', '3')
+    assert suggest_workers() == 3 and suggest_workers(2) == 2
+    monkeypatch.setenv('PKMS_SUGGEST_WORKERS', 'auto')
+    assert suggest_workers() >= 1
+
+
+def test_parallel_document_suggestions_keep_dedupe_order(monkeypatch):
+    docs = [Document(id=i, title='', text=t, tags=[], links=[], created='', updated='') for i, t in enumerate(_texts(40), 1)]
+    serial = Agent().suggest_tasks_from_documents(docs, workers=1)
+    monkeypatch.setattr(sugg, 'PARALLEL_MIN_BYTES', 0)
+    assert Agent().suggest_tasks_from_documents(docs, workers=2) == serial
+    cache = SuggestionCache(); cache.sync(docs, workers=2)
+    assert cache.merged() == serial
+    assert Agent().suggest_tasks_from_documents(docs, limit=5, workers=2) == serial[:5]
@@ -0,0 +1,132 @@
+import json, os
+from pkms_core.core import DocumentManager
+from pkms_core.search_index import InvertedIndex, MappedIndex, OverlayIndex, index_signature
+from pkms_core.storage import DocumentStore
+
+
+def _seed(tmp_path):
+    path = str(tmp_path / 'docs.json')
+    dm = DocumentManager(store=DocumentStore(path, journal=True))
+    dm.add('Roadmap', 'plan the quarterly roadmap', tags=['planning'])
+    dm.add('Retro', 'sprint retrospective notes')
+    dm.add('Budget', 'roadmap budget review')
+    return path
+
+
+def test_search_persists_index_and_next_open_maps_it(tmp_path, monkeypatch):
+    path = _seed(tmp_path)
+    dm = DocumentManager(store=DocumentStore(path, journal=True))
+    assert [d.id for d in dm.search('roadmap')] == [1, 3]
+    assert os.path.exists(str(tmp_path / 'docs.idx'))
+    builds = []
+    monkeypatch.setattr(InvertedIndex, 'build', classmethod(lambda cls, items: builds.append(1) or cls()))
+    store = DocumentStore(path, journal=True)
+    dm2 = DocumentManager(store=store)
+    assert dm2._docs is None  # construction parses nothing
+    assert [d.id for d in dm2.search('roadmap')] == [1, 3]
+    assert isinstance(dm2._index, MappedIndex) and builds == []
+    assert sorted(dm2._index.terms())[:2] == ['budget', 'notes']
+
+
+def test_stale_or_corrupt_index_is_rebuilt(tmp_path):
+    path = _seed(tmp_path)
+    DocumentManager(store=DocumentStore(path, journal=True)).search('roadmap')
+    idx = str(tmp_path / 'docs.idx')
+    assert MappedIndex.open(idx, index_signature(path)) is not None
+    DocumentManager(store=DocumentStore(path, journal=True)).add('Roadmap v2', 'new roadmap')
+    assert MappedIndex.open(idx, index_signature(path)) is None
+    dm = DocumentManager(store=DocumentStore(path, journal=True))
+    assert sorted(d.id for d in dm.search('roadmap')) == [1, 3, 4]
+    with open(idx, 'wb') as fh:
+        fh.write(b'garbage')
+    assert sorted(d.id for d in DocumentManager(store=DocumentStore(path, journal=True)).search('roadmap')) == [1, 3, 4]
+
+
+def test_mutations_over_mapped_index_and_lazy_add(tmp_path, monkeypatch):
+    path = _seed(tmp_path)
+    DocumentManager(store=DocumentStore(path, journal=True)).search('x')
+    store = DocumentStore(path, journal=True)
+    monkeypatch.setattr(store, 'load', lambda: (_ for _ in ()).throw(AssertionError('docs parsed')))
+    dm = DocumentManager(store=store)
+    doc = dm.add('Roadmap notes', 'more roadmap')
+    assert doc.id == 4 and isinstance(dm._index, OverlayIndex)
+    monkeypatch.undo()
+    assert dm.delete(1) is True
+    assert sorted(d.id for d in dm.search('roadmap')) == [3, 4]
+    assert dm.update(3, text='finance only') is not None
+    assert [d.id for d in dm.search('roadmap')] == [4]
+
+
+def test_cold_delete_and_update_skip_parsing_the_corpus(tmp_path, monkeypatch):
+    path = _seed(tmp_path)
+    DocumentManager(store=DocumentStore(path, journal=True)).search('x')
+    store = DocumentStore(path, journal=True)
+    monkeypatch.setattr(store, 'load', lambda: (_ for _ in ()).throw(AssertionError('docs parsed')))
+    dm = DocumentManager(store=store)
+    assert dm.delete(99) is False and dm.delete(1) is True and dm.delete(1) is False
+    assert dm.update(1, text='gone') is None
+    assert dm.update(3, text='finance only').title == 'Budget'
+    assert dm._docs is None and isinstance(dm._index, OverlayIndex)
+    monkeypatch.undo()
+    assert [d.id for d in dm.search('roadmap')] == []
+    assert [(d.id, d.text) for d in DocumentStore(path).load()] == [(2, 'sprint retrospective notes'), (3, 'finance only')]
+
+
+def test_store_get_reads_one_document(tmp_path):
+    path = str(tmp_path / 'docs.json')
+    from pkms_core.models import Document
+    docs = [Document(id=i, title=f'T{i}', text='{"id": 5, "x": 1}', tags=[], links=[], created='c', updated='u') for i in (5, 50)]
+    DocumentStore(path).save_all(docs)
+    store = DocumentStore(path, journal=True)
+    assert store.get(5) == docs[0] and store.get(50) == docs[1] and store.get(7) is None
+    store.update(Document(id=5, title='new', text='', tags=[], links=[], created='c', updated='u2'))
+    store.delete(50)
+    assert store.get(5).title == 'new' and store.get(50) is None
+    # keys in another order still resolve through a full parse
+    with open(path, 'w') as fh:
+        json.dump([{'title': 'X', 'id': 8, 'text': '', 'tags': [], 'links': [], 'created': 'c', 'updated': 'u'}], fh)
+    assert DocumentStore(path).get(8).title == 'X'
+
+
+def _ranked(path, query):
+    """Ranking over an index built afresh from the documents (the reference)."""
+    from pkms_core.search_index import document_fields
+    dm = DocumentManager(store=DocumentStore(path))
+    dm._index = InvertedIndex()
+    for d in dm.docs: dm._index.add(d.id, document_fields(d))
+    return [d.id for d in dm.search(query)]
+
+
+def test_edits_keep_the_persisted_index_mappable(tmp_path, monkeypatch):
+    path = _seed(tmp_path)
+    DocumentManager(store=DocumentStore(path, journal=True)).search('x')
+    builds = []
+    real_build = InvertedIndex.build.__func__
+    monkeypatch.setattr(InvertedIndex, 'build', classmethod(lambda cls, items: builds.append(1) or real_build(cls, items)))
+    new = lambda: DocumentManager(store=DocumentStore(path, journal=True))
+    assert new().add('Roadmap v2', 'next roadmap').id == 4
+    dm = new()
+    assert [d.id for d in dm.search('roadmap')] == _ranked(path, 'roadmap') and isinstance(dm._index, OverlayIndex)
+    assert new().delete(1) is True
+    assert new().update(3, title='Roadmap budget') is not None
+    assert [d.id for d in new().search('roadmap')] == _ranked(path, 'roadmap') and sorted(_ranked(path, 'roadmap')) == [3, 4]
+    assert [d.id for d in new().search('"next roadmap"')] == [4]
+    assert new().add('Later', 'later').id == 5
+    assert builds == []
+    # an interrupted or foreign delta is ignored and the index rebuilt
+    with open(str(tmp_path / 'docs.idx.delta'), 'r+b') as fh:
+        fh.seek(40); fh.write(b'\0' * 32)
+    assert [d.id for d in new().search('roadmap')] == _ranked(path, 'roadmap') and builds == [1]
+
+
+def test_large_delta_is_folded_into_the_index(tmp_path, monkeypatch):
+    import pkms_core.search_index as SI
+    path = _seed(tmp_path)
+    DocumentManager(store=DocumentStore(path, journal=True)).search('x')
+    monkeypatch.setattr(SI, 'INDEX_DELTA_MIN_BYTES', 0)
+    dm = DocumentManager(store=DocumentStore(path, journal=True))
+    dm.delete(2); dm.add('Roadmap v2', 'next roadmap')
+    assert not os.path.exists(str(tmp_path / 'docs.idx.delta'))
+    mapped = MappedIndex.open(str(tmp_path / 'docs.idx'), index_signature(path))
+    assert mapped is not None and mapped.max_id == 4 and 2 not in mapped and len(mapped) == 3
+    assert [d.id for d in DocumentManager(store=DocumentStore(path, journal=True)).search('roadmap')] == _ranked(path, 'roadmap')
@@ -0,0 +1,57 @@
+import random
+from pkms_core.agent import Agent
+from pkms_core.chat import ChatEngine, ChatHistory
+from pkms_core.cli import main
+from pkms_core.core import DocumentManager, TaskManager
+from pkms_core.search_index import top_k
+from pkms_core.storage import DocumentStore, JsonTaskStore, SqliteTaskStore
+
+
+def test_top_k_pages_match_full_sort():
+    rng = random.Random(3)
+    scores = {i: float(rng.randint(0, 20)) for i in range(1, 500)}
+    full = top_k(scores)
+    assert full == sorted(scores.items(), key=lambda kv: (-kv[1], kv[0]))
+    assert top_k(scores, 10) == full[:10]
+    assert top_k(scores, 10, 40) == full[40:50]
+    assert top_k(scores, 10, 495) == full[495:]
+
+
+def test_document_search_pages(tmp_path):
+    dm = DocumentManager(store=DocumentStore(str(tmp_path / 'docs.json'), journal=True))
+    for i in range(12):
+        dm.add(f'Project {i}', 'project ' * (i % 4 + 1) + 'status')
+    full = [d.id for d in dm.search('project status')]
+    assert len(full) == 12
+    assert [d.id for d in dm.search('project status', limit=5)] == full[:5]
+    assert [d.id for d in dm.search('project status', limit=5, offset=10)] == full[10:]
+    assert [d.id for d in dm.search('status', limit=3, offset=2)] == [d.id for d in dm.search('status')][2:5]
+
+
+def test_task_search_pages_on_both_backends(tmp_path):
+    sq = TaskManager(store=SqliteTaskStore(str(tmp_path / 'tasks.db')), lazy=True)
+    js = TaskManager(store=JsonTaskStore(str(tmp_path / 'tasks.json')))
+    for tm in (sq, js):
+        for i in range(8):
+            tm.add(f'release step {i}')
+        full = [t.id for t in tm.search('release')]
+        assert len(full) == 8
+        assert [t.id for t in tm.search('release', limit=3)] == full[:3]
+        assert [t.id for t in tm.search('release', limit=3, offset=6)] == full[6:]
+        assert tm.search('release', limit=3, offset=20) == []
+    sq.store.close()
+
+
+def test_cli_search_limit_and_chat_suggest_limit(tmp_path, monkeypatch, capsys):
+    monkeypatch.chdir(tmp_path)
+    tm = TaskManager(backend='json')
+    for i in range(5):
+        tm.add(f'paging task {i}')
+    main(['search', 'paging', '--limit', '2', '--offset', '1'])
+    assert capsys.readouterr().out.splitlines() == ['2: paging task 1', '3: paging task 2']
+    dm = DocumentManager(store=DocumentStore(str(tmp_path / 'docs.json'), journal=True))
+    dm.add('Release plan', 'TODO: tag the build\nTODO: write notes\nTODO: announce')
+    dm.add('Garden', 'TODO: water plants')
+    chat = ChatEngine(Agent(), tm, dm, ChatHistory())
+    assert chat.handle_message('suggest tasks 2').splitlines() == ['tag the build', 'write notes']
+    assert chat.handle_message('suggest tasks for garden').splitlines() == ['water plants']
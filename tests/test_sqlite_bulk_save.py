@@ -0,0 +1,41 @@
+from pkms_core.storage import SqliteTaskStore, make_note_store
+from pkms_core.models import Task, Note
+
+
+def _tasks(n):
+    return [Task(id=i, text=f'task {i}', created='t', details=[f'd{i}'], priority=(i % 5) + 1, tags=['x']) for i in range(1, n + 1)]
+
+
+def test_save_all_bulk_replaces_contents(tmp_path):
+    store = SqliteTaskStore(str(tmp_path / 'app_data' / 'tasks.db'))
+    store.save_all(_tasks(50))
+    store.save_all(_tasks(3))
+    loaded = store.load()
+    assert [(t.id, t.details, t.priority, t.tags) for t in loaded] == [(1, ['d1'], 2, ['x']), (2, ['d2'], 3, ['x']), (3, ['d3'], 4, ['x'])]
+
+
+def test_save_all_diff_only_touches_changed_rows(tmp_path):
+    store = SqliteTaskStore(str(tmp_path / 'app_data' / 'tasks.db'))
+    store.save_all(_tasks(10))
+    tasks = _tasks(10)
+    tasks[2].text = 'changed'
+    del tasks[5]
+    tasks.append(Task(id=42, text='new', created='t'))
+    conn = store._conn()
+    with conn:
+        conn.execute("CREATE TEMP TABLE audit(op TEXT)")
+        for op in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f"CREATE TEMP TRIGGER audit_{op} AFTER {op} ON main.tasks BEGIN INSERT INTO audit VALUES ('{op}'); END")
+    store.save_all(tasks, diff=True)
+    # one update, one delete, one insert
+    assert sorted(r[0] for r in conn.execute("SELECT op FROM audit")) == ['DELETE', 'INSERT', 'UPDATE']
+    loaded = {t.id: t for t in store.load()}
+    assert loaded[3].text == 'changed' and 6 not in loaded and loaded[42].text == 'new'
+    assert len(loaded) == 10
+
+
+def test_note_save_all_diff(tmp_path):
+    store = make_note_store('sqlite', str(tmp_path))
+    store.save_all([Note(id=1, text='a', created='t'), Note(id=2, text='b', created='t')])
+    store.save_all([Note(id=2, text='b2', created='t', details=['x'])], diff=True)
+    assert [(n.id, n.text, n.details) for n in store.load()] == [(2, 'b2', ['x'])]
@@ -0,0 +1,43 @@
+import sqlite3
+from pkms_core.storage import SqliteTaskStore, make_note_store
+from pkms_core.models import Task
+
+
+def test_sqlite_store_reuses_one_tuned_connection(tmp_path):
+    store = SqliteTaskStore(str(tmp_path / 'app_data' / 'tasks.db'))
+    conn = store._conn()
+    store.add(Task(id=1, text='one', created='t'))
+    store.update(Task(id=1, text='one!', created='t'))
+    assert store._conn() is conn
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0].lower() == 'wal'
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    assert [t.text for t in store.load()] == ['one!']
+    store.close()
+    assert [t.text for t in store.load()] == ['one!']
+
+
+def test_schema_version_skips_ddl_when_current(tmp_path, monkeypatch):
+    path = str(tmp_path / 'app_data' / 'tasks.db')
+    SqliteTaskStore(path).close()
+    assert sqlite3.connect(path).execute("PRAGMA user_version").fetchone()[0] == SqliteTaskStore.SCHEMA_VERSION
+    calls = []
+    monkeypatch.setattr(SqliteTaskStore, '_create_schema', lambda self, conn, version: calls.append(1))
+    SqliteTaskStore(path)
+    assert calls == []
+
+
+def test_legacy_db_without_version_is_upgraded(tmp_path):
+    path = tmp_path / 'app_data' / 'tasks.db'
+    path.parent.mkdir()
+    raw = sqlite3.connect(str(path))
+    raw.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, text TEXT, created TEXT, completed INTEGER, details TEXT)")
+    raw.execute("INSERT INTO tasks VALUES (1,'old','t',0,'[]')")
+    raw.commit(); raw.close()
+    store = SqliteTaskStore(str(path))
+    t = store.load()[0]
+    assert (t.text, t.priority, t.tags) == ('old', 3, [])
+
+
+def test_note_store_uses_pooled_connection(tmp_path):
+    store = make_note_store('sqlite', str(tmp_path))
+    assert store._conn() is store._conn()
@@ -0,0 +1,64 @@
+import json, sqlite3
+from pkms_core.core import TaskManager
+from pkms_core.storage import SqliteTaskStore, JsonTaskStore
+from pkms_core.models import Task
+
+
+def test_v2_json_columns_migrate_to_child_tables(tmp_path):
+    path = tmp_path / 'app_data' / 'tasks.db'
+    path.parent.mkdir()
+    raw = sqlite3.connect(str(path))
+    raw.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, text TEXT, created TEXT, completed INTEGER, details TEXT, priority INTEGER DEFAULT 3, tags TEXT DEFAULT '[]')")
+    raw.execute("INSERT INTO tasks VALUES (1,'old','t',0,?,4,?)", (json.dumps(['a', 'b']), json.dumps(['work', 'urgent'])))
+    raw.execute("INSERT INTO tasks VALUES (2,'bare','t',1,NULL,3,NULL)")
+    raw.execute("PRAGMA user_version=1")
+    raw.commit(); raw.close()
+    store = SqliteTaskStore(str(path))
+    assert [(t.id, t.details, t.tags) for t in store.load()] == [(1, ['a', 'b'], ['work', 'urgent']), (2, [], [])]
+    conn = store._conn()
+    assert conn.execute("SELECT COUNT(*) FROM tasks WHERE details IS NOT NULL OR tags IS NOT NULL").fetchone()[0] == 0
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == SqliteTaskStore.SCHEMA_VERSION
+    # full-text index was rebuilt from the child tables
+    assert [t.id for t in store.search('urgent')] == [1]
+
+
+def test_filters_are_pushed_down(tmp_path):
+    store = SqliteTaskStore(str(tmp_path / 'app_data' / 'tasks.db'))
+    tm = TaskManager(store=store)
+    tm.add('a', priority=5, tags=['work'])
+    tm.add('b', priority=3, tags=['home', 'work'])
+    tm.add('c', priority=5, tags=['home'])
+    tm.set_completed(3, True)
+    plan = store._conn().execute("EXPLAIN QUERY PLAN SELECT task_id FROM task_tags WHERE tag=?", ('work',)).fetchall()
+    assert any('idx_task_tags_tag' in row[-1] for row in plan)
+    assert [t.id for t in tm.filter(tag='work')] == [1, 2]
+    assert [t.id for t in tm.filter(tag='home', completed=False)] == [2]
+    assert [t.id for t in tm.filter(priority=5)] == [1, 3]
+    assert tm.filter(tag='home')[0] is tm.tasks[1]
+    # json stores filter in Python with the same results
+    jtm = TaskManager(store=JsonTaskStore(str(tmp_path / 'tasks.json')))
+    for t in tm.list():
+        jtm.store.add(t)
+    jtm = TaskManager(store=jtm.store)
+    assert [t.id for t in jtm.filter(tag='home', completed=False)] == [2]
+
+
+def test_details_and_tags_roundtrip_through_updates(tmp_path):
+    store = SqliteTaskStore(str(tmp_path / 'app_data' / 'tasks.db'))
+    store.add(Task(id=1, text='x', created='t', details=['one'], tags=['k']))
+    store.update(Task(id=1, text='x', created='t', details=['one', 'two'], tags=[]))
+    assert [(t.details, t.tags) for t in store.load()] == [(['one', 'two'], [])]
+    assert [t.id for t in store.search('two')] == [1]
+    assert store.search('k') == []
+    store.delete(1)
+    assert store._conn().execute("SELECT COUNT(*) FROM task_details").fetchone()[0] == 0
+
+
+def test_update_of_missing_task_leaves_no_orphans(tmp_path):
+    store = SqliteTaskStore(str(tmp_path / 'tasks.db'))
+    store.update(Task(id=7, text='ghost', created='t', details=['d'], tags=['x']))
+    with store._tx() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM task_details").fetchone()[0] == 0
+        assert conn.execute("SELECT COUNT(*) FROM task_tags").fetchone()[0] == 0
+    store.add_many([Task(id=7, text='real', created='t', details=['d'], tags=['x'])])
+    assert [(t.text, t.details, t.tags) for t in store.load()] == [('real', ['d'], ['x'])]
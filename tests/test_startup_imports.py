@@ -0,0 +1,66 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+import pkms_core
+from pkms_core import cli
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('rich', 'keyring', 'openai', 'multiprocessing', 'concurrent.futures.process',
+         'logging', 'pkms_core.llm', 'pkms_core.keyring_store', 'pkms_core.chat', 'pkms_core.agent',
+         'pkms_core.search_index', 'pkms_core.stats', 'pkms_core.suggestions')
+# wall-time budget for `pkms add` on top of a bare interpreter start (median of a few runs)
+ADD_BUDGET_MS = float(os.environ.get('PKMS_STARTUP_BUDGET_MS', '100'))
+
+
+def _modules_after(code, cwd):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    out = subprocess.run([sys.executable, '-c', code + '\nimport sys; print("\\n".join(sys.modules))'],
+                         cwd=cwd, env=env, capture_output=True, text=True, check=True).stdout
+    return set(out.split())
+
+
+def test_add_and_notes_add_skip_heavy_imports(tmp_path):
+    for argv in (['add', 'Buy milk'], ['notes', 'add', 'idea'], ['info']):
+        loaded = _modules_after(f'from pkms_core.cli import main; main({argv!r})', str(tmp_path))
+        assert not [m for m in loaded if m.split('.')[0] in HEAVY or m in HEAVY], argv
+    assert 'pkms_core.core' not in _modules_after('import pkms_core', str(tmp_path))
+
+
+def _median_ms(args, cwd, runs=5):
+    env = dict(os.environ, PYTHONPATH=ROOT, PKMS_NO_DAEMON='1')
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, *args], cwd=cwd, env=env, stdout=subprocess.DEVNULL, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def test_add_starts_within_budget(tmp_path):
+    # measure warm starts: with PYTHONDONTWRITEBYTECODE set, recompiling would dominate
+    subprocess.run([sys.executable, '-m', 'compileall', '-q', os.path.join(ROOT, 'pkms_core')], check=True)
+    bare = _median_ms(['-c', 'pass'], str(tmp_path))
+    add = _median_ms(['-m', 'pkms_core.cli', 'add', 'Buy milk'], str(tmp_path))
+    assert add - bare < ADD_BUDGET_MS, f'pkms add took {add:.0f} ms ({bare:.0f} ms bare interpreter)'
+
+
+def test_package_exports_resolve_lazily():
+    assert pkms_core.TaskManager.__name__ == 'TaskManager' and pkms_core.ChatEngine.__module__ == 'pkms_core.chat'
+    assert set(pkms_core.__all__) <= set(dir(pkms_core))
+
+
+def test_say_prints_plain_text_when_not_a_tty(capsys, monkeypatch):
+    monkeypatch.setattr(cli, 'console', cli._UNSET)
+    cli.say('[bold]done[/bold]', style='green')
+    assert capsys.readouterr().out == '[bold]done[/bold]\n'
+    assert cli.console is cli._UNSET  # rich was never loaded
+
+
+def test_main_builds_only_the_named_subcommand():
+    assert cli._command_name(['--backend', 'sqlite', 'add', 'x']) == 'add'
+    assert cli._command_name(['--verbose', 'search', 'q']) == 'search'
+    assert cli._command_name(['--help']) is None and cli._command_name(['bogus']) is None
+    argv = ['--backend', 'sqlite', 'add', 'x', '--priority', '4', '--tags', 'a,b']
+    assert cli.build_parser(only='add').parse_args(argv) == cli.build_parser().parse_args(argv)
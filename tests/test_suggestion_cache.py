@@ -0,0 +1,70 @@
+import pytest
+from pkms_core import suggestions as sugg
+from pkms_core.agent import Agent
+from pkms_core.chat import ChatEngine, ChatHistory
+from pkms_core.core import DocumentManager, TaskManager
+from pkms_core.storage import DocumentStore, JsonTaskStore
+
+
+def _dm(tmp_path, journal=True):
+    return DocumentManager(store=DocumentStore(str(tmp_path / 'docs.json'), journal=journal))
+
+
+def _no_load(dm, monkeypatch):
+    monkeypatch.setattr(dm.store, 'load', lambda: pytest.fail('documents were read'))
+
+
+def _count_extractions(monkeypatch):
+    calls = []
+    real = sugg.extract_suggestions
+    monkeypatch.setattr(sugg, 'extract_suggestions', lambda text: calls.append(text) or real(text))
+    return calls
+
+
+@pytest.mark.parametrize('journal', [True, False])
+def test_cache_is_persisted_and_patched_by_mutations(tmp_path, monkeypatch, journal):
+    dm = _dm(tmp_path, journal)
+    a = dm.add('Plan', 'TODO: book venue\nwrite agenda')
+    dm.add('Ops', 'fix the build\nTODO: book venue')
+    assert dm.task_suggestions() == ['book venue', 'write agenda', 'fix the build']
+    assert (tmp_path / 'docs.suggest.json').exists()
+
+    fresh = _dm(tmp_path, journal); _no_load(fresh, monkeypatch)
+    assert fresh.task_suggestions(2) == ['book venue', 'write agenda']
+
+    other = _dm(tmp_path, journal)  # never read suggestions: patches the persisted cache
+    other.update(a.id, text='review budget')
+    c = other.add('New', 'TODO: ship it')
+    other.delete(c.id)
+    later = _dm(tmp_path, journal); _no_load(later, monkeypatch)
+    assert later.task_suggestions() == ['review budget', 'fix the build', 'book venue']
+
+
+def test_stale_cache_only_rescans_changed_texts(tmp_path, monkeypatch):
+    dm = _dm(tmp_path)
+    docs = [dm.add(f'Doc {i}', f'TODO: item {i}') for i in range(5)]
+    dm.task_suggestions()
+    # rewrite the store behind the manager's back: the cache signature no longer matches
+    docs[2].text = 'TODO: changed'
+    DocumentStore(str(tmp_path / 'docs.json'), journal=True).save_all(docs)
+    calls = _count_extractions(monkeypatch)
+    assert _dm(tmp_path).task_suggestions() == ['item 0', 'item 1', 'changed', 'item 3', 'item 4']
+    assert calls == ['TODO: changed']
+
+
+def test_advice_and_chat_use_cached_suggestions(tmp_path, monkeypatch):
+    dm = _dm(tmp_path)
+    dm.add('Plan', 'TODO: book venue\nwrite agenda\nreview slides\ntest mic')
+    tm = TaskManager(store=JsonTaskStore(str(tmp_path / 'tasks.json')))
+    expected = Agent().productivity_advice([], dm.list())
+    dm.task_suggestions()
+    fresh = _dm(tmp_path); _no_load(fresh, monkeypatch)
+    assert Agent().advice_for(tm, fresh) == expected
+    chat = ChatEngine(Agent(), tm, fresh, ChatHistory())
+    assert chat.handle_message('suggest tasks 2').splitlines() == ['book venue', 'write agenda']
+
+    class Shouty(Agent):
+        def suggest_tasks_from_document(self, doc):
+            return [s.upper() for s in super().suggest_tasks_from_document(doc)]
+    assert Shouty().cached_suggestions(dm) is None
+    assert 'Doc suggestions: BOOK VENUE; WRITE AGENDA; REVIEW SLIDES' in Shouty().advice_for(tm, dm)
@@ -0,0 +1,63 @@
+import random
+from datetime import datetime, timezone, timedelta
+from pkms_core.agent import Agent
+from pkms_core.core import DocumentManager, TaskManager
+from pkms_core.stats import TaskStats, scan_buckets
+from pkms_core.storage import DocumentStore, JsonTaskStore, SqliteTaskStore
+
+NOW = datetime(2025, 6, 1, tzinfo=timezone.utc)
+
+
+def _random_task(tm, rng):
+    t = tm.add(' '.join(['word'] * rng.randint(1, 15)), priority=rng.randint(1, 5))
+    t.created = rng.choice([(NOW - timedelta(days=rng.randint(0, 30), hours=rng.randint(0, 23))).isoformat(), 'bad'])
+    tm.edit(t.id, t.text)  # persist the backdated timestamp through a tracked mutation
+    return t
+
+
+def test_stats_match_full_scan_under_random_mutations(tmp_path):
+    rng = random.Random(9)
+    for tm in (TaskManager(store=JsonTaskStore(str(tmp_path / 'tasks.json'))),
+               TaskManager(store=SqliteTaskStore(str(tmp_path / 'tasks.db')), lazy=True)):
+        for _ in range(30): _random_task(tm, rng)
+        stats = tm.stats
+        now = NOW
+        for step in range(300):
+            ids = [t.id for t in tm.tasks]
+            op = rng.random()
+            if op < 0.25 or not ids: _random_task(tm, rng)
+            elif op < 0.45: tm.toggle(rng.choice(ids))
+            elif op < 0.6: tm.delete(rng.choice(ids))
+            elif op < 0.75: tm.add_detail(rng.choice(ids), 'detail')
+            elif op < 0.9: tm.edit(rng.choice(ids), ' '.join(['w'] * rng.randint(1, 15)))
+            else: tm.remove_detail(rng.choice(ids), 0)
+            if step % 10 == 0:
+                now = now + timedelta(hours=rng.randint(-30, 60))  # includes clock going backwards
+                assert tm.stats is stats
+                assert stats.buckets(now) == scan_buckets(list(tm.tasks), now), step
+        if tm.lazy: tm.store.close()
+
+
+def test_advice_for_uses_incremental_stats(tmp_path, monkeypatch):
+    tm = TaskManager(store=JsonTaskStore(str(tmp_path / 'tasks.json')))
+    dm = DocumentManager(store=DocumentStore(str(tmp_path / 'docs.json'), journal=True))
+    for i in range(6):
+        tm.add(f'urgent item {i}', priority=5)
+    agent = Agent()
+    expected = agent.productivity_advice(tm.list(), [])
+    monkeypatch.setattr('pkms_core.stats.scan_buckets', lambda *a: (_ for _ in ()).throw(AssertionError('scanned')))
+    monkeypatch.setattr('pkms_core.agent.scan_buckets', lambda *a: (_ for _ in ()).throw(AssertionError('scanned')))
+    assert agent.advice_for(tm, dm) == expected
+    tm.set_completed(1, True)
+    assert agent.advice_for(tm, dm)[0] == 'Tasks: 5 open / 1 done (total 6)'
+
+
+def test_stats_compaction_keeps_results():
+    class T:
+        def __init__(self, id, priority):
+            self.id, self.text, self.created, self.completed, self.details, self.priority = id, f't{id}', NOW.isoformat(), False, [], priority
+    stats = TaskStats.build(T(i, 5) for i in range(1, 4))
+    for _ in range(500):
+        stats.update(T(2, 5))
+    assert stats.buckets(NOW).high_focus == ['t1', 't2', 't3']
+    assert len(stats._focus) < 100